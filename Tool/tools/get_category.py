@@ -1,9 +1,21 @@
 from Tool import register_tool
+from catalog_utils.sqlite_store import get_catalog_source
+
 
 @register_tool()
 def get_category() -> str:
     """
     查詢所有類別
     """
-    return f'目前有的類別:"文具","辦公用品","杯瓶餐具","包袋收納","配件飾品","衣物配件","生活雜貨","家居", "春節", "中秋節", "端午節", "台灣特色"'
+    categories = get_catalog_source().categories
+    if not len(categories):
+        return "目前沒有可用的類別資料。"
 
+    # 上層分類後以括號列出子分類
+    entries = []
+    for node in categories.roots:
+        entry = f'"{node.name}"'
+        if node.children:
+            entry += f"（{'、'.join(categories.descendants(node.name))}）"
+        entries.append(entry)
+    return f"目前有的類別:{', '.join(entries)}"
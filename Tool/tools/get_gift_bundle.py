@@ -0,0 +1,81 @@
+import re
+from Tool import register_tool
+from catalog_utils.bundles import BundleTimeout, find_bundles
+from catalog_utils.sqlite_store import get_catalog_source
+from catalog_utils.render import format_price
+
+
+def _slot_mask(catalog, name: str, names: list, eligible):
+    """
+    組合中一個類別可選的商品，依序取第一個有可選商品的範圍：
+    分類樹中的分類（含子分類）、名稱或分類包含該詞的商品、最後才用含同義詞的擴展比對。
+    擴展比對範圍很廣（「筆」會包含便條紙），只在前兩者都沒有商品時使用。
+    """
+    members = catalog.category_members(name)
+    if members is not None and (members & eligible).any():
+        return members & eligible
+    mask = catalog.term_mask(name) & eligible
+    # 名稱符合較具體的類別（如「筆記本」、「筆筒」之於「筆」）的商品不列入
+    for other in set(names) | {node.name for node in catalog.categories.nodes()}:
+        if other != name and name in other:
+            mask &= ~catalog.term_mask(other)
+    if mask.any():
+        return mask
+    return catalog.category_mask(name) & eligible
+
+
+@register_tool()
+def get_gift_bundle(budget: float, quantity: int, categories: str = None, items: int = 3, deadline_days: int = None) -> str:
+    """
+    依總預算與份數組合禮盒：每份由不同類別的商品組成，總價盡量用滿每份預算。
+    單價以該份數的數量折扣價計算，只列入可訂購該數量的商品。
+    顧客想要「一份包含多樣商品的禮盒／組合」時使用，不需多次呼叫 get_product 自行組合。
+
+    :param budget: 總預算（所有份數合計）
+    :param quantity: 份數，每份組合的每項商品都購買此數量
+    :param categories: 每份組合要包含的類別，以逗號分隔（例如「筆,筆記本,杯」），每個類別各選一項；未提供時從不同的類別中任選 items 項
+    :param items: 未提供 categories 時，每份組合的商品數
+    :param deadline_days: 交期天數上限
+    :return: 最接近預算的幾個組合，以HTML表格格式返回
+    """
+    if not budget or budget <= 0 or not quantity or quantity <= 0:
+        return "<p>請提供總預算與份數。</p>"
+
+    catalog = get_catalog_source()
+    per_budget = budget / quantity
+    prices = catalog.unit_prices(quantity)
+    eligible = catalog.orderable_mask(quantity, per_budget, deadline_days)
+
+    names = [name for name in re.split(r'[,，、\s]+', categories or '') if name]
+    if names:
+        groups = []
+        for name in names:
+            rows = catalog.rows(_slot_mask(catalog, name, names, eligible))
+            if not len(rows):
+                message = f"<p>類別「{name}」沒有可在每份 {format_price(per_budget)} 內訂購 {quantity} 份的商品。</p>"
+                suggestions = catalog.categories.suggest(name) if name not in catalog.categories else []
+                if suggestions:
+                    message += f"<p>相近的類別：{'、'.join(f'「{node.name}」' for node, _ in suggestions)}</p>"
+                return message
+            groups.append((name, rows))
+        size = None
+    else:
+        # 未指定類別時，每個上層分類為一組，組合內的商品來自不同的上層分類
+        groups = [(node.name, catalog.rows(catalog.category_members(node.name) & eligible)) for node in catalog.categories.roots]
+        groups = [(name, rows) for name, rows in groups if len(rows)]
+        size = max(items or 1, 1)
+        if len(groups) < size:
+            return f"<p>每份 {format_price(per_budget)} 的預算內，找不到 {size} 個不同類別的商品可組合，請提高預算或減少商品數。</p>"
+
+    try:
+        bundles = find_bundles(groups, prices, catalog.popularity_scores(), per_budget, size)
+    except BundleTimeout:
+        return "<p>可組合的商品太多，無法及時完成計算，請指定類別或縮小預算範圍。</p>"
+    if not bundles:
+        return f"<p>很抱歉，每份 {format_price(per_budget)} 的預算內組不出符合條件的組合，請提高預算或調整類別。</p>"
+
+    html_content = f"<p>總預算 {format_price(budget)}、共 {quantity} 份，每份預算約 {format_price(per_budget)}，以下是最接近預算的組合（單價為 {quantity} 份的數量折扣價）：</p>\n"
+    for i, bundle in enumerate(bundles, start=1):
+        html_content += f"<p>組合 {i}：每份 {format_price(bundle.total)}，{quantity} 份合計 {format_price(bundle.total * quantity)}</p>\n"
+        html_content += catalog.table(bundle.rows, bundle.unit_prices) + "\n"
+    return html_content
@@ -0,0 +1,64 @@
+from Tool import register_tool
+from catalog_utils.sqlite_store import get_catalog_source
+from catalog_utils.render import format_price, quantity_range_text
+
+
+def _options_text(options: list, field: str) -> str:
+    values = [option[field].strip() for option in sorted(options, key=lambda o: o['sorting'] or 0) if (option[field] or '').strip()]
+    return '、'.join(values) if values else '-'
+
+
+@register_tool()
+def get_product_detail(product: str) -> str:
+    """
+    查詢單一商品的完整資料：規格、顏色、規格選項、數量折扣級距、打樣時間與費用、封面圖片。
+    顧客追問已推薦過的商品（例如「第二個可以再介紹一下嗎？」）時使用，不需重新搜尋。
+
+    :param product: 商品名稱、商品編號或商品ID
+    :return: 商品完整資料，以HTML格式返回
+    """
+    catalog = get_catalog_source()
+    item = catalog.find_product(product)
+    if item is None:
+        return f"<p>找不到商品「{product}」，請確認商品名稱是否正確。</p>"
+
+    specification = (item['specification'] or '').strip()
+    rows = [
+        ('商品編號', item['code'] or '-'),
+        ('單價', format_price(item['price'])),
+        ('訂購數量', quantity_range_text(item['min_order_quantity'], item['max_order_quantity'])),
+        ('分類', '、'.join(item['categories'])),
+        ('顏色', _options_text(catalog.product_options(item['id'], 'color'), 'color_name')),
+        ('規格選項', _options_text(catalog.product_options(item['id'], 'specification'), 'specification_name')),
+        ('規格', specification.replace('\r\n', '<br>').replace('\n', '<br>') if specification else '-'),
+        ('商品描述', (item['description'] or '').strip().replace('\r\n', '<br>') or '-'),
+    ]
+
+    if item['sampling_time'] or item['sampling_fee']:
+        sampling = []
+        if item['sampling_time']:
+            sampling.append(f"約 {item['sampling_time']} 天")
+        if item['sampling_fee']:
+            sampling.append(f"費用 {format_price(item['sampling_fee'])}")
+        rows.append(('打樣', '，'.join(sampling)))
+
+    cover = catalog.cover_image(item)
+    if cover:
+        rows.append(('封面圖片', cover))
+
+    tiers = catalog.price_tiers(item['id'])
+    if tiers:
+        for tier in tiers.tiers:
+            text = format_price(tier.unit_price)
+            if tier.lead_time_days:
+                text += f"，交期約 {tier.lead_time_days} 天"
+            rows.append((f"數量折扣 {quantity_range_text(tier.min_quantity, tier.max_quantity)}", text))
+
+    related = catalog.related_names(item['id'])
+    if related:
+        rows.append(('常一起購買', '、'.join(related)))
+
+    html_content = f"<p>「{item['name']}」的商品資料：</p>\n<table>\n<tr><th>項目</th><th>內容</th></tr>"
+    html_content += ''.join(f"<tr><td>{label}</td><td>{value}</td></tr>" for label, value in rows)
+    html_content += "</table>"
+    return html_content
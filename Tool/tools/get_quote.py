@@ -0,0 +1,49 @@
+from Tool import register_tool
+from catalog_utils.sqlite_store import get_catalog_source
+from catalog_utils.render import quantity_range_text
+
+
+@register_tool()
+def get_quote(product: str, quantity: int) -> str:
+    """
+    依數量折扣級距計算指定商品的報價，回傳該數量的實際單價、小計與交期。
+
+    :param product: 商品名稱、商品編號或商品ID
+    :param quantity: 購買數量
+    :return: 報價說明與各數量級距，以HTML格式返回
+    """
+    if quantity is None or quantity <= 0:
+        return "<p>請提供大於 0 的購買數量。</p>"
+
+    catalog = get_catalog_source()
+    item = catalog.find_product(product)
+    if item is None:
+        return f"<p>找不到商品「{product}」，請確認商品名稱是否正確。</p>"
+
+    name = item['name']
+    min_qty = item['min_order_quantity']
+    max_qty = item['max_order_quantity']
+    tiers = catalog.price_tiers(item['id'])
+
+    step = catalog.valid_step(item['id'], quantity)
+    if quantity < min_qty or quantity > max_qty:
+        html_content = f"<p>「{name}」的訂購數量需介於 {min_qty}～{max_qty} 個，目前無法訂購 {quantity} 個。</p>"
+    elif step:
+        html_content = f"<p>「{name}」在此數量區間需以每 {step} 個為單位訂購，目前無法訂購 {quantity} 個。</p>"
+    else:
+        tier = tiers.lookup(quantity) if tiers else None
+        unit_price = tier.unit_price if tier else item['price']
+        html_content = f"<p>「{name}」訂購 {quantity} 個：單價 NT${int(unit_price)}，小計 NT${int(round(unit_price * quantity))}"
+        if tier and tier.lead_time_days:
+            html_content += f"，交期約 {tier.lead_time_days} 天"
+        html_content += "。</p>"
+
+    if tiers:
+        html_content += """<table>
+<tr><th>數量區間</th><th>單價</th><th>交期</th></tr>"""
+        for tier in tiers.tiers:
+            lead_time = f"{tier.lead_time_days} 天" if tier.lead_time_days else "-"
+            html_content += f"<tr><td>{quantity_range_text(tier.min_quantity, tier.max_quantity)}</td><td>NT${int(tier.unit_price)}</td><td>{lead_time}</td></tr>"
+        html_content += "</table>"
+
+    return html_content
@@ -0,0 +1,73 @@
+from functools import lru_cache
+from Tool import TOOL_FUNCTIONS, register_tool
+from catalog_utils.product import normalize_name
+from catalog_utils.result_cache import PAGE_SIZE
+from catalog_utils.sqlite_store import get_catalog_source
+
+# 向 Qdrant 取回的候選數；指定數量時 Qdrant 只能以最優惠單價粗篩，多取一些再以商品目錄精確比對
+SEARCH_LIMIT = PAGE_SIZE * 5
+
+
+@lru_cache(maxsize=1)
+def _product_vector():
+    from rag_utils.embedding import OpenAIEmbeddings
+    from rag_utils.vector import QdrantVector
+    from key import OPENAI_API_KEY
+
+    return QdrantVector(OpenAIEmbeddings(openai_api_key=OPENAI_API_KEY))
+
+
+@register_tool()
+def search_products_by_intent(
+    query: str,
+    min_price: float = None,
+    max_price: float = None,
+    quantity: int = None,
+    category: str = None,
+) -> str:
+    """
+    以語意搜尋商品，適合描述送禮對象、場合或用途的需求（例如「適合送工程師的」、「開會用的小禮物」），
+    不需自行猜測多個關鍵字。價格、數量與類別條件會在搜尋時一併篩選。
+
+    :param query: 顧客的需求描述
+    :param min_price: 最低單價
+    :param max_price: 最高單價
+    :param quantity: 預計購買數量；提供時只回傳可訂購該數量的商品，價格條件與顯示的單價都以該數量的折扣價計算
+    :param category: 產品類別，與 get_product 相同，子類別的商品一併列出
+    :return: 最相關的產品列表，以HTML表格格式返回
+    """
+    if not query or not query.strip():
+        return "<p>請提供想找的商品描述。</p>"
+
+    catalog = get_catalog_source()
+    # 類別以與 get_product 相同的規則選出商品（含擴展詞與子分類），商品ID 交給 Qdrant 篩選
+    category_rows = catalog.filter_products(category, None, None, None, None, 'default', None, None, None).rows if category else None
+    if category_rows is not None and not len(category_rows):
+        return f"<p>很抱歉，沒有找到類別「{category}」的商品，請確認類別名稱。</p>"
+    try:
+        from rag_utils.product_index import build_filter, search_products
+
+        product_ids = catalog.product_ids(category_rows) if category_rows is not None else None
+        query_filter = build_filter(min_price, max_price, quantity, product_ids)
+        hits = search_products(_product_vector(), query, query_filter, limit=SEARCH_LIMIT)
+    except Exception as e:
+        print(f"語意搜尋失敗，改用關鍵字搜尋並套用價格、數量與類別條件: {e}")
+        hits = None
+
+    # Qdrant 的資料可能落後於目前的商品目錄，以目錄確認商品仍存在並精確比對折扣價與數量
+    result = catalog.filter_products(category, min_price, max_price, None, None, 'default', quantity, None, None)
+    prices = dict(zip(result.rows, result.prices if result.prices is not None else [None] * len(result.rows)))
+    if hits is None:
+        candidates = catalog.search_products(normalize_name(query)).rows
+    else:
+        found = catalog.product_rows([product_id for product_id, _ in hits])
+        candidates = [found[product_id] for product_id, _ in hits if product_id in found]
+    rows = [row for row in candidates if row in prices][:PAGE_SIZE]
+    if not rows and hits is None and (category or min_price is not None or max_price is not None or quantity is not None):
+        # 描述句通常比對不到關鍵字，改列出符合條件的商品
+        return TOOL_FUNCTIONS['get_product'](category, min_price, max_price, quantity=quantity)
+    if not rows:
+        return f"<p>很抱歉，沒有找到符合「{query}」與條件的商品，請放寬價格或數量條件，或換個描述方式。</p>"
+
+    html_content = f"<p>以下是與「{query}」最相關的商品：</p>\n"
+    return html_content + catalog.table(rows, [prices[row] for row in rows] if quantity is not None else None)
@@ -1,13 +1,16 @@
-from fastapi import FastAPI
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import List, Dict, Literal
 import json
 import os
 from LLM import get_llm
 from Tool import TOOL_FUNCTIONS
 from Tool.formatter import generate_tool_schema
+from catalog_utils.catalog import get_catalog_manager
+from catalog_utils.listing import LIST_PAGE_SIZE, MAX_LIST_PAGE_SIZE, list_categories, list_products
+from catalog_utils.sqlite_store import get_catalog_source, sqlite_enabled
 from key import OPENAI_API_KEY
 from prompt import SYSTEM_PROMPT
 
@@ -36,6 +39,20 @@ llm = get_llm(
 selected = list(TOOL_FUNCTIONS.values())
 tool_schemas = generate_tool_schema(selected)
 
+
+@app.on_event("startup")
+def watch_catalog():
+    # 備份檔更新後在背景重新載入商品目錄，不需重啟 API；
+    # 使用 SQLite 檔時由 SQLiteCatalogStore 在查詢時確認版本，不建立記憶體中的 Catalog
+    if not sqlite_enabled():
+        get_catalog_manager().start_watching()
+
+
+@app.on_event("shutdown")
+def stop_watching_catalog():
+    if not sqlite_enabled():
+        get_catalog_manager().stop_watching()
+
 class ChatMessage(BaseModel):
     role: str
     content: str
@@ -69,6 +86,59 @@ async def chat_stream(payload: ChatRequest):
     return StreamingResponse(llm_stream(), media_type="text/event-stream")
 
 
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match 可列出多個 ETag 或 *，比對時忽略弱驗證前綴 W/
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or etag in (tag[2:] if tag.startswith('W/') else tag for tag in tags)
+
+
+def _versioned_response(request: Request, version: str, build):
+    """
+    以商品目錄版本作為 ETag 的 JSON 回應。
+
+    內容只取決於網址與目錄版本，瀏覽器帶回相同的 ETag 時直接回傳 304，不重新查詢與序列化；
+    Cache-Control: no-cache 讓瀏覽器每次都帶 If-None-Match 重新驗證，目錄更新後立即取得新內容。
+    """
+    etag = f'"{version}"'
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if _etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(build(), headers=headers)
+
+
+@app.get("/products")
+def products(
+    request: Request,
+    category: str = None,
+    min_price: float = None,
+    max_price: float = None,
+    min_quantity: int = None,
+    max_quantity: int = None,
+    sort_by: Literal["default", "closest_price"] = "default",
+    quantity: int = Query(None, gt=0),
+    deadline_days: int = Query(None, ge=0),
+    spec: str = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(LIST_PAGE_SIZE, ge=1, le=MAX_LIST_PAGE_SIZE),
+):
+    """商品列表，條件與 get_product 工具相同，不經過 LLM；未提供條件時列出所有商品"""
+    # 整個請求使用同一版本的商品目錄，ETag 與內容一致；啟用 SQLite 時以資料庫的目錄版本作為 ETag
+    catalog = get_catalog_source()
+    return _versioned_response(request, catalog.version, lambda: list_products(
+        catalog, category, min_price, max_price, min_quantity, max_quantity,
+        sort_by, quantity, deadline_days, spec, page, page_size,
+    ))
+
+
+@app.get("/categories")
+def categories(request: Request):
+    """分類樹與各分類的商品數，供前端建立篩選面板"""
+    catalog = get_catalog_source()
+    return _versioned_response(request, catalog.version, lambda: list_categories(catalog))
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=5557)
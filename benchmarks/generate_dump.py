@@ -0,0 +1,214 @@
+"""
+產生與 inkslap-backup.sql 相同結構的合成 MySQL 備份檔，供效能測試使用。
+
+資料表結構與分類直接取自真實備份檔；商品名稱、規格、圖片、顏色、規格選項、
+數量折扣級距與數量區間依真實資料的樣式隨機產生，同一個 seed 產生的檔案相同。
+
+用法：
+    python benchmarks/generate_dump.py --products 10000 --output benchmarks/data/catalog-10k.sql
+"""
+import argparse
+import os
+import random
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog_utils.loader import SQL_BACKUP_PATH
+from catalog_utils.sql_dump import read_tables
+
+# 合成資料涵蓋的資料表，結構取自真實備份檔
+TABLES = (
+    'categories',
+    'products',
+    'product_categories',
+    'product_images',
+    'product_colors',
+    'product_specifications',
+    'quantity_discounts',
+    'product_quantity_ranges',
+)
+
+CATEGORY_COLUMNS = ['id', 'name', 'parent_id', 'created_at', 'updated_at', 'type', 'code', 'status', 'description', 'sorting', 'group_sort']
+
+# 每個 INSERT 語句的資料列數
+ROWS_PER_INSERT = 1000
+
+TIMESTAMP = '2025-05-07 12:00:00'
+
+VARIANTS = ['', '經典款', '升級版', '迷你', '大容量', '輕量', '環保', '質感', '客製化', '限定款', 'Pro', '二代']
+MATERIALS = ['塑膠', '304不鏽鋼', '帆布', '牛津布', 'PU皮革', '竹木', '小麥節桿', '玻璃', '陶瓷', '矽膠', '鋁合金', '棉']
+CRAFTS = ['單色印刷', '雷射雕刻', '絲印', '全彩印刷', '壓印', '刺繡', '布標']
+PACKAGES = ['OPP袋', '紙盒', '牛皮紙盒', '氣泡紙+紙盒', '裸裝']
+COLORS = ['黑', '白', '紅', '藍', '綠', '灰', '粉紅', '天空藍', '午夜黑', '米白', '深綠', '玫瑰金']
+SPECIFICATIONS = ['A5', 'A6', '300ml', '500ml', '小型', '中型', '大', '長款', '短款', '單一規格', '三件組', '直徑9.8cm']
+
+
+def _sql(value) -> str:
+    if value is None:
+        return 'NULL'
+    if isinstance(value, str):
+        escaped = value.replace('\\', '\\\\').replace("'", "\\'").replace('\r', '\\r').replace('\n', '\\n')
+        return f"'{escaped}'"
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
+
+
+def _schema(source: str, table: str) -> str:
+    match = re.search(
+        rf"DROP TABLE IF EXISTS `{table}`;\s*CREATE TABLE `{table}` \(.*?\) ENGINE=[^;]*;",
+        source,
+        re.S,
+    )
+    if not match:
+        raise ValueError(f"備份檔中找不到資料表 {table} 的結構")
+    return match.group(0)
+
+
+def _write_inserts(f, table: str, columns: list, rows):
+    column_list = ', '.join(f"`{c}`" for c in columns)
+    batch = []
+
+    def flush():
+        if batch:
+            f.write(f"INSERT INTO `{table}` ({column_list}) VALUES\n")
+            f.write(',\n'.join(batch))
+            f.write(';\n\n')
+            batch.clear()
+
+    for row in rows:
+        batch.append('(' + ',\t'.join(_sql(v) for v in row) + ')')
+        if len(batch) >= ROWS_PER_INSERT:
+            flush()
+    flush()
+
+
+class _Ids:
+    """各資料表的自動遞增 ID"""
+
+    def __init__(self):
+        self._next = {}
+
+    def __call__(self, table: str) -> int:
+        value = self._next.get(table, 1)
+        self._next[table] = value + 1
+        return value
+
+
+def generate(product_count: int, output: str, seed: int = 0, source_path: str = SQL_BACKUP_PATH):
+    rng = random.Random(seed)
+    with open(source_path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    real = read_tables(source_path, ('categories', 'products'))
+    categories = [c for c in real['categories'] if c['type'] == 'product'] or real['categories']
+    base_names = [p['name'].strip() for p in real['products']]
+    ids = _Ids()
+
+    products, product_categories, images, colors, specifications, discounts, ranges = [], [], [], [], [], [], []
+    for product_id in range(1, product_count + 1):
+        price = float(max(10, round(rng.lognormvariate(5.0, 0.9))))
+        min_qty = rng.choice([1, 50, 100, 200, 300, 500])
+        max_qty = rng.choice([None, 3000, 5000, 10000])
+        name = f"{rng.choice(VARIANTS)}{rng.choice(base_names)}".strip()
+        specification = '\r\n'.join([
+            f"材質：{rng.choice(MATERIALS)}",
+            f"尺寸：{rng.randint(5, 40)}x{rng.randint(5, 40)}cm",
+            f"重量：{rng.randint(5, 800)}g",
+            f"工藝：{rng.choice(CRAFTS)}",
+            f"包裝：{rng.choice(PACKAGES)}",
+        ])
+        products.append((
+            product_id, f"P{product_id:08d}", name, f"{name}，適合企業贈禮。", price, None, None, 0, 1,
+            TIMESTAMP, TIMESTAMP, None, None, min_qty, max_qty, specification, None,
+            rng.choice([5, 7, 10]), float(rng.choice([500, 1500, 1600])), None, None, product_id,
+        ))
+
+        for sorting, category in enumerate(rng.sample(categories, rng.randint(1, min(3, len(categories)))), start=1):
+            product_categories.append((ids('product_categories'), sorting, product_id, category['id'], TIMESTAMP, TIMESTAMP))
+
+        for sorting, image_type in enumerate(['cover', 'template'] + ['other'] * rng.randint(0, 3), start=1):
+            file_name = f"{product_id}-{sorting}.png"
+            images.append((
+                ids('product_images'), product_id, sorting, file_name, 0, TIMESTAMP, TIMESTAMP,
+                image_type, None, f"/var/www/html/src/uploads/products/{file_name}",
+            ))
+
+        for sorting, color in enumerate(rng.sample(COLORS, rng.randint(1, 3)), start=1):
+            colors.append((
+                ids('product_colors'), product_id, sorting, color, None, f"{product_id}-color-{sorting}.jpg", None,
+                TIMESTAMP, TIMESTAMP, None, None,
+            ))
+
+        for sorting, spec in enumerate(rng.sample(SPECIFICATIONS, rng.randint(1, 2)), start=1):
+            specifications.append((ids('product_specifications'), product_id, sorting, spec, TIMESTAMP, TIMESTAMP))
+
+        # 數量折扣級距：由最低訂購量開始，每級數量上升、單價下降、交期拉長
+        start, discount, lead_time = min_qty, 0.0, rng.choice([10, 14, 20, 30])
+        for level in range(rng.randint(2, 4)):
+            end = start * rng.choice([2, 3, 5]) + rng.choice([0, 99, 499])
+            last = level == 3 or rng.random() < 0.25
+            discounts.append((
+                ids('quantity_discounts'), product_id, start, None if last else end, discount, lead_time,
+                TIMESTAMP, TIMESTAMP, round(price * (1 - discount / 100), 2),
+            ))
+            if last:
+                break
+            start, discount, lead_time = end + 1, discount + rng.choice([3.0, 5.0, 10.0]), lead_time + rng.choice([5, 10, 15])
+
+        ranges.append((ids('product_quantity_ranges'), product_id, 1, 10, rng.choice([1, 1, 1, 5]), TIMESTAMP, TIMESTAMP))
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        f.write("-- 合成商品目錄，由 benchmarks/generate_dump.py 產生\n\n")
+        f.write("SET NAMES utf8;\nSET time_zone = '+00:00';\nSET foreign_key_checks = 0;\nSET sql_mode = 'NO_AUTO_VALUE_ON_ZERO';\n\n")
+        data = {
+            'categories': (CATEGORY_COLUMNS, [tuple(c[k] for k in CATEGORY_COLUMNS) for c in real['categories']]),
+            'products': (
+                ['id', 'code', 'name', 'description', 'price', 'sku', 'category_id', 'stock', 'status', 'created_at', 'updated_at',
+                 'brand_id', 'ips_id', 'min_order_quantity', 'max_order_quantity', 'specification', 'purpose', 'sampling_time',
+                 'sampling_fee', 'template_dimensions', 'dimension_points', 'sorting'],
+                products,
+            ),
+            'product_categories': (['id', 'sorting', 'product_id', 'category_id', 'created_at', 'updated_at'], product_categories),
+            'product_images': (
+                ['id', 'product_id', 'sorting', 'file_name', 'is_primary', 'created_at', 'updated_at', 'image_type', 'image_url', 'file_path'],
+                images,
+            ),
+            'product_colors': (
+                ['id', 'product_id', 'sorting', 'color_name', 'color_code', 'file_name', 'image_url', 'created_at', 'updated_at',
+                 'nav_file_name', 'nav_image_url'],
+                colors,
+            ),
+            'product_specifications': (['id', 'product_id', 'sorting', 'specification_name', 'created_at', 'updated_at'], specifications),
+            'quantity_discounts': (
+                ['id', 'product_id', 'min_quantity', 'max_quantity', 'discount_percentage', 'lead_time_days', 'created_at',
+                 'updated_at', 'discount_price'],
+                discounts,
+            ),
+            'product_quantity_ranges': (
+                ['id', 'product_id', 'min_quantity', 'max_quantity', 'increment_step', 'created_at', 'updated_at'],
+                ranges,
+            ),
+        }
+        for table in TABLES:
+            f.write(_schema(source, table) + "\n\n")
+            columns, rows = data[table]
+            _write_inserts(f, table, columns, rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="產生合成商品目錄備份檔")
+    parser.add_argument('--products', type=int, default=1000, help="商品數量")
+    parser.add_argument('--output', required=True, help="輸出的 .sql 檔路徑")
+    parser.add_argument('--seed', type=int, default=0, help="亂數種子")
+    parser.add_argument('--source', default=SQL_BACKUP_PATH, help="提供資料表結構與分類的真實備份檔")
+    args = parser.parse_args()
+
+    generate(args.products, args.output, args.seed, args.source)
+    print(f"已產生 {args.output}（{args.products} 個商品）")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""
+商品目錄的效能測試：解析時間、記憶體峰值與各類查詢的延遲百分位數。
+
+每個商品數量在獨立的子行程中執行，快取目錄使用暫存目錄，結果互不影響。
+合成備份檔不存在時會先以 generate_dump.py 產生。
+
+用法：
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 --backend sqlite --json results.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+# 固定的查詢組合：(類型, 工具名稱, 參數)
+QUERIES = [
+    ('category', 'get_product', {'category': '文具'}),
+    ('category', 'get_product', {'category': '包袋收納'}),
+    ('category', 'get_product', {'category': '杯'}),
+    ('price', 'get_product', {'min_price': 100, 'max_price': 300}),
+    ('price', 'get_product', {'max_price': 200, 'sort_by': 'closest_price'}),
+    ('price', 'get_product', {'category': '筆', 'max_price': 50}),
+    ('quantity', 'get_product', {'quantity': 500}),
+    ('quantity', 'get_product', {'quantity': 1000, 'max_price': 150, 'sort_by': 'closest_price'}),
+    ('quantity', 'get_product', {'min_quantity': 100, 'max_quantity': 5000}),
+    ('keyword', 'search_products_by_keyword', {'keyword': '筆'}),
+    ('keyword', 'search_products_by_keyword', {'keyword': '杯子'}),
+    ('keyword', 'search_products_by_keyword', {'keyword': '送男友'}),
+    ('keyword', 'search_products_by_keyword', {'keyword': '收納'}),
+    ('keyword', 'search_products_by_keyword', {'keyword': '環保'}),
+]
+
+PERCENTILES = (50, 95, 99)
+
+
+def _percentile(sorted_values: list, p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _timed(func):
+    """執行 func，回傳 (結果, 秒數)"""
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def _peak_mb(func) -> float:
+    """執行 func 期間 tracemalloc 記錄的記憶體峰值（MB）；追蹤本身會拖慢執行，時間另外量測"""
+    import tracemalloc
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def run_worker(dump_path: str, repeat: int) -> dict:
+    """在目前行程量測一份備份檔；環境變數由 run_size 設定"""
+    import resource
+    sys.path.insert(0, ROOT)
+    from catalog_utils.catalog import build_catalog
+    from catalog_utils.loader import parse_sql_products
+
+    result = {'dump_path': dump_path, 'dump_mb': os.path.getsize(dump_path) / 1024 / 1024}
+
+    products, result['parse_seconds'] = _timed(lambda: parse_sql_products(dump_path))
+    result['products'] = len(products)
+    del products
+    result['parse_peak_mb'] = _peak_mb(lambda: parse_sql_products(dump_path))
+
+    # 第一次建立會解析並寫入快照與共用陣列；之後直接讀取
+    _, result['catalog_cold_seconds'] = _timed(lambda: build_catalog(dump_path))
+    _, result['catalog_warm_seconds'] = _timed(lambda: build_catalog(dump_path))
+    result['catalog_warm_peak_mb'] = _peak_mb(lambda: build_catalog(dump_path))
+
+    import Tool
+    tools = Tool.TOOL_FUNCTIONS
+
+    latencies = {}
+    for kind, name, kwargs in QUERIES:
+        tools[name](**kwargs)  # 預熱
+    for _ in range(repeat):
+        for kind, name, kwargs in QUERIES:
+            start = time.perf_counter()
+            tools[name](**kwargs)
+            latencies.setdefault(kind, []).append((time.perf_counter() - start) * 1000)
+
+    result['latency_ms'] = {}
+    for kind, values in latencies.items():
+        values.sort()
+        result['latency_ms'][kind] = {f"p{p}": _percentile(values, p) for p in PERCENTILES}
+        result['latency_ms'][kind]['mean'] = sum(values) / len(values)
+
+    result['max_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return result
+
+
+def run_size(size: int, repeat: int, backend: str, seed: int) -> dict:
+    dump_path = os.path.join(DATA_DIR, f"catalog-{size}.sql")
+    if not os.path.exists(dump_path):
+        from generate_dump import generate
+        print(f"產生 {dump_path} ...", file=sys.stderr)
+        generate(size, dump_path, seed)
+
+    with tempfile.TemporaryDirectory(prefix="inkslap-bench-") as cache_dir:
+        env = dict(os.environ)
+        env.update({
+            "INKSLAP_SQL_BACKUP_PATH": dump_path,
+            "INKSLAP_CATALOG_CACHE_DIR": cache_dir,
+            "INKSLAP_CATALOG_POLL_SECONDS": "0",
+            # 每次查詢都重新篩選，量測的是未命中結果快取的延遲
+            "INKSLAP_RESULT_CACHE_SIZE": "0",
+        })
+        if backend == 'sqlite':
+            env["INKSLAP_CATALOG_SQLITE"] = os.path.join(cache_dir, "catalog.sqlite3")
+        else:
+            env.pop("INKSLAP_CATALOG_SQLITE", None)
+
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", dump_path, "--repeat", str(repeat)],
+            env=env, cwd=ROOT, capture_output=True, text=True,
+        )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{size} 個商品的測試失敗：\n{proc.stderr}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['backend'] = backend
+    return result
+
+
+def print_report(results: list):
+    print(f"{'商品數':>8} {'檔案MB':>8} {'解析秒':>8} {'解析峰值MB':>10} {'冷建立秒':>8} {'熱建立秒':>8} {'熱建立峰值MB':>12} {'RSS MB':>8}")
+    for r in results:
+        print(f"{r['products']:>8} {r['dump_mb']:>8.1f} {r['parse_seconds']:>8.2f} {r['parse_peak_mb']:>10.1f} "
+              f"{r['catalog_cold_seconds']:>8.2f} {r['catalog_warm_seconds']:>8.2f} {r['catalog_warm_peak_mb']:>12.1f} {r['max_rss_mb']:>8.1f}")
+    print()
+    print(f"{'商品數':>8} {'查詢類型':>10} " + ' '.join(f"{'p%d ms' % p:>9}" for p in PERCENTILES) + f" {'平均 ms':>9}")
+    for r in results:
+        for kind, stats in r['latency_ms'].items():
+            print(f"{r['products']:>8} {kind:>10} " + ' '.join(f"{stats['p%d' % p]:>9.2f}" for p in PERCENTILES) + f" {stats['mean']:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="商品目錄效能測試")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help="商品數量")
+    parser.add_argument('--repeat', type=int, default=20, help="每個查詢重複的次數")
+    parser.add_argument('--backend', choices=('memory', 'sqlite'), default='memory', help="查詢使用的目錄後端")
+    parser.add_argument('--seed', type=int, default=0, help="合成資料的亂數種子")
+    parser.add_argument('--json', help="將結果寫入 JSON 檔，方便比較不同版本")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        # 工具匯入時會輸出載入訊息，結果放在最後一行
+        print(json.dumps(run_worker(args.worker, args.repeat)))
+        return
+
+    results = [run_size(size, args.repeat, args.backend, args.seed) for size in args.sizes]
+    print_report(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+import math
+import os
+import time
+from collections import namedtuple
+import numpy as np
+
+# 組合計算的時間上限（秒），超過時放棄並回報逾時
+BUNDLE_TIME_BUDGET = float(os.getenv("INKSLAP_BUNDLE_TIME_BUDGET", "0.5"))
+
+# rows：組合內的商品列號；unit_prices：與 rows 對齊的單價；total：每份的總價
+Bundle = namedtuple('Bundle', ['rows', 'unit_prices', 'total'])
+
+
+class BundleTimeout(Exception):
+    """組合計算超過時間上限"""
+
+
+def find_bundles(
+    groups: list,
+    prices: np.ndarray,
+    popularity: np.ndarray,
+    budget: float,
+    size: int = None,
+    limit: int = 3,
+    time_budget: float = BUNDLE_TIME_BUDGET,
+) -> list:
+    """
+    在每份預算內找出總價最接近預算的禮品組合（分組背包問題）。
+
+    每個類別最多選一個商品，同一個商品不會重複出現。價格以整數元的上取整計算，
+    可達總價由動態規劃算出，每個商品只屬於一個階段：只屬於一個類別的商品，每個類別合為
+    一個階段，轉移對所有候選價格做一次陣列平移；同時屬於多個類別的商品各自一個階段。
+    reach[已選數量, 已選的共用類別, 總價] 表示是否可由前幾個階段組成，共用商品的類別
+    以位元記錄是否已選，因此可達的狀態一定能組出，由最高的可達總價往回追溯時不需回溯，
+    同價的商品優先選熱門度高的。追溯途中用完時間時，回傳已找到的組合。
+
+    :param groups: [(類別名稱, 候選商品列號), ...]
+    :param prices: 每個商品的單價，與列號對齊（例如數量級距折扣價）
+    :param popularity: 每個商品的熱門度，與列號對齊
+    :param budget: 每份預算
+    :param size: 組合的商品數；None 代表每個類別恰好選一個，否則從不同類別中選 size 個
+    :param limit: 回傳的組合數
+    :return: [Bundle, ...]，依總價由高到低排列
+    :raises BundleTimeout: 超過 time_budget 秒且尚未找到任何組合
+    """
+    deadline = time.monotonic() + time_budget
+    capacity = int(math.floor(budget))
+    need = len(groups) if size is None else min(size, len(groups))
+    if capacity <= 0 or need <= 0:
+        return []
+
+    # 每個商品所屬的類別
+    membership = {}
+    for g, (_, rows) in enumerate(groups):
+        for row in np.asarray(rows, dtype=np.int64).tolist():
+            members = membership.setdefault(row, [])
+            if not members or members[-1] != g:
+                members.append(g)
+
+    # 所屬類別與整數價格都相同的商品可以互換，一個組合最多用到所屬類別數個，依熱門度保留這麼多個
+    buckets = {}
+    for row in sorted(membership, key=lambda r: (-popularity[r], r)):
+        cost = int(math.ceil(prices[row] - 1e-9))
+        if cost > capacity:
+            continue
+        same = buckets.setdefault((tuple(membership[row]), cost), [])
+        if len(same) < len(membership[row]):
+            same.append(row)
+
+    # exclusive[g][整數價格] = 只屬於類別 g 的最熱門商品；shared 依熱門度由低到高，追溯時先試熱門的
+    exclusive = [{} for _ in groups]
+    shared = []
+    for (members, cost), rows in buckets.items():
+        if len(members) == 1:
+            exclusive[members[0]][cost] = rows[0]
+        else:
+            shared.extend((row, cost, members) for row in rows)
+    shared.sort(key=lambda item: (popularity[item[0]], item[0]))
+    linked = sorted({g for _, _, members in shared for g in members})
+    bits = {g: 1 << i for i, g in enumerate(linked)}
+    masks = 1 << len(linked)
+
+    # 每個類別都要選時，必選的類別一定選上、其餘由位元記錄，已選數量可由階段與位元推得，不另外記錄
+    levels = need + 1 if size is not None else 1
+    up, down = (slice(1, None), slice(None, -1)) if size is not None else (slice(None), slice(None))
+
+    def add(reach, prev, cost: int, bit: int):
+        """在 prev 的狀態上加選一個價格為 cost 的商品；bit 為該類別的位元，0 代表不記錄"""
+        if bit:
+            shape = (levels, masks // (2 * bit), 2, bit, capacity + 1)
+            reach, prev = reach.reshape(shape), prev.reshape(shape)
+            reach[up, :, 1, :, cost:] |= prev[down, :, 0, :, :capacity + 1 - cost]
+        else:
+            reach[up, :, cost:] |= prev[down, :, :capacity + 1 - cost]
+
+    # steps[i] 轉移後的狀態存為 stages[i + 1]，以位元壓縮節省記憶體
+    prev = np.zeros((levels, masks, capacity + 1), dtype=bool)
+    prev[0, 0, 0] = True
+    stages = [np.packbits(prev, axis=-1)]
+    steps = []
+    for g, by_cost in enumerate(exclusive):
+        bit = bits.get(g, 0)
+        # 必選的類別不能略過；共用商品的類別可能由共用商品選上，位元會在最後確認
+        reach = prev.copy() if size is not None or bit else np.zeros_like(prev)
+        for i, cost in enumerate(by_cost):
+            if i % 64 == 0 and time.monotonic() > deadline:
+                raise BundleTimeout()
+            add(reach, prev, cost, bit)
+        steps.append((g, by_cost))
+        stages.append(np.packbits(reach, axis=-1))
+        prev = reach
+    for i, (row, cost, members) in enumerate(shared):
+        if i % 64 == 0 and time.monotonic() > deadline:
+            raise BundleTimeout()
+        reach = prev.copy()
+        for g in members:
+            add(reach, prev, cost, bits[g])
+        steps.append((row, cost, members))
+        stages.append(np.packbits(reach, axis=-1))
+        prev = reach
+
+    def reached(stage: int, picked: int, mask: int, total: int) -> bool:
+        level = picked if size is not None else 0
+        return total >= 0 and bool(stages[stage][level, mask, total >> 3] & (0x80 >> (total & 7)))
+
+    def trace(mask: int, total: int) -> list:
+        picked, chosen = need, []
+        for stage in range(len(steps), 0, -1):
+            if time.monotonic() > deadline:
+                raise BundleTimeout()
+            step = steps[stage - 1]
+            if picked == 0:
+                break
+            if isinstance(step[1], dict):
+                g, by_cost = step
+                bit = bits.get(g, 0)
+                if bit and not mask & bit:
+                    continue
+                options = [(cost, row) for cost, row in by_cost.items()
+                           if reached(stage - 1, picked - 1, mask & ~bit, total - cost)]
+                if options:
+                    cost, row = max(options, key=lambda option: popularity[option[1]])
+                    chosen.append((g, row))
+                    picked, mask, total = picked - 1, mask & ~bit, total - cost
+            else:
+                row, cost, members = step
+                for g in members:
+                    if mask & bits[g] and reached(stage - 1, picked - 1, mask & ~bits[g], total - cost):
+                        chosen.append((g, row))
+                        picked, mask, total = picked - 1, mask & ~bits[g], total - cost
+                        break
+        return [row for _, row in sorted(chosen)]
+
+    # 每個類別都要選時，共用商品的類別也必須全部選上
+    first = 0 if size is not None else masks - 1
+    final = prev[need if size is not None else 0, first:]
+    bundles = []
+    for total in np.flatnonzero(final.any(axis=0))[::-1].tolist():
+        try:
+            rows = trace(first + int(np.flatnonzero(final[:, total])[0]), total)
+        except BundleTimeout:
+            # 時間用完時保留已找到的組合（總價最高的幾個），一個都沒有才回報逾時
+            if bundles:
+                break
+            raise
+        unit_prices = np.array([prices[row] for row in rows], dtype=np.float64)
+        bundles.append(Bundle(rows, unit_prices, float(unit_prices.sum())))
+        if len(bundles) >= limit:
+            break
+    return bundles
@@ -0,0 +1,476 @@
+import os
+import threading
+from functools import cached_property, lru_cache
+from .category_tree import CategoryTree
+from .columns import ProductColumns
+from .delivery import DeliveryIndex
+from .facets import FacetIndex
+from .fallback import FALLBACK_PRODUCTS
+from .fuzzy import FuzzyIndex, expansion_terms
+from .incremental import INCREMENTAL_REFRESH, MAX_CHANGE_FRACTION, load_change_state, read_changes
+from .listing import filter_products, popular_first
+from .loader import (
+    SQL_BACKUP_PATH,
+    cover_file_name,
+    load_categories,
+    normalize_fallback_products,
+    load_order_items,
+    load_product_colors,
+    load_product_images,
+    load_product_specifications,
+    load_quantity_discounts,
+    load_quantity_ranges,
+    load_sql_products,
+)
+from .popularity import PopularityIndex
+from .price_index import PriceIndex
+from .pricing import PricingEngine
+from .product import normalize_name
+from .render import TableRenderer
+from .result_cache import PAGE_SIZE, ResultSet
+from .search_index import SearchIndex
+from .shared_arrays import SHARED_ARRAYS, shared_arrays
+from .taxonomy import Taxonomy
+from .snapshot import file_sha256
+from .synonyms import SYNONYMS_PATH, SynonymMatcher
+
+# 監看備份檔變動的輪詢秒數，設為 0 代表不自動重新載入
+POLL_SECONDS = float(os.getenv("INKSLAP_CATALOG_POLL_SECONDS", "30"))
+
+
+class Catalog:
+    """
+    某一版本的商品目錄及其索引。
+
+    建立完成後不再修改；工具函式在每次呼叫開始時取得一份 Catalog，
+    整個呼叫期間都使用同一份，重新載入不會影響進行中的查詢。
+
+    圖片、顏色、規格等附屬資料表在第一次使用時才從 source_path 解析；
+    沒有 source_path（備用商品資料）時視為空表。
+    """
+
+    def __init__(
+        self,
+        products: list,
+        version: str,
+        quantity_discounts: dict = None,
+        quantity_ranges: dict = None,
+        source_path: str = None,
+        order_items: dict = None,
+        change_state=None,
+    ):
+        """
+        :param change_state: 來源備份檔的變動追蹤狀態（見 incremental.load_change_state），None 時只能完整重建
+        """
+        self.products = products
+        self.version = version
+        self.source_path = source_path
+        self.order_items = order_items or {}
+        self.change_state = change_state
+        self.rows_by_id = {product['id']: row for row, product in enumerate(products)}
+
+        if SHARED_ARRAYS and products and source_path:
+            # 欄位、價格排序與分類位元圖以唯讀映射共用，同一版本的所有 worker 共享同一份分頁
+            self.columns = ProductColumns(products, shared_arrays(version, 'columns', lambda: ProductColumns.build_arrays(products)))
+            self.price_index = PriceIndex(self.columns.price, shared_arrays(version, 'price_index', lambda: PriceIndex.build_arrays(self.columns.price)))
+            synonyms = SynonymMatcher.load()
+            compiled = shared_arrays(version, 'taxonomy', lambda: Taxonomy(self.columns, synonyms=synonyms).compiled())
+            self.taxonomy = Taxonomy(self.columns, synonyms=synonyms, compiled=compiled)
+        else:
+            self.columns = ProductColumns(products)
+            self.price_index = PriceIndex(self.columns.price)
+            self.taxonomy = Taxonomy(self.columns)
+
+        self.pricing = PricingEngine(products, quantity_discounts or {}, self.columns.price)
+        self.delivery = DeliveryIndex(products, quantity_ranges or {}, self.pricing)
+        self.popularity = PopularityIndex(products, self.order_items)
+        self.search_index = SearchIndex(products)
+        self.renderer = TableRenderer(products)
+
+        # 商品ID、編號與正規化名稱的雜湊索引；名稱重複時以第一個商品為準
+        self.by_id = {}
+        self.by_code = {}
+        self.by_name = {}
+        for product in products:
+            self.by_id.setdefault(product['id'], product)
+            if product['code']:
+                self.by_code.setdefault(product['code'], product)
+            self.by_name.setdefault(normalize_name(product['name']), product)
+
+    def __len__(self):
+        return int(self.columns.live.sum())
+
+    def patched(self, changes, version: str) -> 'Catalog':
+        """
+        套用增量變動（見 incremental.read_changes），回傳新版本的 Catalog。
+
+        變動的商品沿用原本的列號，新增的商品接在尾端，刪除的商品保留列號並標記為下架，
+        各索引只重新計算這些列；原本的 Catalog 不變，進行中的查詢不受影響。
+        圖片、顏色、規格、分類樹等延遲載入的資料在新版本第一次使用時重新讀取。
+        """
+        products = list(self.products)
+        rows_by_id = dict(self.rows_by_id)
+        old_products, rows, deleted_rows = {}, [], []
+        for product_id in changes.deleted:
+            row = rows_by_id.pop(product_id, None)
+            if row is not None:
+                deleted_rows.append(row)
+                old_products[row] = products[row]
+        for product_id, product in changes.upserts.items():
+            row = rows_by_id.get(product_id)
+            if row is None:
+                row = rows_by_id[product_id] = len(products)
+                products.append(product)
+            else:
+                old_products[row] = products[row]
+                products[row] = product
+            rows.append(row)
+
+        new = Catalog.__new__(Catalog)
+        new.products = products
+        new.version = version
+        new.source_path = self.source_path
+        new.order_items = load_order_items(self.source_path) if changes.order_items_changed else self.order_items
+        new.change_state = changes.state
+        new.rows_by_id = rows_by_id
+
+        new.columns = self.columns.patched(products, rows, deleted_rows)
+        new.price_index = self.price_index.patched(new.columns.price, rows)
+        new.taxonomy = self.taxonomy.patched(new.columns, rows)
+        new.pricing = self.pricing.patched(changes.quantity_discounts, rows_by_id, new.columns.price)
+        new.delivery = self.delivery.patched(products, changes.quantity_ranges, new.pricing, rows_by_id, rows)
+        # 已刪除的商品保留列號，不列入熱門度與共同購買
+        new.popularity = PopularityIndex(products, {pid: items for pid, items in new.order_items.items() if pid in rows_by_id})
+        new.search_index = self.search_index.patched(old_products, products, rows, deleted_rows)
+        new.renderer = self.renderer.patched(products, rows)
+
+        new.by_id, new.by_code, new.by_name = dict(self.by_id), dict(self.by_code), dict(self.by_name)
+        for product in old_products.values():
+            for index, key in ((new.by_id, product['id']), (new.by_code, product['code']), (new.by_name, normalize_name(product['name']))):
+                if index.get(key) is product:
+                    del index[key]
+        for row in rows:
+            product = products[row]
+            new.by_id.setdefault(product['id'], product)
+            if product['code']:
+                new.by_code.setdefault(product['code'], product)
+            new.by_name.setdefault(normalize_name(product['name']), product)
+        return new
+
+    def _product_table(self, load) -> dict:
+        return load(self.source_path) if self.source_path else {}
+
+    # 附屬資料表與其索引只在第一次存取時建立；並行的第一次存取可能各自建立一份，
+    # 內容相同，最後寫入的一份生效
+    @cached_property
+    def images(self) -> dict:
+        """{商品ID: [圖片資料, ...]}"""
+        return self._product_table(load_product_images)
+
+    @cached_property
+    def colors(self) -> dict:
+        """{商品ID: [顏色資料, ...]}"""
+        return self._product_table(load_product_colors)
+
+    @cached_property
+    def specifications(self) -> dict:
+        """{商品ID: [規格資料, ...]}"""
+        return self._product_table(load_product_specifications)
+
+    @cached_property
+    def facets(self) -> FacetIndex:
+        return FacetIndex(self.products, {'color': self.colors, 'specification': self.specifications})
+
+    @cached_property
+    def categories(self) -> CategoryTree:
+        """由 categories 資料表建立的分類樹；沒有 source_path 時以商品上的分類名稱建立"""
+        product_categories = [product['categories'] for product, live in zip(self.products, self.columns.live) if live]
+        rows = load_categories(self.source_path) if self.source_path else []
+        return CategoryTree(rows, product_categories) if rows else CategoryTree.from_names(product_categories)
+
+    @cached_property
+    def fuzzy(self) -> FuzzyIndex:
+        """商品名稱、分類與同義詞的錯字更正索引"""
+        extra_terms = expansion_terms(self.taxonomy.synonyms.groups, self.taxonomy.expansions)
+        live = self.columns.live
+        return FuzzyIndex([product for product, alive in zip(self.products, live) if alive], extra_terms)
+
+    def category_mask(self, query: str):
+        """名稱或分類符合查詢詞的商品位元圖；查詢詞是分類名稱時，一併納入其所有子孫分類"""
+        mask = self.taxonomy.mask(query)
+        subcategories = self.categories.descendants(query)
+        if subcategories:
+            mask = mask.copy()
+            for name in subcategories:
+                mask |= self.taxonomy.mask(name)
+        return mask
+
+    def category_members(self, name: str):
+        """
+        分類樹中該分類及其所有子孫分類的商品位元圖，不含同義詞與名稱的擴展比對；
+        分類不在分類樹中時回傳 None。
+        """
+        node = self.categories.find(name)
+        if node is None:
+            return None
+        return self.columns.category_members((node.name,) + self.categories.descendants(node.name))
+
+    def cover_image(self, product: dict):
+        """商品的代表圖片檔名：優先選擇封面圖，否則選擇第一張圖片"""
+        return cover_file_name(self.images.get(product['id'], []))
+
+    def find_product(self, query):
+        """以商品ID、編號或名稱找出商品，名稱找不到完全相符時改用部分比對"""
+        text = str(query).strip()
+        product = self.by_code.get(text) or self.by_name.get(normalize_name(text))
+        if product is None and text.isdigit():
+            product = self.by_id.get(int(text))
+        if product is not None:
+            return product
+        name = normalize_name(text)
+        return next((p for key, p in self.by_name.items() if name and name in key), None)
+
+    # 以下與 SQLiteCatalogStore 的查詢介面相同，工具以 get_catalog_source 取得其中之一
+
+    def filter_products(self, category, min_price, max_price, min_quantity, max_quantity, sort_by, quantity, deadline_days, spec,
+                        limit: int = None) -> ResultSet:
+        """
+        get_product 的結果：依條件篩選，超過一頁時依熱門度排序
+
+        :param limit: 至少需要的結果數，None 代表全部，見 listing.filter_products
+        """
+        args = (category, min_price, max_price, min_quantity, max_quantity, sort_by, quantity, deadline_days, spec)
+        return popular_first(self, filter_products(self, *args, limit=limit), sort_by)
+
+    def search_products(self, query: str, limit: int = None) -> ResultSet:
+        """
+        search_products_by_keyword 的結果，依 BM25 分數排序
+
+        :param limit: 至少需要的結果數，只取出分數最高的這麼多個；None 代表全部
+        """
+        # 擴充關鍵字，與 get_product 的分類擴展共用同一套規則
+        expanded_keywords = self.taxonomy.expand(query)
+        # 單字的擴展詞（如「包」、「袋」）只比對名稱與分類，避免命中規格中的「包裝」等字樣
+        spec_keywords = [k for k in expanded_keywords if len(k) > 1 or k == query]
+        name_only_keywords = [k for k in expanded_keywords if k not in spec_keywords]
+
+        # 由倒排索引計算 BM25 分數，依分數排序全部命中的商品
+        scores = self.search_index.scores(spec_keywords, name_only_keywords)
+        # 超過一頁時以熱門度加成，相關度相近的商品中較常被訂購的排在前面
+        if len(scores) > PAGE_SIZE:
+            scores = self.popularity.boost(scores)
+        k = len(scores) if limit is None else min(limit, len(scores))
+        return ResultSet(self.search_index.top(scores, k), None, len(scores))
+
+    def correct(self, query: str):
+        return self.fuzzy.correct(query)
+
+    def product_options(self, product_id, kind: str) -> list:
+        """商品的顏色（kind='color'）或規格（kind='specification'）選項"""
+        return {'color': self.colors, 'specification': self.specifications}[kind].get(product_id, [])
+
+    def price_tiers(self, product_id):
+        """商品的數量折扣級距（PriceTiers），沒有級距時為 None"""
+        return self.pricing.tiers.get(product_id)
+
+    def valid_step(self, product_id, quantity: int):
+        return self.delivery.valid_step(product_id, quantity)
+
+    def related_names(self, product_id) -> list:
+        """最常與該商品一起購買的商品名稱"""
+        return [self.products[row]['name'] for row in self.popularity.related(product_id)]
+
+    def products_at(self, rows) -> list:
+        """列號對應的商品"""
+        return [self.products[row] for row in rows]
+
+    def product_ids(self, rows) -> list:
+        return [self.products[row]['id'] for row in rows]
+
+    def product_rows(self, product_ids) -> dict:
+        """{商品ID: 列號}，不在目錄中的商品ID 不列入"""
+        return {product_id: self.rows_by_id[product_id] for product_id in product_ids if product_id in self.rows_by_id}
+
+    def popularity_scores(self):
+        return self.popularity.scores
+
+    def unit_prices(self, quantity: int):
+        return self.pricing.unit_prices(quantity)
+
+    def orderable_mask(self, quantity: int, max_price: float = None, deadline_days: int = None):
+        """可訂購 quantity 個、折扣價不高於 max_price 且（指定期限時）能在期限內交貨的商品"""
+        mask = self.columns.filter_mask(quantity=quantity, prices=self.unit_prices(quantity), max_price=max_price)
+        return mask & self.delivery.deliverable_mask(quantity, deadline_days)
+
+    def term_mask(self, term: str):
+        return self.columns.term_mask(term)
+
+    def rows(self, mask):
+        return self.columns.rows(mask)
+
+    def table(self, rows, unit_prices=None) -> str:
+        return self.renderer.table(rows, unit_prices)
+
+
+def source_version(source_path: str) -> str:
+    """備份檔的目錄版本，Catalog 與 SQLite 檔共用；同義詞資料檔也會影響索引內容，一併納入版本"""
+    synonyms = file_sha256(SYNONYMS_PATH)[:8] if os.path.exists(SYNONYMS_PATH) else "none"
+    if not os.path.exists(source_path):
+        return f"fallback-{synonyms}"
+    return f"{file_sha256(source_path)[:16]}-{synonyms}"
+
+
+def build_catalog(source_path: str = SQL_BACKUP_PATH) -> Catalog:
+    """讀取備份檔並建立完整的 Catalog（含所有索引）"""
+    version = source_version(source_path)
+    return Catalog(
+        load_sql_products(source_path),
+        version,
+        load_quantity_discounts(source_path),
+        load_quantity_ranges(source_path),
+        source_path,
+        load_order_items(source_path),
+        load_change_state(source_path) if INCREMENTAL_REFRESH else None,
+    )
+
+
+def refresh_catalog(catalog: Catalog, source_path: str = SQL_BACKUP_PATH):
+    """
+    以增量方式更新 Catalog：只讀出修改時間晚於上一版 watermark 的資料列並套用。
+
+    無法增量更新（沒有變動追蹤狀態、同義詞資料檔變動、變動或已刪除的商品過多）時回傳 None，
+    由呼叫端改為完整重建。
+    """
+    if catalog.change_state is None or not catalog.products or catalog.source_path != source_path:
+        return None
+    version = source_version(source_path)
+    if version == catalog.version:
+        return catalog
+    # 同義詞會影響所有分類位元圖，變動時完整重建
+    if version.rsplit('-', 1)[-1] != catalog.version.rsplit('-', 1)[-1]:
+        return None
+
+    limit = int(len(catalog.products) * MAX_CHANGE_FRACTION)
+    changes = read_changes(source_path, catalog.change_state, limit)
+    if changes is None:
+        return None
+    if len(catalog.products) - len(catalog) + len(changes.deleted) > limit:
+        # 已刪除的商品累積過多，完整重建以回收列號
+        return None
+    return catalog.patched(changes, version)
+
+
+class CatalogManager:
+    """
+    持有目前生效的 Catalog。
+
+    重新載入時在背景執行緒建立新的 Catalog 與索引，完成後以單一參考
+    置換發布；置換前的查詢繼續使用舊版本。
+    """
+
+    def __init__(self, source_path: str = SQL_BACKUP_PATH, poll_seconds: float = POLL_SECONDS):
+        self.source_path = source_path
+        self.poll_seconds = poll_seconds
+        self._catalog = build_catalog(source_path)
+        self._stat = self._source_stat()
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+
+    @property
+    def current(self) -> Catalog:
+        return self._catalog
+
+    def _source_stat(self):
+        stats = []
+        for path in (self.source_path, SYNONYMS_PATH):
+            try:
+                stat = os.stat(path)
+                stats.append((stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                stats.append(None)
+        return tuple(stats)
+
+    def reload(self, wait: bool = False):
+        """
+        重新建立 Catalog 並原子置換。
+
+        :param wait: True 時在目前執行緒完成重建，否則交給背景執行緒
+        :return: wait 為 True 時回傳新的 Catalog，否則回傳背景執行緒
+        """
+        if wait:
+            return self._reload()
+        thread = threading.Thread(target=self._reload, name="catalog-reload", daemon=True)
+        thread.start()
+        return thread
+
+    def _reload(self):
+        # 同一時間只允許一個重建；排隊中的請求會在前一個完成後讀到最新檔案
+        with self._reload_lock:
+            stat = self._source_stat()
+            catalog = None
+            if INCREMENTAL_REFRESH:
+                try:
+                    catalog = refresh_catalog(self._catalog, self.source_path)
+                except Exception as e:
+                    print(f"增量更新商品目錄失敗，改為完整重建: {e}")
+            try:
+                catalog = catalog or build_catalog(self.source_path)
+            except Exception as e:
+                print(f"重新載入商品目錄失敗，繼續使用版本 {self._catalog.version}: {e}")
+                return self._catalog
+
+            if not catalog.products and self._catalog.products:
+                print("重新載入的商品目錄為空，繼續使用原本的版本")
+                return self._catalog
+
+            self._stat = stat
+            if catalog.version != self._catalog.version:
+                self._catalog = catalog
+                print(f"商品目錄已更新至版本 {catalog.version}，共 {len(catalog)} 個商品")
+            return self._catalog
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_seconds):
+            if self._source_stat() != self._stat:
+                self._reload()
+
+    def start_watching(self):
+        """啟動背景執行緒，輪詢備份檔與同義詞資料檔的大小與修改時間，變動時自動重新載入"""
+        if self.poll_seconds <= 0 or (self._watcher and self._watcher.is_alive()):
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="catalog-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_catalog_manager() -> CatalogManager:
+    """取得全域共用的 CatalogManager，第一次呼叫時載入商品目錄"""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = CatalogManager()
+    return _manager
+
+
+def get_catalog() -> Catalog:
+    return get_catalog_manager().current
+
+
+@lru_cache(maxsize=1)
+def _fallback_catalog() -> Catalog:
+    return Catalog(normalize_fallback_products(FALLBACK_PRODUCTS), 'fallback')
+
+
+def get_active_catalog() -> Catalog:
+    """目前生效的商品目錄；備份檔不存在或沒有商品時改用備用商品資料，所有工具共用"""
+    catalog = get_catalog()
+    return catalog if catalog.products else _fallback_catalog()
@@ -0,0 +1,201 @@
+from .product import normalize_name
+
+# 建議相近分類時的最低相似度（0～1）
+MIN_SIMILARITY = 0.3
+
+
+def _grams(text: str) -> set:
+    """單字與相鄰雙字；中文分類名稱多為二到四字，單字也納入才能比對單字查詢"""
+    return set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein 編輯距離"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i]
+        for j, cb in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def similarity(query: str, name: str, query_grams: set = None, name_grams: set = None) -> float:
+    """
+    兩個已正規化名稱的相似度（0～1）。
+
+    一方包含另一方時依長度比例給分（至少 0.5）；否則取字元 n-gram 的 Dice 係數
+    與編輯距離相似度中較高者。
+    """
+    if not query or not name:
+        return 0.0
+    shorter, longer = sorted((len(query), len(name)))
+    if query in name or name in query:
+        return 0.5 + 0.5 * shorter / longer
+    query_grams = query_grams if query_grams is not None else _grams(query)
+    name_grams = name_grams if name_grams is not None else _grams(name)
+    dice = 2 * len(query_grams & name_grams) / (len(query_grams) + len(name_grams))
+    return max(dice, 1 - edit_distance(query, name) / longer)
+
+
+class CategoryNode:
+    """分類樹的節點"""
+
+    __slots__ = ('id', 'name', 'parent', 'children', 'sorting', 'product_count')
+
+    def __init__(self, id, name, sorting=None):
+        self.id = id
+        self.name = name
+        self.parent = None
+        self.children = []
+        self.sorting = sorting
+        self.product_count = 0
+
+    def path(self) -> str:
+        """由最上層分類到此分類的路徑，例如「文具用品 > 筆」"""
+        names, node = [], self
+        while node is not None:
+            names.append(node.name)
+            node = node.parent
+        return ' > '.join(reversed(names))
+
+    def __repr__(self):
+        return f"CategoryNode({self.id!r}, {self.name!r})"
+
+
+class CategoryTree:
+    """
+    由 categories 資料表建立的分類樹。
+
+    只收錄啟用中（status 不為 0）的商品分類；上層分類停用時，其下的分類一併隱藏。
+    名稱以 normalize_name 正規化後建立雜湊索引，查詢為 O(1)；每個分類的所有
+    子孫分類在建立時先算好。找不到分類時，由字元 n-gram 反向索引取出候選，
+    再依相似度排序回傳相近的分類。
+    """
+
+    def __init__(self, rows: list, product_categories=()):
+        """
+        :param rows: 分類資料，每筆含 id、name、parent_id，可另含 type、status、sorting
+        :param product_categories: 每個商品的分類名稱串列，用來計算各分類的商品數
+        """
+        rows = {
+            row['id']: row for row in rows
+            if (row.get('name') or '').strip() and row.get('type', 'product') in (None, 'product') and row.get('status') != 0
+        }
+
+        # 上層分類不存在或已停用的分類不收錄
+        visible = {}
+
+        def is_visible(category_id, seen=()):
+            if category_id not in visible:
+                row = rows.get(category_id)
+                parent_id = row['parent_id'] if row else None
+                if row is None or category_id in seen:
+                    visible[category_id] = False
+                else:
+                    visible[category_id] = parent_id is None or is_visible(parent_id, seen + (category_id,))
+            return visible[category_id]
+
+        self.by_id = {
+            category_id: CategoryNode(category_id, row['name'].strip(), row.get('sorting'))
+            for category_id, row in rows.items() if is_visible(category_id)
+        }
+        self.roots = []
+        for category_id, node in self.by_id.items():
+            parent_id = rows[category_id]['parent_id']
+            if parent_id is None:
+                self.roots.append(node)
+            else:
+                node.parent = self.by_id[parent_id]
+                node.parent.children.append(node)
+
+        def order(node):
+            return (node.sorting if node.sorting is not None else 0, node.id)
+
+        self.roots.sort(key=order)
+        for node in self.by_id.values():
+            node.children.sort(key=order)
+
+        # 正規化名稱 → 節點；名稱重複時以排序在前的分類為準
+        self.by_name = {}
+        self._descendants = {}
+        for node in self.nodes():
+            self.by_name.setdefault(normalize_name(node.name), node)
+            self._descendants[node.id] = tuple(self._walk(node.children))
+
+        # 商品數：掛在該分類或其任一子孫分類下的商品
+        for categories in product_categories:
+            counted = set()
+            for name in categories:
+                node = self.by_name.get(normalize_name(name))
+                while node is not None and node.id not in counted:
+                    counted.add(node.id)
+                    node.product_count += 1
+                    node = node.parent
+
+        # 字元 n-gram → 分類名稱，供建議相近分類時取出候選
+        self._grams = {name: _grams(name) for name in self.by_name}
+        self._gram_index = {}
+        for name, grams in self._grams.items():
+            for gram in grams:
+                self._gram_index.setdefault(gram, []).append(name)
+
+    @classmethod
+    def from_names(cls, product_categories: list) -> 'CategoryTree':
+        """沒有分類資料表時（備用商品資料），以商品上的分類名稱建立單層分類樹"""
+        names = list(dict.fromkeys(name for categories in product_categories for name in categories))
+        rows = [{'id': i, 'name': name, 'parent_id': None, 'sorting': i} for i, name in enumerate(names, start=1)]
+        return cls(rows, product_categories)
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __contains__(self, name):
+        return self.find(name) is not None
+
+    def _walk(self, nodes):
+        for node in nodes:
+            yield node
+            yield from self._walk(node.children)
+
+    def nodes(self):
+        """依樹狀順序（上層分類在前，同層依 sorting）走訪所有分類"""
+        return self._walk(self.roots)
+
+    def find(self, name: str):
+        """以名稱查詢分類，不分全半形與大小寫；找不到時回傳 None"""
+        return self.by_name.get(normalize_name(str(name)))
+
+    def descendants(self, name: str) -> tuple:
+        """分類底下所有子孫分類的名稱（不含自己）；分類不存在時回傳空 tuple"""
+        node = self.find(name)
+        if node is None:
+            return ()
+        return tuple(child.name for child in self._descendants[node.id])
+
+    def suggest(self, query: str, limit: int = 3, min_similarity: float = MIN_SIMILARITY) -> list:
+        """
+        與查詢詞最相近的分類，依相似度由高到低排序，同分時商品數多的在前。
+
+        短查詢詞打錯一個字時相似度很容易低於門檻（「文俱」之於「文具用品」只有 0.25），
+        沒有分類達到門檻時，改回傳至少有一個字相同、編輯距離最小的一個分類。
+
+        :return: [(CategoryNode, 相似度), ...]
+        """
+        query = normalize_name(str(query))
+        if not query:
+            return []
+        query_grams = _grams(query)
+        candidates = {name for gram in query_grams for name in self._gram_index.get(gram, ())}
+
+        scored, below = [], []
+        for name in candidates:
+            score = similarity(query, name, query_grams, self._grams[name])
+            (scored if score >= min_similarity else below).append((self.by_name[name], score))
+        if not scored and below:
+            below.sort(key=lambda item: (edit_distance(query, normalize_name(item[0].name)), -item[0].product_count, item[0].id))
+            return below[:1]
+        scored.sort(key=lambda item: (-item[1], -item[0].product_count, item[0].id))
+        return scored[:limit]
@@ -0,0 +1,157 @@
+import numpy as np
+from .product import normalize_name
+
+
+class ProductColumns:
+    """
+    以欄為單位保存商品的數值欄位與分類成員位元陣列。
+
+    篩選條件會轉為向量化的布林遮罩，只有最後勝出的列才需要取出商品資料。
+    """
+
+    # 可寫入共用映射檔的陣列欄位，見 shared_arrays
+    ARRAYS = ('price', 'min_qty', 'max_qty', 'name_lower', 'category_bits')
+
+    def __init__(self, products: list, arrays: dict = None):
+        """
+        :param arrays: 已建立好的陣列欄位（例如共用的唯讀映射），None 時由 products 建立
+        """
+        self.category_names = sorted({cat for p in products for cat in p['categories']})
+        self.category_lower = [cat.lower() for cat in self.category_names]
+        if arrays is None:
+            arrays = self.build_arrays(products)
+        for key in self.ARRAYS:
+            setattr(self, key, arrays[key])
+        # 仍在架上的商品；增量更新刪除的商品保留列號，只在此標記
+        self.live = np.ones(len(products), dtype=bool)
+
+    @staticmethod
+    def build_arrays(products: list) -> dict:
+        n = len(products)
+        # 分類成員位元陣列：category_bits[c, i] 表示第 i 個商品屬於第 c 個分類
+        category_names = sorted({cat for p in products for cat in p['categories']})
+        category_index = {cat: c for c, cat in enumerate(category_names)}
+        category_bits = np.zeros((len(category_names), n), dtype=bool)
+        for i, p in enumerate(products):
+            for cat in p['categories']:
+                category_bits[category_index[cat], i] = True
+        return {
+            'price': np.fromiter((p['price'] for p in products), dtype=np.float64, count=n),
+            'min_qty': np.fromiter((p['min_order_quantity'] for p in products), dtype=np.int64, count=n),
+            'max_qty': np.fromiter((p['max_order_quantity'] for p in products), dtype=np.int64, count=n),
+            'name_lower': np.array([p['name'].lower() for p in products], dtype=str),
+            'category_bits': category_bits,
+        }
+
+    def __len__(self):
+        return len(self.price)
+
+    def all(self) -> np.ndarray:
+        return self.live.copy()
+
+    def term_mask(self, term: str) -> np.ndarray:
+        """商品名稱或任一分類包含 term 的商品"""
+        term = term.lower()
+        mask = np.char.find(self.name_lower, term) >= 0
+        matched = [c for c, cat in enumerate(self.category_lower) if term in cat]
+        if matched:
+            mask |= self.category_bits[matched].any(axis=0)
+        return mask
+
+    def category_members(self, names) -> np.ndarray:
+        """屬於任一指定分類的商品；分類名稱需完全相同（不分全半形與大小寫），不做擴展比對"""
+        wanted = {normalize_name(name) for name in names}
+        matched = [c for c, cat in enumerate(self.category_names) if normalize_name(cat) in wanted]
+        if not matched:
+            return np.zeros(len(self), dtype=bool)
+        return self.category_bits[matched].any(axis=0) & self.live
+
+    def filter_mask(
+        self,
+        category_mask: np.ndarray = None,
+        min_price: float = None,
+        max_price: float = None,
+        min_quantity: int = None,
+        max_quantity: int = None,
+        quantity: int = None,
+        prices: np.ndarray = None
+    ) -> np.ndarray:
+        """
+        組合分類、價格與數量條件的布林遮罩。
+
+        :param category_mask: 分類位元圖，見 Taxonomy.mask
+        :param min_quantity: 商品最低訂購量需不高於此值
+        :param max_quantity: 商品最高訂購量需不低於此值
+        :param quantity: 購買數量需介於商品最低與最高訂購量之間
+        :param prices: 取代原價做價格比較的單價陣列，例如數量級距折扣價
+        """
+        if prices is None:
+            prices = self.price
+        mask = self.all()
+        if category_mask is not None:
+            mask &= category_mask
+        if min_price is not None:
+            mask &= prices >= min_price
+        if max_price is not None:
+            mask &= prices <= max_price
+        if min_quantity is not None:
+            mask &= self.min_qty <= min_quantity
+        if max_quantity is not None:
+            mask &= self.max_qty >= max_quantity
+        if quantity is not None:
+            mask &= (self.min_qty <= quantity) & (self.max_qty >= quantity)
+        return mask
+
+    def rows(self, mask: np.ndarray) -> np.ndarray:
+        """遮罩為 True 的列號，依原始順序排列"""
+        return np.flatnonzero(mask)
+
+    def patched(self, products: list, rows, deleted_rows=()) -> 'ProductColumns':
+        """
+        套用增量更新，回傳新的 ProductColumns；原本的物件不變，進行中的查詢不受影響。
+
+        :param products: 更新後的完整商品串列，新增的商品接在尾端
+        :param rows: 內容有變動的列號（含新增的列）
+        :param deleted_rows: 已刪除的列號
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        n, old_n = len(products), len(self)
+        changed = [products[row] for row in rows.tolist()]
+
+        new = ProductColumns.__new__(ProductColumns)
+        new.category_names = list(self.category_names)
+        known = set(new.category_names)
+        for product in changed:
+            for cat in product['categories']:
+                if cat not in known:
+                    known.add(cat)
+                    new.category_names.append(cat)
+        new.category_lower = [cat.lower() for cat in new.category_names]
+        category_index = {cat: c for c, cat in enumerate(new.category_names)}
+
+        def extend(array, dtype=None):
+            out = np.zeros(n, dtype=dtype or array.dtype)
+            out[:old_n] = array
+            return out
+
+        new.price = extend(self.price)
+        new.min_qty = extend(self.min_qty)
+        new.max_qty = extend(self.max_qty)
+        width = max([self.name_lower.dtype.itemsize // 4] + [len(p['name']) for p in changed])
+        new.name_lower = extend(self.name_lower, f'<U{max(width, 1)}')
+        new.category_bits = np.zeros((len(new.category_names), n), dtype=bool)
+        new.category_bits[:self.category_bits.shape[0], :old_n] = self.category_bits
+        new.live = extend(self.live)
+
+        if len(rows):
+            new.price[rows] = [p['price'] for p in changed]
+            new.min_qty[rows] = [p['min_order_quantity'] for p in changed]
+            new.max_qty[rows] = [p['max_order_quantity'] for p in changed]
+            new.name_lower[rows] = [p['name'].lower() for p in changed]
+            new.category_bits[:, rows] = False
+            for row, product in zip(rows.tolist(), changed):
+                for cat in product['categories']:
+                    new.category_bits[category_index[cat], row] = True
+            new.live[rows] = True
+        new.live[np.asarray(deleted_rows, dtype=np.int64)] = False
+        return new
@@ -0,0 +1,140 @@
+import numpy as np
+
+
+class DeliveryIndex:
+    """
+    可訂購數量與交期的區間索引。
+
+    兩組區間都依起點排序存成欄位陣列：查詢數量 N 時先以二分搜尋取出起點
+    不大於 N 的前綴，再向量化檢查終點、遞增單位與交期。
+
+    - 數量區間（product_quantity_ranges）：落在某區間內的數量必須是
+      「區間最小值 + 遞增單位的倍數」；不在任何區間內的數量不受限制，
+      仍以商品的最低、最高訂購量為準。
+    - 交期（quantity_discounts.lead_time_days）：取涵蓋 N 的折扣級距交期；
+      沒有級距涵蓋的商品視為交期未知，指定期限時不列入。未指定數量時，
+      以各商品的最低訂購量查詢交期。
+    """
+
+    def __init__(self, products: list, quantity_ranges: dict, pricing):
+        rows = {product['id']: row for row, product in enumerate(products)}
+        self.size = len(products)
+        self.min_quantities = np.array([p['min_order_quantity'] for p in products], dtype=np.int64)
+
+        ranges = [
+            (r['min_quantity'], r['max_quantity'], r['increment_step'] or 1, rows[product_id])
+            for product_id, product_ranges in quantity_ranges.items() if product_id in rows
+            for r in product_ranges
+        ]
+        ranges.sort()
+        self._range_starts = np.array([r[0] for r in ranges], dtype=np.int64)
+        self._range_ends = np.array([r[1] for r in ranges], dtype=np.int64)
+        self._range_steps = np.array([r[2] for r in ranges], dtype=np.int64)
+        self._range_rows = np.array([r[3] for r in ranges], dtype=np.int64)
+
+        segments = [
+            (start, end, tier.lead_time_days, rows[product_id])
+            for product_id, tiers in pricing.tiers.items()
+            for start, end, tier in zip(tiers.starts, tiers.ends, tiers.segments)
+        ]
+        segments.sort()
+        self._lead_starts = np.array([s[0] for s in segments], dtype=np.int64)
+        self._lead_ends = np.array([s[1] for s in segments], dtype=np.int64)
+        self._lead_days = np.array([s[2] for s in segments], dtype=np.int64)
+        self._lead_rows = np.array([s[3] for s in segments], dtype=np.int64)
+
+        self.ranges = {}
+        for start, end, step, row in ranges:
+            self.ranges.setdefault(products[row]['id'], []).append((start, end, step))
+
+    def step_mask(self, quantity: int) -> np.ndarray:
+        """數量符合遞增單位的商品"""
+        mask = np.ones(self.size, dtype=bool)
+        stop = int(np.searchsorted(self._range_starts, quantity, side='right'))
+        inside = self._range_ends[:stop] >= quantity
+        bad = inside & ((quantity - self._range_starts[:stop]) % self._range_steps[:stop] != 0)
+        mask[self._range_rows[:stop][bad]] = False
+        return mask
+
+    def lead_times(self, quantity: int = None) -> np.ndarray:
+        """訂購 quantity 個（未指定時為各商品最低訂購量）時每個商品的交期天數，未知為 -1"""
+        days = np.full(self.size, -1, dtype=np.int64)
+        if quantity is None:
+            wanted = self.min_quantities[self._lead_rows]
+            hit = (self._lead_starts <= wanted) & (self._lead_ends >= wanted)
+            days[self._lead_rows[hit]] = self._lead_days[hit]
+            return days
+        stop = int(np.searchsorted(self._lead_starts, quantity, side='right'))
+        hit = self._lead_ends[:stop] >= quantity
+        days[self._lead_rows[:stop][hit]] = self._lead_days[:stop][hit]
+        return days
+
+    def deliverable_mask(self, quantity: int = None, deadline_days: int = None) -> np.ndarray:
+        """能以合法遞增單位訂購 quantity 個，且（指定期限時）在 deadline_days 天內交貨的商品"""
+        mask = self.step_mask(quantity) if quantity is not None else np.ones(self.size, dtype=bool)
+        if deadline_days is not None:
+            days = self.lead_times(quantity)
+            mask &= (days >= 0) & (days <= deadline_days)
+        return mask
+
+    def valid_step(self, product_id, quantity: int):
+        """單一商品的遞增單位檢查，符合時回傳 None，否則回傳應遵守的遞增單位"""
+        for start, end, step in self.ranges.get(product_id, ()):
+            if start <= quantity <= end and (quantity - start) % step:
+                return step
+        return None
+
+    def patched(self, products: list, quantity_ranges: dict, pricing, rows_by_id: dict, rows) -> 'DeliveryIndex':
+        """
+        套用增量更新，回傳新的 DeliveryIndex。
+
+        :param products: 更新後的完整商品串列
+        :param quantity_ranges: 有變動商品的完整數量區間 {商品ID: [區間資料, ...]}，空串列代表已無限制
+        :param pricing: 更新後的 PricingEngine，交期取自其級距
+        :param rows_by_id: {商品ID: 列號}
+        :param rows: 內容有變動的列號（含新增的列），其交期由 pricing 重新取出
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        new = DeliveryIndex.__new__(DeliveryIndex)
+        new.size = len(products)
+        new.min_quantities = np.zeros(new.size, dtype=np.int64)
+        new.min_quantities[:self.size] = self.min_quantities
+        new.min_quantities[rows] = [products[row]['min_order_quantity'] for row in rows.tolist()]
+
+        range_rows = [rows_by_id[product_id] for product_id in quantity_ranges if product_id in rows_by_id]
+        keep = ~np.isin(self._range_rows, range_rows)
+        ranges = [
+            (r['min_quantity'], r['max_quantity'], r['increment_step'] or 1, rows_by_id[product_id])
+            for product_id, product_ranges in quantity_ranges.items() if product_id in rows_by_id
+            for r in product_ranges
+        ]
+        starts = np.concatenate([self._range_starts[keep], np.array([r[0] for r in ranges], dtype=np.int64)])
+        ends = np.concatenate([self._range_ends[keep], np.array([r[1] for r in ranges], dtype=np.int64)])
+        steps = np.concatenate([self._range_steps[keep], np.array([r[2] for r in ranges], dtype=np.int64)])
+        range_row_array = np.concatenate([self._range_rows[keep], np.array([r[3] for r in ranges], dtype=np.int64)])
+        order = np.lexsort((range_row_array, steps, ends, starts))
+        new._range_starts, new._range_ends = starts[order], ends[order]
+        new._range_steps, new._range_rows = steps[order], range_row_array[order]
+
+        keep = ~np.isin(self._lead_rows, rows)
+        segments = [
+            (start, end, tier.lead_time_days, row)
+            for row in rows.tolist()
+            for tiers in [pricing.tiers.get(products[row]['id'])] if tiers
+            for start, end, tier in zip(tiers.starts, tiers.ends, tiers.segments)
+        ]
+        starts = np.concatenate([self._lead_starts[keep], np.array([s[0] for s in segments], dtype=np.int64)])
+        ends = np.concatenate([self._lead_ends[keep], np.array([s[1] for s in segments], dtype=np.int64)])
+        days = np.concatenate([self._lead_days[keep], np.array([s[2] for s in segments], dtype=np.int64)])
+        lead_rows = np.concatenate([self._lead_rows[keep], np.array([s[3] for s in segments], dtype=np.int64)])
+        order = np.lexsort((lead_rows, days, ends, starts))
+        new._lead_starts, new._lead_ends, new._lead_days, new._lead_rows = starts[order], ends[order], days[order], lead_rows[order]
+
+        new.ranges = dict(self.ranges)
+        for product_id in quantity_ranges:
+            new.ranges.pop(product_id, None)
+        for start, end, step, row in ranges:
+            new.ranges.setdefault(products[row]['id'], []).append((start, end, step))
+        for product_id in new.ranges.keys() & quantity_ranges.keys():
+            new.ranges[product_id].sort()
+        return new
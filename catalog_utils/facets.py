@@ -0,0 +1,60 @@
+import numpy as np
+
+# 可篩選的規格面向：面向名稱 → 選項值所在欄位
+FACET_FIELDS = {
+    'color': 'color_name',
+    'specification': 'specification_name',
+}
+
+
+class FacetIndex:
+    """
+    顏色與規格選項的反向索引：選項值 → 商品位元圖。
+
+    選項包含查詢值即算命中（如「藍」對應「天空藍」、「寶藍」）；
+    沒有任何選項命中時，改找被查詢值包含的選項（如「藍色」對應「藍」）。
+    命中的位元圖取聯集。
+    """
+
+    def __init__(self, products: list, tables: dict):
+        rows = {product['id']: row for row, product in enumerate(products)}
+        self.size = len(products)
+
+        # bitmaps[facet][選項值（小寫）] = 商品位元圖
+        self.bitmaps = {facet: {} for facet in FACET_FIELDS}
+        for facet, field in FACET_FIELDS.items():
+            index = self.bitmaps[facet]
+            for product_id, options in tables.get(facet, {}).items():
+                row = rows.get(product_id)
+                if row is None:
+                    continue
+                for option in options:
+                    value = (option.get(field) or '').strip().lower()
+                    if not value:
+                        continue
+                    bitmap = index.get(value)
+                    if bitmap is None:
+                        bitmap = index[value] = np.zeros(self.size, dtype=bool)
+                    bitmap[row] = True
+
+        for index in self.bitmaps.values():
+            for bitmap in index.values():
+                bitmap.flags.writeable = False
+
+    def values(self, facet: str) -> list:
+        """某面向的所有選項值"""
+        return sorted(self.bitmaps[facet])
+
+    def mask(self, query: str, facets: tuple = tuple(FACET_FIELDS)) -> np.ndarray:
+        """任一指定面向有選項符合 query 的商品位元圖"""
+        query = query.strip().lower()
+        mask = np.zeros(self.size, dtype=bool)
+        if not query:
+            return mask
+        options = [item for facet in facets for item in self.bitmaps[facet].items()]
+        matched = [bitmap for value, bitmap in options if query in value]
+        if not matched:
+            matched = [bitmap for value, bitmap in options if value in query]
+        for bitmap in matched:
+            mask |= bitmap
+        return mask
@@ -0,0 +1,379 @@
+# 備用商品資料：備份檔不存在或無法解析時，工具改用這些商品
+FALLBACK_PRODUCTS = [
+    {
+        "name": "電鍍圓珠筆",
+        "category": ["文具", "辦公用品", "配件飾品"],
+        "price": 20.00,
+        "spec": "黑筆芯,藍筆芯",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "PU束繩記事本",
+        "category": ["文具", "辦公用品", "生活雜貨"],
+        "price": 200.00,
+        "spec": "A5",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "不銹鋼杯",
+        "category": ["杯瓶餐具", "生活雜貨", "家居"],
+        "price": 160.00,
+        "spec": "300ml, ",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "珪藻土折疊墊",
+        "category": ["家居", "生活雜貨", "杯瓶餐具"],
+        "price": 300.00,
+        "spec": "30x40cm",
+        "min_quantity": 100,
+        "max_quantity": 3000
+    },
+    {
+        "name": "黑桃木相框",
+        "category": ["家居", "生活雜貨", "配件飾品", "春節"],
+        "price": 160.00,
+        "spec": "5吋",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "密碼鎖收納包",
+        "category": ["包袋收納", "生活雜貨", "配件飾品"],
+        "price": 250.00,
+        "spec": "牛津布",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "中型收納箱",
+        "category": ["包袋收納", "家居", "生活雜貨"],
+        "price": 400.00,
+        "spec": "中型",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "鋁製筆筒",
+        "category": ["辦公用品", "文具", "生活雜貨"],
+        "price": 180.00,
+        "spec": "圓",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "皮革筆袋",
+        "category": ["文具", "配件飾品", "生活雜貨"],
+        "price": 50.00,
+        "spec": "隨身款",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "帆布托特包",
+        "category": ["包袋收納", "生活雜貨", "配件飾品"],
+        "price": 160.00,
+        "spec": "帆布",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "皮革鑰匙圈",
+        "category": ["配件飾品", "生活雜貨"],
+        "price": 25.00,
+        "spec": "單一規格",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "皮革隨身鏡",
+        "category": ["配件飾品", "生活雜貨"],
+        "price": 25.00,
+        "spec": "單一規格",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "行李吊牌",
+        "category": ["配件飾品", "包袋收納", "生活雜貨"],
+        "price": 40.00,
+        "spec": "皮革",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "短襪",
+        "category": ["衣物配件", "生活雜貨"],
+        "price": 135.00,
+        "spec": "短襪",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "毛帽",
+        "category": ["衣物配件", "生活雜貨"],
+        "price": 170.00,
+        "spec": "反折",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "帆布零錢包",
+        "category": ["包袋收納", "配件飾品", "生活雜貨"],
+        "price": 95.00,
+        "spec": "帆布",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "棒球帽",
+        "category": ["衣物配件", "配件飾品", "生活雜貨"],
+        "price": 160.00,
+        "spec": "金屬釦調節",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "直傘",
+        "category": ["生活雜貨", "配件飾品"],
+        "price": 220.00,
+        "spec": "直傘",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "手動折疊傘",
+        "category": ["生活雜貨", "配件飾品"],
+        "price": 230.00,
+        "spec": "手動",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "金屬圓珠筆",
+        "category": ["文具", "辦公用品"],
+        "price": 25.00,
+        "spec": "單一規格",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "商務金屬圓珠筆",
+        "category": ["文具", "辦公用品"],
+        "price": 25.00,
+        "spec": "單一規格",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "INKSLAP 筆記本",
+        "category": ["文具", "辦公用品", "生活雜貨"],
+        "price": 250.00,
+        "spec": "印刷",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "環保杯 800mL ",
+        "category": ["杯瓶餐具", "生活雜貨", "家居", "環保"],
+        "price": 750.00,
+        "spec": "環保材質,不銹鋼",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "帥氣Hoodie",
+        "category": ["衣物配件", "生活雜貨"],
+        "price": 600.00,
+        "spec": "不織布",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "衛浴三件組",
+        "category": ["家居", "生活雜貨"],
+        "price": 400.00,
+        "spec": "三件組",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "燈芯絨兩用包",
+        "category": ["包袋收納", "生活雜貨"],
+        "price": 300.00,
+        "spec": "燈芯絨",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "網格收納包",
+        "category": ["包袋收納", "生活雜貨"],
+        "price": 130.00,
+        "spec": "雙面斜紋布",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "針織毛帽",
+        "category": ["衣物配件", "生活雜貨"],
+        "price": 270.00,
+        "spec": "大布標",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "舒眠眼罩",
+        "category": ["配件飾品", "生活雜貨"],
+        "price": 230.00,
+        "spec": "單一規格",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "寬頭牙刷",
+        "category": ["生活雜貨", "家居"],
+        "price": 25.00,
+        "spec": "配色",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "不鏽鋼便當盒",
+        "category": ["杯瓶餐具", "家居", "生活雜貨"],
+        "price": 510.00,
+        "spec": "單一規格",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "環保便當盒",
+        "category": ["杯瓶餐具", "家居", "生活雜貨", "環保"],
+        "price": 95.00,
+        "spec": "單一規格附餐具",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "矽膠保鮮便當盒",
+        "category": ["杯瓶餐具", "家居", "生活雜貨"],
+        "price": 200.00,
+        "spec": "食用級矽膠",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "藝術玻璃花瓶",
+        "category": ["家居", "生活雜貨", "配件飾品"],
+        "price": 225.00,
+        "spec": "長款",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "藝術玻璃花瓶",
+        "category": ["家居", "生活雜貨", "配件飾品"],
+        "price": 225.00,
+        "spec": "短款",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "壓克力繽紛杯墊",
+        "category": ["杯瓶餐具", "生活雜貨", "家居", "春節"],
+        "price": 30.00,
+        "spec": "直徑9.8cm",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "黑胡桃禪風卵石杯墊",
+        "category": ["杯瓶餐具", "生活雜貨", "家居", "春節"],
+        "price": 270.00,
+        "spec": "大",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "黑胡桃置物盤",
+        "category": ["家居", "生活雜貨", "中秋節", "端午節"],
+        "price": 610.00,
+        "spec": "小型",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "莫蘭迪硅膠餐墊",
+        "category": ["杯瓶餐具", "生活雜貨", "家居", "中秋節", "端午節"],
+        "price": 50.00,
+        "spec": "直徑16cm",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "磁吸拼圖餐墊",
+        "category": ["杯瓶餐具", "生活雜貨", "家居", "中秋節", "端午節"],
+        "price": 140.00,
+        "spec": "拼圖三件組",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "環保洗碗布",
+        "category": ["家居", "生活雜貨", "杯瓶餐具", "中秋節", "端午節", "環保"],
+        "price": 40.00,
+        "spec": "19x19cm",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "筷子",
+        "category": ["杯瓶餐具", "家居", "生活雜貨", "中秋節", "端午節", "春節", "台灣特色"],
+        "price": 40.00,
+        "spec": "單一規格",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "便條紙",
+        "category": ["文具", "辦公用品"],
+        "price": 14.00,
+        "spec": "單一規格",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "皮革文件夾",
+        "category": ["文具", "辦公用品"],
+        "price": 90.00,
+        "spec": "單一規格",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "環保中性筆",
+        "category": ["文具", "辦公用品", "環保"],
+        "price": 45.00,
+        "spec": "黑色筆芯",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "堆堆中性筆",
+        "category": ["文具", "辦公用品"],
+        "price": 45.00,
+        "spec": "黑色筆芯",
+        "min_quantity": 1,
+        "max_quantity": 10
+    },
+    {
+        "name": "原字筆",
+        "category": ["文具", "辦公用品"],
+        "price": 50.00,
+        "spec": "黑筆芯",
+        "min_quantity": 1,
+        "max_quantity": 10
+    }
+]
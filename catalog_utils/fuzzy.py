@@ -0,0 +1,156 @@
+import os
+import re
+from .category_tree import edit_distance
+from .product import normalize_name
+
+# 收錄的中文詞段長度上限
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = int(os.getenv("INKSLAP_FUZZY_MAX_TERM_LENGTH", "6"))
+
+# 長度達此值的詞（多為英文或型號）容許兩個錯字，其餘只容許一個
+LONG_TERM_LENGTH = 7
+
+# 中日韓文字的連續片段；其餘文字與數字依空白、標點切開成整個詞
+_CJK_RE = re.compile(r'[㐀-鿿豈-﫿]+|[^\W_㐀-鿿豈-﫿]+')
+
+
+def normalize_text(text: str) -> str:
+    """搜尋比對用的正規化，與 normalize_name 相同：全半形統一、不分大小寫、合併空白"""
+    return normalize_name(text)
+
+
+def _is_cjk(token: str) -> bool:
+    return '㐀' <= token[0] <= '鿿' or '豈' <= token[0] <= '﫿'
+
+
+def text_terms(text: str) -> set:
+    """
+    已正規化文字中可作為更正目標的詞彙。
+
+    商品名稱沒有斷詞，中文只取每段的結尾片段（商品種類，如「環保金屬圓珠筆」的「圓珠筆」、
+    「金屬圓珠筆」）與開頭兩字（材質、用途，如「環保」）；取所有片段會收錄「環保金」這類
+    跨詞的片段，成為錯誤的更正結果。英文、數字取整個詞。
+    """
+    terms = set()
+    for token in _CJK_RE.findall(text):
+        if len(token) < MIN_TERM_LENGTH:
+            continue
+        if _is_cjk(token):
+            terms.update(token[-size:] for size in range(MIN_TERM_LENGTH, min(MAX_TERM_LENGTH, len(token)) + 1))
+            terms.add(token[:MIN_TERM_LENGTH])
+        else:
+            terms.add(token)
+    return terms
+
+
+def max_distance(term: str) -> int:
+    return 2 if len(term) >= LONG_TERM_LENGTH else 1
+
+
+def _deletes(term: str, distance: int) -> set:
+    """刪去最多 distance 個字元後的所有字串（含原字串）"""
+    results, frontier = {term}, {term}
+    for _ in range(distance):
+        frontier = {t[:i] + t[i + 1:] for t in frontier for i in range(len(t)) if len(t) > 1}
+        results |= frontier
+    return results
+
+
+def term_frequencies(products, extra_terms=()) -> dict:
+    """
+    商品名稱與分類中的詞彙 → 出現的商品數；extra_terms 為其他可搜尋到結果的詞（如同義詞），至少為 1
+    """
+    frequency = {}
+    for product in products:
+        terms = text_terms(normalize_text(product['name']))
+        for category in product['categories']:
+            category = normalize_text(category)
+            terms |= text_terms(category)
+            terms.add(category)
+        for term in terms:
+            frequency[term] = frequency.get(term, 0) + 1
+    for term in extra_terms:
+        term = normalize_text(term)
+        if len(term) >= MIN_TERM_LENGTH:
+            frequency.setdefault(term, 1)
+    return frequency
+
+
+def expansion_terms(*groups) -> list:
+    """同義詞表、分類擴展表等 {詞: [擴展詞, ...]} 中的所有詞，作為 term_frequencies 的 extra_terms"""
+    return [term for group in groups for key, values in group.items() for term in (key, *values)]
+
+
+def delete_pairs(terms):
+    """每個詞彙刪除後的字串，[(刪除後的字串, 詞彙), ...]"""
+    return [(key, term) for term in terms for key in _deletes(term, max_distance(term))]
+
+
+class FuzzyIndex:
+    """
+    商品名稱與分類詞彙的 SymSpell 刪除字典，用來更正打錯的搜尋詞。
+
+    每個詞彙在建立時先算出刪去一到兩個字元的所有變化，對應回原詞；查詢時只需
+    對查詢詞做同樣的刪除並查表，取得的候選數與詞彙量無關。錯一字（替換）、
+    多一字、少一字都會在刪除後相遇，再以編輯距離確認。文字先以 normalize_text
+    統一全半形與大小寫，只在建立與查詢時各做一次。
+
+    詞彙與刪除字典只透過 _frequencies、_candidates 讀取，子類別可改由其他儲存位置提供。
+    """
+
+    def __init__(self, products: list, extra_terms=()):
+        """
+        :param extra_terms: 其他可搜尋到結果的詞（如同義詞），一併收錄
+        """
+        # 詞彙 → 出現的商品數
+        self.frequency = term_frequencies(products, extra_terms)
+        # 刪除後的字串 → 詞彙
+        self._deletes = {}
+        for key, term in delete_pairs(self.frequency):
+            self._deletes.setdefault(key, []).append(term)
+
+    def _frequencies(self, terms) -> dict:
+        """已收錄的詞彙與其出現的商品數"""
+        return {term: self.frequency[term] for term in terms if term in self.frequency}
+
+    def _candidates(self, keys) -> set:
+        """刪除後的字串對應的詞彙"""
+        return {term for key in keys for term in self._deletes.get(key, ())}
+
+    def __contains__(self, term):
+        return bool(self._frequencies([normalize_text(term)]))
+
+    def lookup(self, term: str, limit: int = 3) -> list:
+        """
+        與詞最相近的詞彙，依編輯距離、長度差、出現的商品數排序。
+
+        :return: [(詞彙, 編輯距離), ...]；詞本身已收錄時只回傳它自己
+        """
+        term = normalize_text(term)
+        if term in self:
+            return [(term, 0)]
+        if len(term) < MIN_TERM_LENGTH:
+            return []
+        distance = max_distance(term)
+        frequency = self._frequencies(self._candidates(_deletes(term, distance)))
+
+        scored = []
+        for candidate, count in frequency.items():
+            d = edit_distance(term, candidate)
+            if d <= min(distance, max_distance(candidate)):
+                scored.append((d, abs(len(candidate) - len(term)), -count, candidate))
+        scored.sort()
+        return [(candidate, d) for d, _, _, candidate in scored[:limit]]
+
+    def correct(self, query: str):
+        """
+        更正查詢中打錯的詞；以空白分隔的每個詞分別更正。
+
+        :return: 更正後的查詢，沒有可更正的詞時回傳 None
+        """
+        words = normalize_text(query).split()
+        corrected = []
+        for word in words:
+            matches = self.lookup(word, limit=1)
+            corrected.append(matches[0][0] if matches else word)
+        return ' '.join(corrected) if corrected != words else None
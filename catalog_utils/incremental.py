@@ -0,0 +1,187 @@
+import os
+import zlib
+from collections import namedtuple
+from .loader import QUANTITY_DISCOUNT_FIELDS, QUANTITY_RANGE_FIELDS, product_from_row
+from .snapshot import load_or_build
+from .sql_dump import iter_row_headers, parse_row
+
+# 設為 0 時備份檔變動一律完整重建 Catalog
+INCREMENTAL_REFRESH = os.getenv("INKSLAP_INCREMENTAL_REFRESH", "1") != "0"
+
+# 變動（含刪除）的商品超過此比例，或已刪除商品累積超過此比例時，改為完整重建
+MAX_CHANGE_FRACTION = float(os.getenv("INKSLAP_INCREMENTAL_MAX_FRACTION", "0.2"))
+
+# 以 product_id 關聯商品的資料表，其資料列變動時該商品需要重新載入
+CHILD_TABLES = ('product_categories', 'quantity_discounts', 'product_quantity_ranges')
+
+TABLES = ('categories', 'products') + CHILD_TABLES + ('order_items',)
+
+# 快速掃描時由資料列開頭取出的整數欄位
+LEADING = {
+    'categories': ('id',),
+    'products': ('id',),
+    'product_categories': ('id', 'product_id', 'category_id'),
+    'quantity_discounts': ('id', 'product_id'),
+    'product_quantity_ranges': ('id', 'product_id'),
+    'order_items': ('id',),
+}
+
+# 某一版本備份檔的變動追蹤狀態：
+# watermark：最晚的修改時間；product_ids：所有商品ID；
+# children：{資料表: {商品ID: 資料列ID tuple}}；categories：{分類ID: 修改時間}；
+# category_links：{分類ID: 商品ID frozenset}；order_items：訂單明細的 (筆數, ID 總和, 最晚修改時間)；
+# at_watermark：修改時間等於 watermark 的資料列 {(資料表, 資料列ID): CRC32}
+ChangeState = namedtuple('ChangeState', ['watermark', 'product_ids', 'children', 'categories', 'category_links', 'order_items', 'at_watermark'])
+
+# 兩個版本之間的差異：upserts 為 {商品ID: Product}；deleted 為已刪除的商品ID；
+# quantity_discounts、quantity_ranges 為變動商品的完整資料（已無資料的商品對應空串列）
+ChangeSet = namedtuple('ChangeSet', ['upserts', 'deleted', 'quantity_discounts', 'quantity_ranges', 'order_items_changed', 'state'])
+
+
+def _headers(source_path: str, tables):
+    """快速掃描並補齊開頭欄位；開頭欄位不是整數時退回完整解析該列"""
+    for table, columns, head, changed_at, raw in iter_row_headers(source_path, tables, LEADING):
+        if any(value is None for value in head.values()):
+            row = dict(zip(columns, parse_row(raw)))
+            head = {name: row.get(name) for name in head}
+        yield table, columns, head, changed_at, raw
+
+
+def _is_changed(table, head, changed_at, raw, previous) -> bool:
+    # 沒有修改時間的資料列無法判斷，視為有變動；與上一版 watermark 同一秒的資料列
+    # 可能在上一份備份之後才修改，內容與當時不同才算變動
+    if changed_at is None or changed_at > previous.watermark:
+        return True
+    if changed_at < previous.watermark:
+        return False
+    return previous.at_watermark.get((table, head['id'])) != zlib.crc32(raw)
+
+
+def scan_changes(source_path: str, previous: ChangeState = None):
+    """
+    以快速掃描取得備份檔的變動追蹤狀態，不完整解析資料列。
+
+    :param previous: 上一個版本的 ChangeState；提供時一併回傳其 watermark 之後有變動的商品與分類
+    :return: (ChangeState, 有變動的商品ID set, 有變動的分類ID set)
+    """
+    watermark = None
+    product_ids = set()
+    children = {table: {} for table in CHILD_TABLES}
+    categories, category_links = {}, {}
+    order_count, order_id_sum, order_watermark = 0, 0, None
+    touched, touched_categories = set(), set()
+    at_watermark = {}
+
+    for table, _, head, changed_at, raw in _headers(source_path, TABLES):
+        if changed_at is not None and (watermark is None or changed_at >= watermark):
+            if changed_at != watermark:
+                watermark = changed_at
+                at_watermark = {}
+            at_watermark[(table, head['id'])] = zlib.crc32(raw)
+        changed = previous is not None and (previous.watermark is None or _is_changed(table, head, changed_at, raw, previous))
+
+        if table == 'products':
+            product_ids.add(head['id'])
+            if changed:
+                touched.add(head['id'])
+        elif table == 'categories':
+            categories[head['id']] = changed_at
+            if changed:
+                touched_categories.add(head['id'])
+        elif table == 'order_items':
+            order_count += 1
+            order_id_sum += head['id'] or 0
+            if changed_at is not None and (order_watermark is None or changed_at > order_watermark):
+                order_watermark = changed_at
+        else:
+            product_id = head['product_id']
+            children[table].setdefault(product_id, []).append(head['id'])
+            if table == 'product_categories':
+                category_links.setdefault(head['category_id'], set()).add(product_id)
+            if changed:
+                touched.add(product_id)
+
+    state = ChangeState(
+        watermark=watermark,
+        product_ids=frozenset(product_ids),
+        children={table: {pid: tuple(ids) for pid, ids in rows.items()} for table, rows in children.items()},
+        categories=categories,
+        category_links={cid: frozenset(pids) for cid, pids in category_links.items()},
+        order_items=(order_count, order_id_sum, order_watermark),
+        at_watermark=at_watermark,
+    )
+    return state, touched, touched_categories
+
+
+def load_change_state(source_path: str) -> ChangeState:
+    """備份檔的變動追蹤狀態，同一版本的備份只掃描一次"""
+    if not os.path.exists(source_path):
+        return None
+    return load_or_build(source_path, 'change_state', lambda: scan_changes(source_path)[0])
+
+
+def read_changes(source_path: str, previous: ChangeState, max_changes: int = None):
+    """
+    讀出備份檔相對於上一個版本的變動商品。
+
+    第一次掃描只比對修改時間與資料列ID，找出有變動、新增或刪除的商品；
+    第二次掃描只完整解析這些商品的資料列。分類被改名或刪除時，其下的商品一併重新載入。
+
+    :param previous: 上一個版本的 ChangeState
+    :param max_changes: 變動商品數上限，超過時回傳 None（改為完整重建較划算）
+    :return: ChangeSet，或 None
+    """
+    state, touched, touched_categories = scan_changes(source_path, previous)
+
+    deleted = previous.product_ids - state.product_ids
+    touched |= state.product_ids - previous.product_ids
+
+    # 子資料表有資料列新增或刪除的商品（刪除的資料列沒有修改時間可比對）
+    for table in CHILD_TABLES:
+        old, new = previous.children[table], state.children[table]
+        touched.update(pid for pid in old.keys() | new.keys() if old.get(pid) != new.get(pid))
+
+    touched_categories |= previous.categories.keys() ^ state.categories.keys()
+    for category_id in touched_categories:
+        touched |= previous.category_links.get(category_id, frozenset())
+        touched |= state.category_links.get(category_id, frozenset())
+
+    touched = (touched & state.product_ids) - deleted
+    if max_changes is not None and len(touched) + len(deleted) > max_changes:
+        return None
+
+    categories, product_categories, product_rows = {}, {}, {}
+    discounts = {pid: [] for pid in touched | deleted}
+    ranges = {pid: [] for pid in touched | deleted}
+    if touched:
+        for table, columns, head, _, raw in _headers(source_path, ('categories', 'products') + CHILD_TABLES):
+            if table == 'categories':
+                row = dict(zip(columns, parse_row(raw)))
+                categories[row['id']] = row['name']
+                continue
+            product_id = head['id'] if table == 'products' else head['product_id']
+            if product_id not in touched:
+                continue
+            row = dict(zip(columns, parse_row(raw)))
+            if table == 'products':
+                product_rows[product_id] = row
+            elif table == 'product_categories':
+                product_categories.setdefault(product_id, []).append(row['category_id'])
+            elif table == 'quantity_discounts':
+                discounts[product_id].append({field: row.get(field) for field in QUANTITY_DISCOUNT_FIELDS})
+            else:
+                ranges[product_id].append({field: row.get(field) for field in QUANTITY_RANGE_FIELDS})
+
+    # 分類名稱在掃描完才齊全，與 parse_sql_products 相同，略過不存在的分類
+    upserts = {
+        pid: product_from_row(row, [categories[c] for c in product_categories[pid] if c in categories] if pid in product_categories else None)
+        for pid, row in product_rows.items()
+    }
+    return ChangeSet(
+        upserts=upserts,
+        deleted=deleted,
+        quantity_discounts=discounts,
+        quantity_ranges=ranges,
+        order_items_changed=state.order_items != previous.order_items,
+        state=state,
+    )
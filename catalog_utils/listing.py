@@ -0,0 +1,117 @@
+import numpy as np
+from .result_cache import PAGE_SIZE, ResultSet, get_result_cache
+
+# 商品列表 API 每頁的預設與最大商品數
+LIST_PAGE_SIZE = 20
+MAX_LIST_PAGE_SIZE = 100
+
+
+def filter_products(catalog, category, min_price, max_price, min_quantity, max_quantity, sort_by, quantity, deadline_days, spec,
+                    limit: int = None) -> ResultSet:
+    """
+    依條件篩選並排序，回傳符合的商品（供分頁切片）
+
+    :param limit: 至少需要的結果數；依預算排序時只由價格索引取出這麼多個，None 代表全部
+    """
+    # 分類篩選 - 商品名稱或分類包含任一擴展關鍵字即可，位元圖在載入時已預先算好；
+    # 上層分類一併包含其子分類的商品
+    category_mask = catalog.category_mask(category) if category else None
+
+    # 指定購買數量時，以該數量的級距折扣價作為單價
+    prices = catalog.pricing.unit_prices(quantity) if quantity is not None else catalog.columns.price
+
+    # 分類、價格、數量條件以向量化遮罩一次完成，只取出符合的商品
+    mask = catalog.columns.filter_mask(category_mask, min_price, max_price, min_quantity, max_quantity, quantity, prices)
+    # 數量需符合遞增單位，並可在期限內交貨
+    if quantity is not None or deadline_days is not None:
+        mask &= catalog.delivery.deliverable_mask(quantity, deadline_days)
+    # 顏色、規格條件查詢選項索引
+    if spec:
+        mask &= catalog.facets.mask(spec)
+
+    if sort_by == 'closest_price' and quantity is not None:
+        # 折扣價不在價格索引內，直接依單價由高到低排序符合的商品
+        rows = catalog.columns.rows(mask)
+        rows = rows[np.argsort(-prices[rows], kind='stable')]
+    elif sort_by == 'closest_price':
+        # 由價格索引往低價方向只取出所需頁數內最接近預算的商品，O(log n + k)
+        total = int(mask.sum())
+        k = total if limit is None else min(limit, total)
+        rows = np.array(catalog.price_index.closest_under(max_price, k, mask), dtype=np.int64)
+        return ResultSet(rows, None, total)
+    else:
+        rows = catalog.columns.rows(mask)
+
+    # 未指定數量時顯示原價，直接使用預先組好的表格列
+    return ResultSet(rows, prices[rows] if quantity is not None else None)
+
+
+def popular_first(catalog, result: ResultSet, sort_by) -> ResultSet:
+    """超過一頁的結果改依熱門度排序，第一頁就列出最常被訂購的商品；依預算排序時維持原順序"""
+    if sort_by == 'closest_price' or len(result.rows) <= PAGE_SIZE:
+        return result
+    return ResultSet(*catalog.popularity.rank(result.rows, result.prices))
+
+
+def product_json(catalog, product, unit_price: float = None) -> dict:
+    """商品列表 API 的單筆商品；unit_price 為指定數量時的折扣價"""
+    item = product.to_dict()
+    item['unit_price'] = float(unit_price) if unit_price is not None else item['price']
+    item['image'] = catalog.cover_image(product)
+    return item
+
+
+def list_products(
+    catalog,
+    category: str = None,
+    min_price: float = None,
+    max_price: float = None,
+    min_quantity: int = None,
+    max_quantity: int = None,
+    sort_by: str = "default",
+    quantity: int = None,
+    deadline_days: int = None,
+    spec: str = None,
+    page: int = 1,
+    page_size: int = LIST_PAGE_SIZE,
+) -> dict:
+    """
+    以 get_product 的條件篩選商品，回傳 JSON 可序列化的一頁結果。
+
+    完整結果與 get_product 共用同一個查詢快取，翻頁只需切片；不提供任何條件時列出所有商品。
+
+    :param catalog: Catalog 或 SQLiteCatalogStore，見 get_catalog_source
+    """
+    args = (category, min_price, max_price, min_quantity, max_quantity, sort_by, quantity, deadline_days, spec)
+    page = max(page or 1, 1)
+    page_size = min(max(page_size or LIST_PAGE_SIZE, 1), MAX_LIST_PAGE_SIZE)
+    start = (page - 1) * page_size
+    result = get_result_cache().get_or_build(
+        catalog.version, ('get_product',) + args, lambda limit: catalog.filter_products(*args, limit=limit), start + page_size)
+    rows = result.rows[start:start + page_size]
+    prices = result.prices[start:start + page_size] if result.prices is not None else [None] * len(rows)
+    return {
+        'version': catalog.version,
+        'page': page,
+        'page_size': page_size,
+        'total': result.count,
+        'products': [product_json(catalog, product, price) for product, price in zip(catalog.products_at(rows), prices)],
+    }
+
+
+def category_json(node) -> dict:
+    """分類樹節點與其所有子分類"""
+    return {
+        'id': node.id,
+        'name': node.name,
+        'product_count': node.product_count,
+        'children': [category_json(child) for child in node.children],
+    }
+
+
+def list_categories(catalog) -> dict:
+    """分類樹 API 的內容，依樹狀順序排列"""
+    return {
+        'version': catalog.version,
+        'categories': [category_json(node) for node in catalog.categories.roots],
+    }
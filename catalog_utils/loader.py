@@ -0,0 +1,174 @@
+import os
+from .product import Product
+from .snapshot import load_or_build
+from .sql_dump import SQLDumpError, read_tables
+
+SQL_BACKUP_PATH = os.getenv(
+    "INKSLAP_SQL_BACKUP_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'inkslap-backup.sql'),
+)
+
+def product_from_row(row: dict, categories: list = None) -> Product:
+    """由 products 資料表的一筆資料與其分類名稱建立 Product；沒有分類關聯的商品歸入生活雜貨"""
+    specification = (row.get('specification') or '').replace('\r\n', ' ')
+    min_qty = row.get('min_order_quantity')
+    max_qty = row.get('max_order_quantity')
+
+    return Product(
+        id=row['id'],
+        code=row['code'],
+        name=row['name'],
+        description=row['description'] or '',
+        price=float(row['price']),
+        specification=specification,
+        min_order_quantity=min_qty if min_qty is not None else 1,
+        max_order_quantity=max_qty if max_qty is not None else 10000,
+        categories=categories if categories is not None else ['生活雜貨'],
+        sampling_time=row.get('sampling_time'),
+        sampling_fee=float(row['sampling_fee']) if row.get('sampling_fee') is not None else None
+    )
+
+
+def parse_sql_products(sql_backup_path: str = SQL_BACKUP_PATH):
+    """解析 SQL 檔案中的商品資料"""
+    if not os.path.exists(sql_backup_path):
+        print(f"警告：找不到 SQL 備份檔案 {sql_backup_path}")
+        return []
+
+    try:
+        # 單次掃描取出需要的資料表
+        # 圖片、顏色、規格等附屬資料表在第一次使用時才另外解析
+        tables = read_tables(sql_backup_path, ('categories', 'product_categories', 'products'))
+
+        products = []
+        categories = {row['id']: row['name'] for row in tables['categories']}
+
+        # 商品分類關聯
+        product_categories = {}
+        for row in tables['product_categories']:
+            cats = product_categories.setdefault(row['product_id'], [])
+            if row['category_id'] in categories:
+                cats.append(categories[row['category_id']])
+
+        # 商品資料
+        for row in tables['products']:
+            products.append(product_from_row(row, product_categories.get(row['id'])))
+
+        print(f"成功解析 {len(products)} 個商品")
+        return products
+
+    except (OSError, SQLDumpError) as e:
+        print(f"解析 SQL 檔案失敗: {e}")
+        return []
+
+def load_sql_products(sql_backup_path: str = SQL_BACKUP_PATH):
+    """載入商品資料，同一版本的備份只解析一次，之後直接讀取編譯好的快照"""
+    if not os.path.exists(sql_backup_path):
+        return parse_sql_products(sql_backup_path)
+    return load_or_build(sql_backup_path, 'products', lambda: parse_sql_products(sql_backup_path))
+
+
+def normalize_fallback_products(products: list) -> list:
+    """將備用商品資料轉為與 SQL 解析結果相同的格式"""
+    return [Product(
+        id=idx,
+        code='',
+        name=product['name'],
+        description='',
+        price=float(product['price']),
+        specification=product.get('spec', ''),
+        min_order_quantity=product.get('min_quantity', 1),
+        max_order_quantity=product.get('max_quantity', 10000),
+        categories=product['category']
+    ) for idx, product in enumerate(products, start=1)]
+
+
+def parse_product_table(sql_backup_path: str, table: str, fields: tuple) -> dict:
+    """解析以 product_id 關聯商品的資料表，回傳 {商品ID: [{欄位: 值}, ...]}"""
+    if not os.path.exists(sql_backup_path):
+        return {}
+
+    try:
+        tables = read_tables(sql_backup_path, (table,))
+    except (OSError, SQLDumpError) as e:
+        print(f"解析 {table} 失敗: {e}")
+        return {}
+
+    grouped = {}
+    for row in tables[table]:
+        grouped.setdefault(row['product_id'], []).append({field: row.get(field) for field in fields})
+    return grouped
+
+
+def load_product_table(sql_backup_path: str, table: str, fields: tuple) -> dict:
+    """同 parse_product_table，同一版本的備份只解析一次"""
+    if not os.path.exists(sql_backup_path):
+        return {}
+    return load_or_build(sql_backup_path, table, lambda: parse_product_table(sql_backup_path, table, fields))
+
+
+QUANTITY_DISCOUNT_FIELDS = ('min_quantity', 'max_quantity', 'discount_price', 'discount_percentage', 'lead_time_days')
+QUANTITY_RANGE_FIELDS = ('min_quantity', 'max_quantity', 'increment_step')
+PRODUCT_IMAGE_FIELDS = ('sorting', 'file_name', 'is_primary', 'image_type', 'file_path')
+PRODUCT_COLOR_FIELDS = ('sorting', 'color_name', 'color_code', 'file_name')
+PRODUCT_SPECIFICATION_FIELDS = ('sorting', 'specification_name')
+ORDER_ITEM_FIELDS = ('order_id', 'quantity', 'unit_price')
+CATEGORY_FIELDS = ('id', 'name', 'parent_id', 'type', 'status', 'sorting')
+
+
+def load_quantity_discounts(sql_backup_path: str = SQL_BACKUP_PATH) -> dict:
+    """數量折扣級距，{商品ID: [級距資料, ...]}"""
+    return load_product_table(sql_backup_path, 'quantity_discounts', QUANTITY_DISCOUNT_FIELDS)
+
+
+def load_quantity_ranges(sql_backup_path: str = SQL_BACKUP_PATH) -> dict:
+    """可訂購數量區間與遞增單位，{商品ID: [區間資料, ...]}"""
+    return load_product_table(sql_backup_path, 'product_quantity_ranges', QUANTITY_RANGE_FIELDS)
+
+
+def load_product_images(sql_backup_path: str = SQL_BACKUP_PATH) -> dict:
+    """商品圖片，{商品ID: [圖片資料, ...]}，image_type 為 cover、template 或 other"""
+    return load_product_table(sql_backup_path, 'product_images', PRODUCT_IMAGE_FIELDS)
+
+
+def cover_file_name(images: list):
+    """商品的代表圖片檔名：優先選擇封面圖，否則選擇第一張圖片；沒有圖片時為 None"""
+    cover = next((img['file_name'] for img in images if img['image_type'] == 'cover'), None)
+    if cover is None and images:
+        cover = images[0]['file_name']
+    return cover
+
+
+def load_product_colors(sql_backup_path: str = SQL_BACKUP_PATH) -> dict:
+    """商品顏色選項，{商品ID: [顏色資料, ...]}"""
+    return load_product_table(sql_backup_path, 'product_colors', PRODUCT_COLOR_FIELDS)
+
+
+def load_product_specifications(sql_backup_path: str = SQL_BACKUP_PATH) -> dict:
+    """商品規格選項，{商品ID: [規格資料, ...]}"""
+    return load_product_table(sql_backup_path, 'product_specifications', PRODUCT_SPECIFICATION_FIELDS)
+
+
+def load_order_items(sql_backup_path: str = SQL_BACKUP_PATH) -> dict:
+    """訂單明細，{商品ID: [明細資料, ...]}"""
+    return load_product_table(sql_backup_path, 'order_items', ORDER_ITEM_FIELDS)
+
+
+def parse_categories(sql_backup_path: str = SQL_BACKUP_PATH) -> list:
+    """解析分類資料表，回傳 [{欄位: 值}, ...]"""
+    if not os.path.exists(sql_backup_path):
+        return []
+
+    try:
+        tables = read_tables(sql_backup_path, ('categories',))
+    except (OSError, SQLDumpError) as e:
+        print(f"解析 categories 失敗: {e}")
+        return []
+    return [{field: row.get(field) for field in CATEGORY_FIELDS} for row in tables['categories']]
+
+
+def load_categories(sql_backup_path: str = SQL_BACKUP_PATH) -> list:
+    """分類資料（含上層分類、類型、狀態與排序），同一版本的備份只解析一次"""
+    if not os.path.exists(sql_backup_path):
+        return []
+    return load_or_build(sql_backup_path, 'categories', lambda: parse_categories(sql_backup_path))
@@ -0,0 +1,85 @@
+import math
+import numpy as np
+
+# 關鍵字搜尋時熱門度對 BM25 分數的加成上限：最熱門的商品分數乘以 1 + POPULARITY_WEIGHT
+POPULARITY_WEIGHT = 0.5
+
+
+class PopularityIndex:
+    """
+    由訂單明細算出的商品熱門度與共同購買關係。
+
+    熱門度以出現過的訂單數為主，購買總數量只用來區分訂單數相同的商品；
+    沒有訂單的商品熱門度為 0。共同購買次數以 CSR 稀疏矩陣保存：
+    indices[indptr[r]:indptr[r + 1]] 為與第 r 列商品出現在同一訂單的商品列號，
+    依次數由多到少排列，counts 為對應的訂單數。
+    """
+
+    def __init__(self, products: list, order_items: dict):
+        """
+        :param order_items: {商品ID: [{'order_id', 'quantity', ...}, ...]}，見 load_order_items
+        """
+        rows = self.rows = {product['id']: row for row, product in enumerate(products)}
+        size = len(products)
+
+        self.order_counts = np.zeros(size, dtype=np.int32)
+        self.quantities = np.zeros(size, dtype=np.int64)
+        orders = {}
+        for product_id, items in order_items.items():
+            row = rows.get(product_id)
+            if row is None:
+                continue
+            order_ids = {item['order_id'] for item in items if item.get('order_id') is not None}
+            self.order_counts[row] = len(order_ids)
+            self.quantities[row] = sum(item.get('quantity') or 0 for item in items)
+            for order_id in order_ids:
+                orders.setdefault(order_id, []).append(row)
+
+        # 整數部分為訂單數，小數部分依購買數量的對數排序，不會超過下一個訂單數
+        log_quantities = np.log1p(self.quantities.astype(np.float64))
+        scale = math.log1p(int(self.quantities.max())) + 1 if size else 1.0
+        self.scores = self.order_counts + log_quantities / scale
+        self.scores.flags.writeable = False
+        self.max_score = float(self.scores.max()) if size else 0.0
+
+        pairs = {}
+        for order_rows in orders.values():
+            for a in order_rows:
+                for b in order_rows:
+                    if a != b:
+                        pairs[(a, b)] = pairs.get((a, b), 0) + 1
+
+        # 依 (列號, -次數, 共同購買列號) 排序後直接組成 CSR
+        ordered = sorted(pairs.items(), key=lambda item: (item[0][0], -item[1], item[0][1]))
+        self.indices = np.array([b for (_, b), _ in ordered], dtype=np.int64)
+        self.counts = np.array([count for _, count in ordered], dtype=np.int32)
+        self.indptr = np.zeros(size + 1, dtype=np.int64)
+        if ordered:
+            np.add.at(self.indptr, np.array([a for (a, _), _ in ordered]) + 1, 1)
+        np.cumsum(self.indptr, out=self.indptr)
+
+    def rank(self, rows: np.ndarray, prices: np.ndarray = None):
+        """
+        依熱門度由高到低重新排列商品列號；熱門度相同時維持原本順序。
+
+        :param prices: 與 rows 對齊的單價，一併重新排列
+        :return: (rows, prices)
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        order = np.argsort(-self.scores[rows], kind='stable')
+        return rows[order], (np.asarray(prices)[order] if prices is not None else None)
+
+    def boost(self, scores: dict) -> dict:
+        """以熱門度加成關鍵字搜尋的 BM25 分數，{列號: 分數}；沒有訂單的商品分數不變"""
+        if not self.max_score:
+            return scores
+        weight = POPULARITY_WEIGHT / self.max_score
+        return {row: score * (1 + weight * float(self.scores[row])) for row, score in scores.items()}
+
+    def related(self, product_id, k: int = 3) -> list:
+        """最常與該商品出現在同一訂單的商品列號，最多 k 個"""
+        row = self.rows.get(product_id)
+        if row is None:
+            return []
+        start, end = self.indptr[row], self.indptr[row + 1]
+        return self.indices[start:min(end, start + k)].tolist()
@@ -0,0 +1,78 @@
+import numpy as np
+
+
+class PriceIndex:
+    """
+    依價格排序的列號索引。
+
+    以二分搜尋找到預算上限的位置後往低價方向走，取出最接近預算且不超過
+    預算的 k 個商品，成本為 O(log n + k)（另加被遮罩排除的列數）。
+    """
+
+    def __init__(self, prices: np.ndarray, arrays: dict = None):
+        """
+        :param arrays: build_arrays() 的結果（例如共用的唯讀映射），None 時由 prices 排序
+        """
+        if arrays is None:
+            arrays = self.build_arrays(prices)
+        self.order = arrays['order']
+        self.sorted_prices = arrays['sorted_prices']
+
+    @staticmethod
+    def build_arrays(prices: np.ndarray) -> dict:
+        rows = np.arange(len(prices))
+        # 同價位時列號大的排前面，往低價方向走時會先遇到原始順序較前的商品
+        order = np.lexsort((-rows, prices))
+        return {'order': order, 'sorted_prices': prices[order]}
+
+    def __len__(self):
+        return len(self.order)
+
+    def closest_under(self, max_price: float = None, k: int = 6, mask: np.ndarray = None, min_price: float = None) -> list:
+        """
+        價格不高於 max_price 且最接近的 k 個商品列號，由近到遠排列。
+
+        :param max_price: 預算上限，None 代表從最高價開始
+        :param k: 取出數量
+        :param mask: 其他篩選條件的布林遮罩，只回傳遮罩為 True 的列
+        :param min_price: 價格下限
+        """
+        hi = len(self.order) if max_price is None else int(np.searchsorted(self.sorted_prices, max_price, side='right'))
+        lo = 0 if min_price is None else int(np.searchsorted(self.sorted_prices, min_price, side='left'))
+
+        result = []
+        chunk = max(k, 8)
+        while hi > lo and len(result) < k:
+            start = max(lo, hi - chunk)
+            rows = self.order[start:hi][::-1]
+            if mask is not None:
+                rows = rows[mask[rows]]
+            result.extend(rows[:k - len(result)].tolist())
+            hi = start
+            chunk *= 2
+        return result
+
+    def patched(self, prices: np.ndarray, rows) -> 'PriceIndex':
+        """
+        套用增量更新，回傳新的 PriceIndex：移除 rows 的舊位置，再依新價格插回。
+
+        :param prices: 更新後的價格欄，與列號對齊
+        :param rows: 價格可能有變動的列號（含新增的列）
+        """
+        rows = np.unique(np.asarray(rows, dtype=np.int64))
+        keep = ~np.isin(self.order, rows)
+        order, sorted_prices = self.order[keep], self.sorted_prices[keep]
+        if not len(rows):
+            return PriceIndex(prices, {'order': order, 'sorted_prices': sorted_prices})
+
+        # 與 build_arrays 相同的順序：價格遞增，同價位時列號遞減
+        new_prices = prices[rows]
+        inserted = np.lexsort((-rows, new_prices))
+        rows, new_prices = rows[inserted], new_prices[inserted]
+        lo = np.searchsorted(sorted_prices, new_prices, side='left')
+        hi = np.searchsorted(sorted_prices, new_prices, side='right')
+        positions = np.array([l + int((order[l:h] > row).sum()) for l, h, row in zip(lo, hi, rows)], dtype=np.int64)
+        return PriceIndex(prices, {
+            'order': np.insert(order, positions, rows),
+            'sorted_prices': np.insert(sorted_prices, positions, new_prices),
+        })
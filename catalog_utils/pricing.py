@@ -0,0 +1,134 @@
+from bisect import bisect_right
+from collections import namedtuple
+import numpy as np
+
+# 沒有上限的級距以此值代表
+UNBOUNDED = np.iinfo(np.int64).max
+
+Tier = namedtuple('Tier', ['min_quantity', 'max_quantity', 'unit_price', 'discount_percentage', 'lead_time_days'])
+
+
+class PriceTiers:
+    """
+    單一商品的數量折扣級距。
+
+    重疊的級距在建立時展開成互不重疊的區段（重疊處採用範圍最窄的級距），
+    查詢某數量的級距只需一次二分搜尋，O(log 級距數)。
+    """
+
+    __slots__ = ('tiers', 'starts', 'ends', 'segments')
+
+    def __init__(self, tiers: list):
+        self.tiers = sorted(tiers, key=lambda t: (t.min_quantity, t.max_quantity))
+
+        bounds = sorted({t.min_quantity for t in self.tiers} | {t.max_quantity + 1 for t in self.tiers if t.max_quantity < UNBOUNDED})
+        self.starts, self.ends, self.segments = [], [], []
+        for i, start in enumerate(bounds):
+            end = bounds[i + 1] - 1 if i + 1 < len(bounds) else UNBOUNDED
+            covering = [t for t in self.tiers if t.min_quantity <= start and t.max_quantity >= start]
+            if not covering:
+                continue
+            tier = min(covering, key=lambda t: (t.max_quantity - t.min_quantity, t.unit_price))
+            # 相鄰且採用同一級距的區段合併
+            if self.segments and self.segments[-1] is tier and self.ends[-1] == start - 1:
+                self.ends[-1] = end
+                continue
+            self.starts.append(start)
+            self.ends.append(end)
+            self.segments.append(tier)
+
+    def lookup(self, quantity: int):
+        """數量所在的級距，不在任何級距內時回傳 None"""
+        i = bisect_right(self.starts, quantity) - 1
+        if i >= 0 and quantity <= self.ends[i]:
+            return self.segments[i]
+        return None
+
+
+def _tier_from_row(row: dict) -> Tier:
+    return Tier(
+        min_quantity=row['min_quantity'],
+        max_quantity=row['max_quantity'] if row['max_quantity'] is not None else UNBOUNDED,
+        unit_price=float(row['discount_price']),
+        discount_percentage=float(row['discount_percentage'] or 0),
+        lead_time_days=row['lead_time_days'] or 0,
+    )
+
+
+class PricingEngine:
+    """
+    依 quantity_discounts 建立的數量級距定價。
+
+    單一商品以 PriceTiers 查詢；整個商品目錄則把所有區段攤平成欄位陣列，
+    以向量化方式算出指定數量下每個商品的實際單價。
+    """
+
+    def __init__(self, products: list, quantity_discounts: dict, list_prices: np.ndarray):
+        self.list_prices = list_prices
+        self.tiers = {}
+        rows = {product['id']: row for row, product in enumerate(products)}
+
+        seg_rows, seg_starts, seg_ends, seg_prices = [], [], [], []
+        for product_id, tier_rows in quantity_discounts.items():
+            if product_id not in rows or not tier_rows:
+                continue
+            tiers = PriceTiers([_tier_from_row(r) for r in tier_rows])
+            self.tiers[product_id] = tiers
+            for start, end, tier in zip(tiers.starts, tiers.ends, tiers.segments):
+                seg_rows.append(rows[product_id])
+                seg_starts.append(start)
+                seg_ends.append(end)
+                seg_prices.append(tier.unit_price)
+
+        self._seg_rows = np.array(seg_rows, dtype=np.int64)
+        self._seg_starts = np.array(seg_starts, dtype=np.int64)
+        self._seg_ends = np.array(seg_ends, dtype=np.int64)
+        self._seg_prices = np.array(seg_prices, dtype=np.float64)
+
+    def tier(self, product: dict, quantity: int):
+        tiers = self.tiers.get(product['id'])
+        return tiers.lookup(quantity) if tiers else None
+
+    def unit_price(self, product: dict, quantity: int) -> float:
+        """指定數量下的實際單價，沒有對應級距時為原價"""
+        tier = self.tier(product, quantity)
+        return tier.unit_price if tier else float(product['price'])
+
+    def unit_prices(self, quantity: int) -> np.ndarray:
+        """指定數量下每個商品的實際單價，與商品列號對齊"""
+        prices = self.list_prices.copy()
+        hit = (self._seg_starts <= quantity) & (self._seg_ends >= quantity)
+        prices[self._seg_rows[hit]] = self._seg_prices[hit]
+        return prices
+
+    def patched(self, quantity_discounts: dict, rows_by_id: dict, list_prices: np.ndarray) -> 'PricingEngine':
+        """
+        套用增量更新，回傳新的 PricingEngine。
+
+        :param quantity_discounts: 有變動商品的完整級距 {商品ID: [級距資料, ...]}，空串列代表已無級距
+        :param rows_by_id: {商品ID: 列號}
+        :param list_prices: 更新後的原價欄
+        """
+        new = PricingEngine.__new__(PricingEngine)
+        new.list_prices = list_prices
+        new.tiers = dict(self.tiers)
+
+        changed_rows = [rows_by_id[product_id] for product_id in quantity_discounts if product_id in rows_by_id]
+        keep = ~np.isin(self._seg_rows, changed_rows)
+        seg_rows, seg_starts, seg_ends, seg_prices = [], [], [], []
+        for product_id, tier_rows in quantity_discounts.items():
+            new.tiers.pop(product_id, None)
+            if product_id not in rows_by_id or not tier_rows:
+                continue
+            tiers = new.tiers[product_id] = PriceTiers([_tier_from_row(r) for r in tier_rows])
+            for start, end, tier in zip(tiers.starts, tiers.ends, tiers.segments):
+                seg_rows.append(rows_by_id[product_id])
+                seg_starts.append(start)
+                seg_ends.append(end)
+                seg_prices.append(tier.unit_price)
+
+        new._seg_rows = np.concatenate([self._seg_rows[keep], np.array(seg_rows, dtype=np.int64)])
+        new._seg_starts = np.concatenate([self._seg_starts[keep], np.array(seg_starts, dtype=np.int64)])
+        new._seg_ends = np.concatenate([self._seg_ends[keep], np.array(seg_ends, dtype=np.int64)])
+        new._seg_prices = np.concatenate([self._seg_prices[keep], np.array(seg_prices, dtype=np.float64)])
+        return new
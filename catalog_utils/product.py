@@ -0,0 +1,93 @@
+import sys
+import unicodedata
+
+PRODUCT_FIELDS = (
+    'id',
+    'code',
+    'name',
+    'description',
+    'price',
+    'specification',
+    'min_order_quantity',
+    'max_order_quantity',
+    'categories',
+    'sampling_time',
+    'sampling_fee',
+)
+
+
+def normalize_name(name: str) -> str:
+    """商品名稱比對用的正規化：全半形統一、不分大小寫、合併空白"""
+    return ' '.join(unicodedata.normalize('NFKC', name).casefold().split())
+
+
+class Product:
+    """
+    唯讀的商品資料。
+
+    以 __slots__ 保存欄位，不帶每筆的 __dict__；分類字串經 intern 後所有商品
+    共用同一份，分類串列存成 tuple。圖片等附屬資料放在 Catalog 的資料表中，
+    不隨商品複製。
+
+    仍支援 product['name']、product.get('name') 的取值方式，
+    既有以 dict 存取商品的程式碼不需修改。
+    """
+
+    __slots__ = PRODUCT_FIELDS
+
+    def __init__(self, id, code, name, description, price, specification,
+                 min_order_quantity, max_order_quantity, categories, sampling_time=None, sampling_fee=None):
+        set_field = object.__setattr__
+        set_field(self, 'id', id)
+        set_field(self, 'code', code)
+        set_field(self, 'name', name)
+        set_field(self, 'description', description)
+        set_field(self, 'price', price)
+        set_field(self, 'specification', specification)
+        set_field(self, 'min_order_quantity', min_order_quantity)
+        set_field(self, 'max_order_quantity', max_order_quantity)
+        set_field(self, 'categories', tuple(sys.intern(cat) for cat in categories))
+        set_field(self, 'sampling_time', sampling_time)
+        set_field(self, 'sampling_fee', sampling_fee)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __reduce__(self):
+        return (Product, tuple(getattr(self, field) for field in PRODUCT_FIELDS))
+
+    def __getitem__(self, key):
+        if key not in PRODUCT_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in PRODUCT_FIELDS
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in PRODUCT_FIELDS else default
+
+    def keys(self):
+        return PRODUCT_FIELDS
+
+    def items(self):
+        return [(field, getattr(self, field)) for field in PRODUCT_FIELDS]
+
+    def to_dict(self) -> dict:
+        product = dict(self.items())
+        product['categories'] = list(self.categories)
+        return product
+
+    def __eq__(self, other):
+        if not isinstance(other, Product):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in PRODUCT_FIELDS)
+
+    def __hash__(self):
+        return hash((self.id, self.code))
+
+    def __repr__(self):
+        return f"Product(id={self.id!r}, code={self.code!r}, name={self.name!r})"
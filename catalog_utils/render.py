@@ -0,0 +1,101 @@
+from .pricing import UNBOUNDED
+
+TABLE_HEADER = """<table>
+<tr><th>商品名稱</th><th>單價</th><th>簡要描述</th></tr>"""
+TABLE_FOOTER = "</table>"
+
+# 簡要描述最多顯示的字數
+DESCRIPTION_LENGTH = 50
+
+
+def format_price(price: float) -> str:
+    return f"NT${int(price)}"
+
+
+def quantity_range_text(min_quantity: int, max_quantity: int) -> str:
+    if max_quantity >= UNBOUNDED:
+        return f"{min_quantity} 個以上"
+    return f"{min_quantity}～{max_quantity} 個"
+
+
+def brief_description(product) -> str:
+    """商品的簡要描述：優先使用規格，其次為描述，清理換行後截斷"""
+    description = product['specification'] or product['description'] or ''
+    return description.replace('\\r\\n', ' ').replace('\r\n', ' ')[:DESCRIPTION_LENGTH]
+
+
+def more_results(remaining: int) -> str:
+    """還有未顯示的商品時附加的提示"""
+    if remaining > 0:
+        return f"<p>還有 {remaining} 個其他選擇，如需查看更多商品請告訴我！</p>"
+    return ""
+
+
+def _row_head(product) -> str:
+    return f"<tr><td>{product['name']}</td><td>"
+
+
+def _row_tail(product) -> str:
+    return f"</td><td>{brief_description(product)}</td></tr>"
+
+
+def render_table(products: list, unit_prices=None) -> str:
+    """
+    直接由商品資料組出表格，格式與 TableRenderer 相同。
+
+    :param unit_prices: 與 products 對齊的顯示單價，None 時顯示原價
+    """
+    if unit_prices is None:
+        unit_prices = [product['price'] for product in products]
+    cells = [_row_head(p) + format_price(price) + _row_tail(p) for p, price in zip(products, unit_prices)]
+    return TABLE_HEADER + ''.join(cells) + TABLE_FOOTER
+
+
+class TableRenderer:
+    """
+    商品表格的 HTML 片段，與 Catalog 一同建立。
+
+    每個商品的名稱與描述儲存格在載入時先組好，價格儲存格只在顯示折扣價時
+    才另外格式化；輸出表格只需一次 join。get_product 與
+    search_products_by_keyword 共用，前端 ChatWindow.js 依此格式解析表格。
+    """
+
+    def __init__(self, products: list):
+        self.heads = [_row_head(product) for product in products]
+        self.tails = [_row_tail(product) for product in products]
+        self.rows = [
+            head + format_price(product['price']) + tail
+            for head, tail, product in zip(self.heads, self.tails, products)
+        ]
+
+    def row(self, index: int, unit_price: float = None) -> str:
+        if unit_price is None:
+            return self.rows[index]
+        return self.heads[index] + format_price(unit_price) + self.tails[index]
+
+    def table(self, rows, unit_prices=None) -> str:
+        """
+        組出商品表格。
+
+        :param rows: 商品列號
+        :param unit_prices: 與 rows 對齊的顯示單價，None 時顯示原價
+        """
+        if unit_prices is None:
+            cells = [self.rows[i] for i in rows]
+        else:
+            cells = [self.row(i, price) for i, price in zip(rows, unit_prices)]
+        return TABLE_HEADER + ''.join(cells) + TABLE_FOOTER
+
+    def patched(self, products: list, rows) -> 'TableRenderer':
+        """套用增量更新，回傳新的 TableRenderer；只重新組出 rows 這些列"""
+        new = TableRenderer.__new__(TableRenderer)
+        extra = len(products) - len(self.rows)
+        new.heads = self.heads + [''] * extra
+        new.tails = self.tails + [''] * extra
+        new.rows = self.rows + [''] * extra
+        for row in rows:
+            product = products[row]
+            new.heads[row] = _row_head(product)
+            new.tails[row] = _row_tail(product)
+            new.rows[row] = new.heads[row] + format_price(product['price']) + new.tails[row]
+        return new
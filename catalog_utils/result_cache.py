@@ -0,0 +1,98 @@
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# 查詢結果保留的秒數與筆數上限
+RESULT_CACHE_TTL = float(os.getenv("INKSLAP_RESULT_CACHE_TTL", "600"))
+RESULT_CACHE_SIZE = int(os.getenv("INKSLAP_RESULT_CACHE_SIZE", "256"))
+
+# 每頁顯示的商品數
+PAGE_SIZE = 6
+
+
+class ResultSet(namedtuple('ResultSet', ['rows', 'prices', 'total'], defaults=(None,))):
+    """
+    rows：依顯示順序排列的商品列號；prices：與 rows 對齊的顯示單價（None 為原價）；
+    total：全部符合的商品數，rows 只算出前面一部分時才需提供，None 代表 rows 已是全部結果。
+    """
+
+    __slots__ = ()
+
+    @property
+    def count(self) -> int:
+        """全部符合的商品數"""
+        return len(self.rows) if self.total is None else self.total
+
+    def covers(self, limit) -> bool:
+        """是否已算出前 limit 個結果；limit 為 None 代表需要全部結果"""
+        return len(self.rows) >= self.count or (limit is not None and len(self.rows) >= limit)
+
+
+class ResultCache:
+    """
+    查詢結果的 LRU 快取，鍵值包含 Catalog 版本。
+
+    第一次查詢時只算出所需頁數的排序結果（例如依預算排序的價格索引走訪、
+    關鍵字搜尋的前 k 名），「還有其他選擇」的後續頁數在快取的前綴足夠時
+    直接切片，不夠時才以加倍的數量重新計算；商品目錄重新載入後版本改變，
+    舊結果不再命中並逐步被淘汰。
+    """
+
+    def __init__(self, maxsize: int = RESULT_CACHE_SIZE, ttl: float = RESULT_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, version: str, key: tuple, build, limit: int = None) -> ResultSet:
+        """
+        取得 (version, key) 至少前 limit 個結果，不存在、過期或快取的前綴不夠時以 build(limit) 建立。
+
+        建立在鎖外進行，同一查詢並行時可能各自建立一次，結果相同。
+
+        :param build: build(limit) 回傳至少前 limit 個結果的 ResultSet，limit 為 None 時回傳全部
+        :param limit: 需要的結果數，None 代表全部
+        """
+        cache_key = (version, key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry[0] > now:
+                if entry[1].covers(limit):
+                    self._entries.move_to_end(cache_key)
+                    return entry[1]
+                # 翻頁超過快取的前綴時加倍計算，連續翻頁只需重算 O(log 頁數) 次
+                if limit is not None:
+                    limit = max(limit, 2 * len(entry[1].rows))
+
+        result = build(limit)
+        with self._lock:
+            self._entries[cache_key] = (now + self.ttl, result)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def page_slice(result: ResultSet, page: int, page_size: int = PAGE_SIZE):
+    """
+    取出第 page 頁（從 1 開始）的列號與單價。
+
+    :return: (rows, prices, 這一頁之後剩下的數量)
+    """
+    start = (page - 1) * page_size
+    end = start + page_size
+    prices = result.prices[start:end] if result.prices is not None else None
+    return result.rows[start:end], prices, max(result.count - end, 0)
+
+
+_cache = ResultCache()
+
+
+def get_result_cache() -> ResultCache:
+    return _cache
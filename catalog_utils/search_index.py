@@ -0,0 +1,176 @@
+import heapq
+import math
+from .product import normalize_name
+
+# 各欄位的權重，對應原本名稱 3 分、分類 2 分、規格描述 1 分的配分
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'categories': 2.0,
+    'specification': 1.0,
+    'description': 0.5,
+}
+FIELDS = tuple(FIELD_WEIGHTS)
+
+# BM25 參數
+K1 = 1.2
+B = 0.75
+
+
+def _field_text(product: dict, field: str) -> str:
+    if field == 'categories':
+        return ' '.join(product['categories'])
+    return product.get(field) or ''
+
+
+def text_grams(text: str) -> list:
+    """文字的單字與雙字切分（繁體中文不需斷詞），略過含空白的片段；全半形與大小寫先統一"""
+    text = normalize_name(text)
+    grams = [c for c in text if not c.isspace()]
+    grams.extend(text[i:i + 2] for i in range(len(text) - 1) if not (text[i].isspace() or text[i + 1].isspace()))
+    return grams
+
+
+def query_grams(term: str) -> list:
+    """查詢詞的切分：單字詞用單字，其餘用雙字"""
+    term = normalize_name(term)
+    if len(term) <= 1:
+        return [term] if term else []
+    return list({term[i:i + 2] for i in range(len(term) - 1) if not (term[i].isspace() or term[i + 1].isspace())})
+
+
+class SearchIndex:
+    """
+    名稱、分類、規格與描述的字元 n-gram 倒排索引，以 BM25 計分。
+
+    查詢詞的所有雙字都出現在同一欄位才算命中該欄位，近似子字串比對，
+    避免部分重疊造成雜訊；各欄位分數依 FIELD_WEIGHTS 加權。
+    """
+
+    def __init__(self, products: list):
+        self.size = len(products)
+        # postings[field][gram] = {列號: 出現次數}
+        self.postings = {field: {} for field in FIELDS}
+        self.lengths = {field: [0] * self.size for field in FIELDS}
+
+        for row, product in enumerate(products):
+            for field in FIELDS:
+                grams = text_grams(_field_text(product, field))
+                self.lengths[field][row] = len(grams)
+                index = self.postings[field]
+                for gram in grams:
+                    postings = index.get(gram)
+                    if postings is None:
+                        postings = index[gram] = {}
+                    postings[row] = postings.get(row, 0) + 1
+
+        self.avg_lengths = {
+            field: (sum(lengths) / self.size if self.size else 0.0) or 1.0
+            for field, lengths in self.lengths.items()
+        }
+
+    def _term_hits(self, term: str, field: str) -> dict:
+        """{列號: 詞頻}，詞頻取各雙字出現次數的最小值"""
+        grams = query_grams(term)
+        if not grams:
+            return {}
+        index = self.postings[field]
+        lists = [index.get(gram) for gram in grams]
+        if any(postings is None for postings in lists):
+            return {}
+        lists.sort(key=len)
+        hits = dict(lists[0])
+        for postings in lists[1:]:
+            hits = {row: min(tf, postings[row]) for row, tf in hits.items() if row in postings}
+            if not hits:
+                break
+        return hits
+
+    def scores(self, terms: list, name_only_terms: list = ()) -> dict:
+        """
+        計算每個命中商品的 BM25 分數。
+
+        :param terms: 在所有欄位比對的詞
+        :param name_only_terms: 只在名稱與分類比對的詞
+        :return: {列號: 分數}
+        """
+        scores = {}
+        jobs = [(term, FIELDS) for term in terms]
+        jobs += [(term, ('name', 'categories')) for term in name_only_terms]
+
+        for term, fields in jobs:
+            field_hits = [(field, self._term_hits(term, field)) for field in fields]
+            matched = set()
+            for _, hits in field_hits:
+                matched.update(hits)
+            if not matched:
+                continue
+
+            df = len(matched)
+            idf = math.log(1 + (self.size - df + 0.5) / (df + 0.5))
+            for field, hits in field_hits:
+                weight = FIELD_WEIGHTS[field] * idf
+                lengths = self.lengths[field]
+                norm = K1 * (1 - B)
+                scale = K1 * B / self.avg_lengths[field]
+                for row, tf in hits.items():
+                    score = weight * tf * (K1 + 1) / (tf + norm + scale * lengths[row])
+                    scores[row] = scores.get(row, 0.0) + score
+        return scores
+
+    def top(self, scores: dict, k: int = 6) -> list:
+        """分數最高的 k 個列號；同分時維持原始順序"""
+        return [row for row, _ in heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))]
+
+    def patched(self, old_products: dict, products: list, rows, deleted_rows=()) -> 'SearchIndex':
+        """
+        套用增量更新，回傳新的 SearchIndex。
+
+        只複製被變動商品碰到的倒排串列，其餘串列與原本的索引共用；
+        原本的索引不變，進行中的查詢不受影響。
+
+        :param old_products: {列號: 變動前的商品}，新增的列不在其中
+        :param products: 更新後的完整商品串列
+        :param rows: 內容有變動的列號（含新增的列）
+        :param deleted_rows: 已刪除的列號，其詞彙自索引移除
+        """
+        new = SearchIndex.__new__(SearchIndex)
+        new.postings = {field: dict(index) for field, index in self.postings.items()}
+        new.lengths = {field: lengths + [0] * (len(products) - len(lengths)) for field, lengths in self.lengths.items()}
+        totals = {field: self.avg_lengths[field] * self.size for field in FIELDS}
+        copied = {field: set() for field in FIELDS}
+
+        def posting(field, gram):
+            index = new.postings[field]
+            if gram not in copied[field]:
+                copied[field].add(gram)
+                index[gram] = dict(index.get(gram, ()))
+            return index[gram]
+
+        rows = list(rows)
+        deleted_rows = list(deleted_rows)
+        for row in rows + deleted_rows:
+            old = old_products.get(row)
+            if old is None:
+                continue
+            for field in FIELDS:
+                for gram in set(text_grams(_field_text(old, field))):
+                    postings = posting(field, gram)
+                    postings.pop(row, None)
+                    if not postings:
+                        del new.postings[field][gram]
+                        copied[field].discard(gram)
+                totals[field] -= new.lengths[field][row]
+                new.lengths[field][row] = 0
+
+        for row in rows:
+            for field in FIELDS:
+                grams = text_grams(_field_text(products[row], field))
+                new.lengths[field][row] = len(grams)
+                totals[field] += len(grams)
+                for gram in grams:
+                    postings = posting(field, gram)
+                    postings[row] = postings.get(row, 0) + 1
+
+        new.size = self.size + len([row for row in rows if row not in old_products]) - len([row for row in deleted_rows if row in old_products])
+        new.avg_lengths = {field: (totals[field] / new.size if new.size else 0.0) or 1.0 for field in FIELDS}
+        return new
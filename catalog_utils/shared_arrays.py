@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+from .snapshot import CACHE_DIR, SCHEMA_VERSION
+
+# 設為 0 時每個 worker 各自在記憶體中建立欄位陣列，不使用共用的映射檔
+SHARED_ARRAYS = os.getenv("INKSLAP_SHARED_ARRAYS", "1") != "0"
+
+SHARED_DIR = os.path.join(CACHE_DIR, "arrays")
+
+
+def _array_dir(version: str, name: str) -> str:
+    return os.path.join(SHARED_DIR, f"{name}.{version}.v{SCHEMA_VERSION}")
+
+
+def _load(path: str, names) -> dict:
+    return {key: np.load(os.path.join(path, f"{key}.npy"), mmap_mode='r') for key in names}
+
+
+def _names(path: str) -> list:
+    return [f[:-4] for f in os.listdir(path) if f.endswith(".npy")]
+
+
+def _prune(version: str, name: str):
+    # 移除同名的舊版本；仍映射舊檔的 worker 不受影響，檔案在解除映射後才真正釋放
+    prefix, current = f"{name}.", os.path.basename(_array_dir(version, name))
+    try:
+        entries = os.listdir(SHARED_DIR)
+    except OSError:
+        return
+    for entry in entries:
+        if entry.startswith(prefix) and entry != current and not entry.endswith(".tmp"):
+            shutil.rmtree(os.path.join(SHARED_DIR, entry), ignore_errors=True)
+
+
+def shared_arrays(version: str, name: str, build) -> dict:
+    """
+    取得某目錄版本的一組陣列，以唯讀記憶體映射開啟。
+
+    第一個 worker 呼叫 build() 產生 {名稱: 陣列} 並寫入 CACHE_DIR/arrays，
+    之後同一版本的 worker 直接映射同一份檔案，作業系統只保留一份分頁，
+    篩選直接在映射的緩衝區上運算。寫入時先寫暫存目錄再原子改名。
+
+    :param version: Catalog 版本
+    :param name: 陣列組名稱
+    :param build: 無參數的建構函式，回傳 {名稱: np.ndarray}
+    """
+    path = _array_dir(version, name)
+    if os.path.isdir(path):
+        try:
+            return _load(path, _names(path))
+        except (OSError, ValueError):
+            pass
+
+    arrays = build()
+    try:
+        os.makedirs(SHARED_DIR, exist_ok=True)
+        tmp_path = tempfile.mkdtemp(dir=SHARED_DIR, suffix=".tmp")
+        try:
+            for key, array in arrays.items():
+                np.save(os.path.join(tmp_path, f"{key}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+            os.rename(tmp_path, path)
+        except OSError:
+            # 其他 worker 已先完成同一版本
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            if not os.path.isdir(path):
+                raise
+        _prune(version, name)
+        return _load(path, arrays)
+    except (OSError, ValueError) as e:
+        print(f"警告：無法建立共用陣列 {name}，改用記憶體中的陣列: {e}")
+        return arrays
@@ -0,0 +1,118 @@
+import hashlib
+import os
+import pickle
+import tempfile
+
+# 快取內容格式有變動時必須遞增，舊快照會自動失效
+SCHEMA_VERSION = 4
+
+CACHE_DIR = os.getenv(
+    "INKSLAP_CATALOG_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".catalog_cache"),
+)
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _snapshot_path(source_path: str, name: str) -> str:
+    # 檔名加上絕對路徑的雜湊，不同目錄下同名的備份檔不會共用快照
+    source_path = os.path.abspath(source_path)
+    base = os.path.splitext(os.path.basename(source_path))[0]
+    digest = hashlib.sha256(source_path.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(CACHE_DIR, f"{base}-{digest}.{name}.v{SCHEMA_VERSION}.pkl")
+
+
+def _read_header(f):
+    header = pickle.load(f)
+    if not isinstance(header, dict) or header.get("schema_version") != SCHEMA_VERSION:
+        return None
+    return header
+
+
+def load_snapshot(source_path: str, name: str):
+    """
+    讀取與來源檔案版本相符的快照。
+
+    檔案大小與修改時間相同時直接採用；否則再比對內容雜湊，
+    避免 touch 或重新部署同一份備份時重新解析。雜湊相符時把新的修改時間
+    寫回快照標頭，之後的啟動不必再計算雜湊。
+
+    :return: 快照資料，沒有可用的快照時回傳 None
+    """
+    path = _snapshot_path(source_path, name)
+    try:
+        stat = os.stat(source_path)
+        with open(path, "rb") as f:
+            header = _read_header(f)
+            if header is None:
+                return None
+            if header["size"] != stat.st_size:
+                return None
+            if header["mtime_ns"] == stat.st_mtime_ns:
+                return pickle.load(f)
+            if header["sha256"] != file_sha256(source_path):
+                return None
+            raw = f.read()
+        data = pickle.loads(raw)
+    except (OSError, EOFError, pickle.UnpicklingError, KeyError, AttributeError, ImportError):
+        return None
+    try:
+        _write_snapshot(path, dict(header, mtime_ns=stat.st_mtime_ns), lambda f: f.write(raw))
+    except OSError as e:
+        print(f"警告：無法更新商品快照的修改時間 {e}")
+    return data
+
+
+def _write_snapshot(path: str, header: dict, write_data) -> None:
+    """以暫存檔加原子置換寫入快照，多個 worker 同時寫入也不會讀到半成品"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            write_data(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def save_snapshot(source_path: str, name: str, data) -> None:
+    """寫入快照，標頭記錄來源檔案的大小、修改時間與內容雜湊"""
+    stat = os.stat(source_path)
+    header = {
+        "schema_version": SCHEMA_VERSION,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": file_sha256(source_path),
+    }
+    _write_snapshot(_snapshot_path(source_path, name), header,
+                    lambda f: pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def load_or_build(source_path: str, name: str, build):
+    """
+    優先讀取快照，沒有或已過期時呼叫 build() 重新產生並寫回快照。
+
+    :param source_path: 來源備份檔
+    :param name: 快照名稱，同一來源可有多份快照
+    :param build: 無參數的建構函式
+    """
+    data = load_snapshot(source_path, name)
+    if data is not None:
+        return data
+
+    data = build()
+    if data:
+        try:
+            save_snapshot(source_path, name, data)
+        except OSError as e:
+            print(f"警告：無法寫入商品快照 {e}")
+    return data
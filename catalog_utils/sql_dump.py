@@ -0,0 +1,259 @@
+import mmap
+import os
+import re
+from functools import lru_cache
+
+# 語句層級掃描：跳過字串與註解，只在真正的 INSERT 開頭停下來
+_SCAN_RE = re.compile(
+    rb"'(?:[^'\\]|\\.|'')*'"
+    rb"|--[^\n]*"
+    rb"|/\*.*?\*/"
+    rb"|INSERT\s+INTO\s+`(?P<table>[^`]+)`\s*(?:\((?P<columns>[^)]*)\))?\s*VALUES",
+    re.S,
+)
+
+# VALUES 區段的詞法單元
+_VALUE_RE = re.compile(
+    rb"\s*(?:"
+    rb"'(?P<str>(?:[^'\\]|\\.|'')*)'"
+    rb"|(?P<hex>0x[0-9A-Fa-f]+)"
+    rb"|(?P<num>[-+]?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)"
+    rb"|(?P<word>[A-Za-z_]\w*)"
+    rb"|(?P<punct>[(),;])"
+    rb")",
+    re.S,
+)
+
+# 不解析欄位值、只切出整筆資料列；字串內的括號與逗號不影響切分
+_ROW_RE = re.compile(rb"\s*\((?:'(?:[^'\\]+|\\.|'')*'|[^'()]+)*\)\s*(?P<end>[,;])", re.S)
+
+# 資料列中的日期時間值；字串內的同樣文字前面必定是跳脫過的引號，不會符合
+_DATETIME_RE = re.compile(rb"[(,]\s*'(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)'")
+
+# 整個 INSERT 語句的其餘部分，跳過不需要的資料表時一次比對到分號
+_STATEMENT_RE = re.compile(rb"(?:'(?:[^'\\]+|\\.|'')*'|[^';]+)*;", re.S)
+
+
+@lru_cache(maxsize=None)
+def _leading_re(count: int):
+    """資料列開頭 count 個整數或 NULL 欄位"""
+    scalar = rb"\s*(-?\d+|NULL)\s*"
+    return re.compile(rb"\s*\(" + b",".join([scalar] * count) + rb"[,)]")
+
+_ESCAPE_RE = re.compile(rb"\\(.)|''", re.S)
+_ESCAPES = {
+    b"0": b"\x00",
+    b"b": b"\b",
+    b"n": b"\n",
+    b"r": b"\r",
+    b"t": b"\t",
+    b"Z": b"\x1a",
+    b"%": b"\\%",
+    b"_": b"\\_",
+}
+
+
+class SQLDumpError(ValueError):
+    """SQL 備份檔格式錯誤"""
+
+
+def _unescape(raw: bytes) -> str:
+    if b"\\" in raw or b"''" in raw:
+        raw = _ESCAPE_RE.sub(
+            lambda m: _ESCAPES.get(m.group(1), m.group(1)) if m.group(1) is not None else b"'",
+            raw,
+        )
+    return raw.decode("utf-8")
+
+
+def _number(raw: bytes):
+    if b"." in raw or b"e" in raw or b"E" in raw:
+        return float(raw)
+    return int(raw)
+
+
+def _column_names(m) -> tuple:
+    """INSERT 語句的欄位名稱；沒有欄位清單時無法對應欄位，視為格式錯誤"""
+    columns = m.group("columns")
+    if not columns:
+        raise SQLDumpError(
+            f"位置 {m.start()} 的 {m.group('table').decode('utf-8')} INSERT 語句沒有欄位清單"
+        )
+    return tuple(c.strip().strip("`") for c in columns.decode("utf-8").split(","))
+
+
+def _iter_rows(buf, pos: int):
+    """從 VALUES 之後開始逐筆解析資料列，回傳 (row, 結束位置)。"""
+    match = _VALUE_RE.match
+    row = None
+    expect_value = False
+
+    while True:
+        m = match(buf, pos)
+        if not m:
+            raise SQLDumpError(f"無法解析位置 {pos} 的資料")
+        pos = m.end()
+        kind = m.lastgroup
+
+        if kind == "punct":
+            char = m.group("punct")
+            if char == b"(":
+                if row is not None:
+                    raise SQLDumpError(f"位置 {pos} 出現巢狀括號")
+                row = []
+                expect_value = True
+            elif char == b",":
+                if row is not None:
+                    expect_value = True
+            elif char == b")":
+                if row is None:
+                    raise SQLDumpError(f"位置 {pos} 出現多餘的右括號")
+                yield tuple(row), pos
+                row = None
+                expect_value = False
+            else:  # ;
+                if row is not None:
+                    raise SQLDumpError(f"位置 {pos} 的資料列未結束")
+                return
+            continue
+
+        if row is None or not expect_value:
+            raise SQLDumpError(f"位置 {pos} 出現未預期的值")
+        expect_value = False
+
+        if kind == "str":
+            row.append(_unescape(m.group("str")))
+        elif kind == "num":
+            row.append(_number(m.group("num")))
+        elif kind == "hex":
+            row.append(bytes.fromhex(m.group("hex")[2:].decode("ascii")))
+        else:
+            word = m.group("word").decode("ascii")
+            if word.upper() == "NULL":
+                row.append(None)
+            elif word.upper() in ("TRUE", "FALSE"):
+                row.append(word.upper() == "TRUE")
+            elif word.startswith("_"):
+                # 例如 _binary '...'，字集前綴本身不是值
+                expect_value = True
+            else:
+                row.append(word)
+
+
+def iter_insert_rows(sql_path: str, tables=None):
+    """
+    以單次記憶體映射掃描 MySQL 備份檔，逐筆產生 INSERT INTO 的資料列。
+
+    :param sql_path: SQL 備份檔路徑
+    :param tables: 只解析這些資料表，None 代表全部
+    :return: (資料表名稱, 欄位名稱 tuple, 資料列 tuple) 的迭代器；
+             字串、整數、小數與 NULL 會轉為 str、int、float 與 None
+    """
+    wanted = None if tables is None else {t.encode("utf-8") for t in tables}
+
+    with open(sql_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            pos = 0
+            search = _SCAN_RE.search
+            while True:
+                m = search(buf, pos)
+                if not m:
+                    return
+                pos = m.end()
+                table = m.group("table")
+                if table is None or (wanted is not None and table not in wanted):
+                    continue
+
+                table_name = table.decode("utf-8")
+                columns = _column_names(m)
+
+                for row, pos in _iter_rows(buf, pos):
+                    yield table_name, columns, row
+
+
+def read_tables(sql_path: str, tables) -> dict:
+    """
+    一次讀出多個資料表，每個資料表的資料列轉為 {欄位: 值} 字典。
+
+    :param sql_path: SQL 備份檔路徑
+    :param tables: 要讀取的資料表名稱
+    :return: {資料表名稱: [資料列字典, ...]}，備份中沒有的資料表對應空列表
+    """
+    result = {table: [] for table in tables}
+    for table, columns, row in iter_insert_rows(sql_path, tables):
+        result[table].append(dict(zip(columns, row)))
+    return result
+
+
+def _leading_scalars(raw: bytes, count: int):
+    """資料列前 count 個欄位（須為整數或 NULL）；遇到其他型別時回傳 None"""
+    m = _leading_re(count).match(raw)
+    if not m:
+        return None
+    return [int(v) if v != b"NULL" else None for v in m.groups()]
+
+
+def parse_row(raw: bytes) -> tuple:
+    """解析 iter_row_headers 回傳的單筆原始資料列"""
+    for row, _ in _iter_rows(raw + b";", 0):
+        return row
+    raise SQLDumpError("空白的資料列")
+
+
+def iter_row_headers(sql_path: str, tables, leading: dict = None):
+    """
+    快速掃描資料列，不逐一解析欄位值。
+
+    每筆資料列只以一次正規式比對切出範圍，取出開頭的整數欄位與最晚的日期時間值
+    （updated_at 不早於 created_at，即為最後修改時間），供增量更新判斷哪些資料列
+    需要完整解析（見 parse_row）。
+
+    :param tables: 只掃描這些資料表
+    :param leading: {資料表名稱: 欄位名稱 tuple}，要取出的開頭欄位；須為整數或 NULL，
+                    取不到時該欄位值為 None，呼叫端可改用 parse_row 取得
+    :return: (資料表名稱, 欄位名稱 tuple, {欄位: 值}, 最後修改時間或 None, 原始資料列 bytes) 的迭代器
+    """
+    wanted = {t.encode("utf-8") for t in tables}
+    leading = leading or {}
+
+    with open(sql_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            pos = 0
+            search = _SCAN_RE.search
+            while True:
+                m = search(buf, pos)
+                if not m:
+                    return
+                pos = m.end()
+                table = m.group("table")
+                if table is None:
+                    continue
+                if table not in wanted:
+                    skipped = _STATEMENT_RE.match(buf, pos)
+                    if skipped:
+                        pos = skipped.end()
+                    continue
+
+                table_name = table.decode("utf-8")
+                columns = _column_names(m)
+
+                names = leading.get(table_name, ())
+                count = max((columns.index(n) + 1 for n in names if n in columns), default=0)
+
+                while True:
+                    row = _ROW_RE.match(buf, pos)
+                    if not row:
+                        raise SQLDumpError(f"無法解析位置 {pos} 的資料")
+                    pos = row.end()
+                    raw = buf[row.start():row.start("end")]
+                    values = _leading_scalars(raw, count) if count else []
+                    head = {n: (values[columns.index(n)] if values is not None and n in columns else None) for n in names}
+                    stamps = _DATETIME_RE.findall(raw)
+                    changed_at = max(stamps).decode("ascii") if stamps else None
+                    yield table_name, columns, head, changed_at, raw
+                    if row.group("end") == b";":
+                        break
@@ -0,0 +1,695 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import numpy as np
+from .catalog import source_version, get_active_catalog
+from .category_tree import CategoryTree
+from .fuzzy import FuzzyIndex, delete_pairs, expansion_terms, term_frequencies
+from .fallback import FALLBACK_PRODUCTS
+from .loader import (
+    CATEGORY_FIELDS,
+    SQL_BACKUP_PATH,
+    cover_file_name,
+    load_categories,
+    load_order_items,
+    load_product_colors,
+    load_product_images,
+    load_product_specifications,
+    load_quantity_discounts,
+    load_quantity_ranges,
+    load_sql_products,
+    normalize_fallback_products,
+)
+from .popularity import POPULARITY_WEIGHT, PopularityIndex
+from .pricing import UNBOUNDED, PriceTiers, Tier, _tier_from_row
+from .product import PRODUCT_FIELDS, Product, normalize_name
+from .render import render_table
+from .result_cache import PAGE_SIZE, ResultSet
+from .search_index import FIELD_WEIGHTS, FIELDS, query_grams, text_grams
+from .synonyms import SYNONYMS_PATH, SynonymMatcher
+from .taxonomy import CATEGORY_EXPANSIONS, expand_query
+
+# 設定後所有商品查詢工具改查此 SQLite 檔（見 get_catalog_source），未設定時使用記憶體中的 Catalog
+SQLITE_PATH = os.getenv("INKSLAP_CATALOG_SQLITE", "")
+
+# 資料表結構有變動時必須遞增，舊檔會自動重建
+SQLITE_SCHEMA_VERSION = 4
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+
+CREATE TABLE products (
+    row INTEGER PRIMARY KEY,
+    id INTEGER NOT NULL UNIQUE,
+    code TEXT,
+    name TEXT NOT NULL,
+    name_lower TEXT NOT NULL,
+    -- 以商品名稱查詢商品用，見 normalize_name
+    name_key TEXT NOT NULL,
+    description TEXT,
+    price REAL NOT NULL,
+    specification TEXT,
+    min_order_quantity INTEGER NOT NULL,
+    max_order_quantity INTEGER NOT NULL,
+    sampling_time INTEGER,
+    sampling_fee REAL,
+    -- 代表圖片檔名，見 cover_file_name
+    cover_image TEXT,
+    -- 由訂單明細算出的熱門度，見 PopularityIndex
+    popularity REAL NOT NULL
+);
+CREATE INDEX products_code ON products (code, row);
+CREATE INDEX products_name_key ON products (name_key, row);
+CREATE INDEX products_price ON products (price, row);
+CREATE INDEX products_min_order_quantity ON products (min_order_quantity);
+CREATE INDEX products_max_order_quantity ON products (max_order_quantity);
+
+CREATE TABLE product_categories (
+    product_row INTEGER NOT NULL REFERENCES products (row),
+    name TEXT NOT NULL,
+    name_lower TEXT NOT NULL,
+    name_key TEXT NOT NULL
+);
+CREATE INDEX product_categories_product ON product_categories (product_row);
+CREATE INDEX product_categories_name ON product_categories (name_lower, product_row);
+CREATE INDEX product_categories_key ON product_categories (name_key, product_row);
+
+-- 分類資料表，建立分類樹用，見 CategoryTree
+CREATE TABLE categories (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    parent_id INTEGER,
+    type TEXT,
+    status INTEGER,
+    sorting INTEGER
+);
+
+-- 原始的數量折扣級距，報價與商品資料列出各級距用
+CREATE TABLE price_tiers (
+    product_row INTEGER NOT NULL REFERENCES products (row),
+    min_quantity INTEGER NOT NULL,
+    max_quantity INTEGER NOT NULL,
+    unit_price REAL NOT NULL,
+    discount_percentage REAL NOT NULL,
+    lead_time_days INTEGER NOT NULL
+);
+CREATE INDEX price_tiers_product ON price_tiers (product_row);
+
+-- 數量級距展開後互不重疊的區段，見 PriceTiers
+CREATE TABLE price_segments (
+    product_row INTEGER NOT NULL REFERENCES products (row),
+    start_quantity INTEGER NOT NULL,
+    end_quantity INTEGER NOT NULL,
+    unit_price REAL NOT NULL,
+    lead_time_days INTEGER NOT NULL
+);
+CREATE INDEX price_segments_product ON price_segments (product_row, start_quantity);
+
+CREATE TABLE quantity_ranges (
+    product_row INTEGER NOT NULL REFERENCES products (row),
+    min_quantity INTEGER NOT NULL,
+    max_quantity INTEGER NOT NULL,
+    increment_step INTEGER NOT NULL
+);
+CREATE INDEX quantity_ranges_product ON quantity_ranges (product_row, min_quantity);
+
+-- 顏色與規格選項，kind 為 color 或 specification，見 FacetIndex
+CREATE TABLE product_options (
+    product_row INTEGER NOT NULL REFERENCES products (row),
+    kind TEXT NOT NULL,
+    sorting INTEGER,
+    value TEXT NOT NULL,
+    value_lower TEXT NOT NULL
+);
+CREATE INDEX product_options_product ON product_options (product_row, kind);
+CREATE INDEX product_options_value ON product_options (value_lower, product_row);
+
+-- 最常一起購買的商品，見 PopularityIndex.related
+CREATE TABLE related_products (
+    product_row INTEGER NOT NULL REFERENCES products (row),
+    rank INTEGER NOT NULL,
+    related_row INTEGER NOT NULL REFERENCES products (row),
+    PRIMARY KEY (product_row, rank)
+) WITHOUT ROWID;
+
+-- 錯字更正的詞彙與刪除字典，見 FuzzyIndex
+CREATE TABLE fuzzy_terms (term TEXT PRIMARY KEY, frequency INTEGER NOT NULL) WITHOUT ROWID;
+CREATE TABLE fuzzy_deletes (key TEXT NOT NULL, term TEXT NOT NULL);
+CREATE INDEX fuzzy_deletes_key ON fuzzy_deletes (key);
+
+-- 各欄位存放 text_grams 切出的單字與雙字，以空白分隔
+CREATE VIRTUAL TABLE products_fts USING fts5 (name, categories, specification, description);
+"""
+
+
+def _fts_grams(text: str) -> list:
+    # FTS5 預設斷詞會在標點處切開，只保留由文字或數字組成的片段
+    return [gram for gram in text_grams(text) if gram.isalnum()]
+
+
+def _fts_text(text: str) -> str:
+    return ' '.join(_fts_grams(text))
+
+
+def _fts_term(term: str) -> str:
+    """單一查詢詞：所有雙字都必須出現在同一欄位"""
+    grams = [gram for gram in query_grams(term) if gram.isalnum()]
+    return ' AND '.join(f'"{gram}"' for gram in grams)
+
+
+def build_sqlite_catalog(source_path: str = SQL_BACKUP_PATH, db_path: str = SQLITE_PATH) -> str:
+    """
+    將備份檔解析後寫入 SQLite 檔。
+
+    先寫入同目錄的暫存檔，完成後原子置換；已開啟舊檔的連線繼續讀到完整的舊版本。
+
+    :return: 寫入的目錄版本
+    """
+    version = source_version(source_path)
+    # 與 get_active_catalog 相同，備份檔不存在或沒有商品時改用備用商品資料
+    products = load_sql_products(source_path) or normalize_fallback_products(FALLBACK_PRODUCTS)
+    quantity_discounts = load_quantity_discounts(source_path)
+    quantity_ranges = load_quantity_ranges(source_path)
+    options = {'color': load_product_colors(source_path), 'specification': load_product_specifications(source_path)}
+    images = load_product_images(source_path)
+    rows = {product['id']: row for row, product in enumerate(products)}
+    popularity = PopularityIndex(products, load_order_items(source_path))
+    fuzzy_terms = term_frequencies(products, expansion_terms(SynonymMatcher.load().groups, CATEGORY_EXPANSIONS))
+
+    directory = os.path.dirname(os.path.abspath(db_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(fd)
+    try:
+        conn = sqlite3.connect(tmp_path)
+        with conn:
+            conn.executescript(SCHEMA)
+            conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+                ("schema_version", str(SQLITE_SCHEMA_VERSION)),
+                ("catalog_version", version),
+            ])
+            conn.executemany(
+                "INSERT INTO products VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(row, p['id'], p['code'], p['name'], p['name'].lower(), normalize_name(p['name']), p['description'],
+                  p['price'], p['specification'], p['min_order_quantity'], p['max_order_quantity'],
+                  p['sampling_time'], p['sampling_fee'], cover_file_name(images.get(p['id'], [])),
+                  float(popularity.scores[row]))
+                 for row, p in enumerate(products)],
+            )
+            conn.executemany(
+                "INSERT INTO related_products VALUES (?, ?, ?)",
+                [(row, rank, related)
+                 for row, p in enumerate(products)
+                 for rank, related in enumerate(popularity.related(p['id']))],
+            )
+            conn.executemany(
+                "INSERT INTO categories VALUES (:id, :name, :parent_id, :type, :status, :sorting)",
+                load_categories(source_path),
+            )
+            conn.executemany("INSERT INTO fuzzy_terms VALUES (?, ?)", fuzzy_terms.items())
+            conn.executemany("INSERT INTO fuzzy_deletes VALUES (?, ?)", delete_pairs(fuzzy_terms))
+            conn.executemany(
+                "INSERT INTO product_categories VALUES (?, ?, ?, ?)",
+                [(row, cat, cat.lower(), normalize_name(cat)) for row, p in enumerate(products) for cat in p['categories']],
+            )
+            conn.executemany(
+                "INSERT INTO products_fts (rowid, name, categories, specification, description) VALUES (?, ?, ?, ?, ?)",
+                [(row, _fts_text(p['name']), _fts_text(' '.join(p['categories'])),
+                  _fts_text(p['specification'] or ''), _fts_text(p['description'] or ''))
+                 for row, p in enumerate(products)],
+            )
+
+            segments, raw_tiers = [], []
+            for product_id, tier_rows in quantity_discounts.items():
+                if product_id not in rows or not tier_rows:
+                    continue
+                tiers = [_tier_from_row(r) for r in tier_rows]
+                raw_tiers += [(rows[product_id], t.min_quantity, int(min(t.max_quantity, UNBOUNDED)),
+                               t.unit_price, t.discount_percentage, t.lead_time_days) for t in tiers]
+                tiers = PriceTiers(tiers)
+                for start, end, tier in zip(tiers.starts, tiers.ends, tiers.segments):
+                    segments.append((rows[product_id], start, int(min(end, UNBOUNDED)), tier.unit_price, tier.lead_time_days))
+            conn.executemany("INSERT INTO price_tiers VALUES (?, ?, ?, ?, ?, ?)", raw_tiers)
+            conn.executemany("INSERT INTO price_segments VALUES (?, ?, ?, ?, ?)", segments)
+
+            conn.executemany(
+                "INSERT INTO quantity_ranges VALUES (?, ?, ?, ?)",
+                [(rows[product_id], r['min_quantity'], r['max_quantity'], r['increment_step'] or 1)
+                 for product_id, product_ranges in quantity_ranges.items() if product_id in rows
+                 for r in product_ranges],
+            )
+            conn.executemany(
+                "INSERT INTO product_options VALUES (?, ?, ?, ?, ?)",
+                [(rows[product_id], kind, option['sorting'], value, value.strip().lower())
+                 for kind, table in options.items()
+                 for product_id, product_options in table.items() if product_id in rows
+                 for option in product_options
+                 for value in [option[f'{kind}_name'] or '']
+                 if value.strip()],
+            )
+        conn.execute("ANALYZE")
+        conn.close()
+        os.replace(tmp_path, db_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return version
+
+
+def _stored_version(db_path: str):
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+    if meta.get("schema_version") != str(SQLITE_SCHEMA_VERSION):
+        return None
+    return meta.get("catalog_version")
+
+
+class SQLiteFuzzyIndex(FuzzyIndex):
+    """詞彙與刪除字典存放在 SQLite 檔中的 FuzzyIndex，查詢時只讀出需要的部分"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def _frequencies(self, terms) -> dict:
+        terms = list(terms)
+        if not terms:
+            return {}
+        return dict(self.conn.execute(
+            f"SELECT term, frequency FROM fuzzy_terms WHERE term IN ({', '.join('?' * len(terms))})", terms))
+
+    def _candidates(self, keys) -> set:
+        keys = list(keys)
+        return {term for term, in self.conn.execute(
+            f"SELECT DISTINCT term FROM fuzzy_deletes WHERE key IN ({', '.join('?' * len(keys))})", keys)}
+
+
+class SQLiteCatalogStore:
+    """
+    以 SQLite 檔查詢商品目錄。
+
+    多個 API worker 以唯讀方式開啟同一個檔案，不必各自在記憶體中保存商品資料。
+    每次查詢前比對備份檔與同義詞資料檔的大小與修改時間，有變動且版本不同時
+    重建 SQLite 檔並重新開啟連線。連線依執行緒分開保存。
+
+    分類樹、熱門度、錯字更正的詞彙，以及商品資料、級距、選項、圖片與共同購買等查詢單一商品
+    所需的資料都存放在同一個檔案中，查詢介面與 Catalog 相同，啟用時不需另外建立記憶體中的 Catalog。
+    """
+
+    def __init__(self, source_path: str = SQL_BACKUP_PATH, db_path: str = SQLITE_PATH):
+        self.source_path = source_path
+        self.db_path = db_path
+        self.version = None
+        self.synonyms = None
+        self._stat = None
+        self._categories = None
+        self._column_cache = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _source_stat(self):
+        stats = []
+        for path in (self.source_path, SYNONYMS_PATH):
+            try:
+                stat = os.stat(path)
+                stats.append((stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                stats.append(None)
+        return tuple(stats)
+
+    def refresh(self) -> str:
+        """來源檔案有變動時確認 SQLite 檔的版本，必要時重建；回傳目前的目錄版本"""
+        stat = self._source_stat()
+        if stat == self._stat:
+            return self.version
+        with self._lock:
+            if stat == self._stat:
+                return self.version
+            version = source_version(self.source_path)
+            if _stored_version(self.db_path) != version:
+                version = build_sqlite_catalog(self.source_path, self.db_path)
+            self.synonyms = SynonymMatcher.load()
+            self.version = version
+            self._stat = stat
+            return version
+
+    def connection(self) -> sqlite3.Connection:
+        self.refresh()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.version != self.version:
+            if conn is not None:
+                conn.close()
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+            self._local.conn = conn
+            self._local.version = self.version
+        return conn
+
+    def _filter(self, category, min_price, max_price, min_quantity, max_quantity, sort_by, quantity, deadline_days, spec) -> list:
+        """符合條件的 [(列號, 單價, 熱門度), ...]，依原始順序或（依預算排序時）單價由高到低排列"""
+        conn = self.connection()
+        params = []
+        if quantity is not None:
+            # 以該數量所在的級距區段取代原價
+            price_expr = ("COALESCE((SELECT s.unit_price FROM price_segments s WHERE s.product_row = p.row"
+                          " AND s.start_quantity <= ? AND s.end_quantity >= ?), p.price)")
+            params += [quantity, quantity]
+        else:
+            price_expr = "p.price"
+
+        where, where_params = [], []
+        if category:
+            # 上層分類一併包含其子孫分類的商品，見 CategoryTree.descendants
+            terms = set()
+            for name in (category,) + self.categories.descendants(category):
+                terms.update(expand_query(name, CATEGORY_EXPANSIONS, self.synonyms))
+            clauses = []
+            for term in terms:
+                clauses.append("instr(p.name_lower, ?) > 0 OR EXISTS (SELECT 1 FROM product_categories c"
+                               " WHERE c.product_row = p.row AND instr(c.name_lower, ?) > 0)")
+                where_params += [term, term]
+            where.append("(" + " OR ".join(f"({c})" for c in clauses) + ")")
+        if min_price is not None:
+            where.append("unit_price >= ?")
+            where_params.append(min_price)
+        if max_price is not None:
+            where.append("unit_price <= ?")
+            where_params.append(max_price)
+        if min_quantity is not None:
+            where.append("p.min_order_quantity <= ?")
+            where_params.append(min_quantity)
+        if max_quantity is not None:
+            where.append("p.max_order_quantity >= ?")
+            where_params.append(max_quantity)
+        if quantity is not None:
+            where.append("p.min_order_quantity <= ? AND p.max_order_quantity >= ?")
+            where.append("NOT EXISTS (SELECT 1 FROM quantity_ranges r WHERE r.product_row = p.row"
+                         " AND r.min_quantity <= ? AND r.max_quantity >= ? AND (? - r.min_quantity) % r.increment_step != 0)")
+            where_params += [quantity, quantity, quantity, quantity, quantity]
+        if deadline_days is not None:
+            # 未指定數量時以商品最低訂購量的交期判斷；交期未知的商品不列入
+            wanted = "?" if quantity is not None else "p.min_order_quantity"
+            where.append(f"EXISTS (SELECT 1 FROM price_segments s WHERE s.product_row = p.row"
+                         f" AND s.start_quantity <= {wanted} AND s.end_quantity >= {wanted} AND s.lead_time_days <= ?)")
+            where_params += ([quantity, quantity] if quantity is not None else []) + [deadline_days]
+        if spec:
+            values = self._option_values(conn, spec)
+            if not values:
+                return []
+            where.append(f"p.row IN (SELECT product_row FROM product_options WHERE value_lower IN ({', '.join('?' * len(values))}))")
+            where_params += values
+
+        order = "unit_price DESC, p.row" if sort_by == 'closest_price' else "p.row"
+        sql = (f"SELECT p.row, {price_expr} AS unit_price, p.popularity FROM products p"
+               f"{' WHERE ' + ' AND '.join(where) if where else ''} ORDER BY {order}")
+        return conn.execute(sql, params + where_params).fetchall()
+
+    def filter_products(
+        self,
+        category: str = None,
+        min_price: float = None,
+        max_price: float = None,
+        min_quantity: int = None,
+        max_quantity: int = None,
+        sort_by: str = "default",
+        quantity: int = None,
+        deadline_days: int = None,
+        spec: str = None,
+        limit: int = None,
+    ) -> ResultSet:
+        """
+        與記憶體版 get_product 相同的篩選與排序，回傳全部符合的商品列號
+
+        :param limit: 與 Catalog.filter_products 的介面相同；排序在資料庫中完成，一律回傳全部結果
+        """
+        found = self._filter(category, min_price, max_price, min_quantity, max_quantity, sort_by, quantity, deadline_days, spec)
+        # 超過一頁的結果改依熱門度排序，與 popular_first 相同；依預算排序時維持原順序
+        if sort_by != 'closest_price' and len(found) > PAGE_SIZE:
+            found.sort(key=lambda item: -item[2])
+        rows = [row for row, _, _ in found]
+        return ResultSet(rows, [price for _, price, _ in found] if quantity is not None else None)
+
+    def _option_values(self, conn, spec: str) -> list:
+        """符合 spec 的顏色或規格選項值，比對規則同 FacetIndex"""
+        spec = spec.strip().lower()
+        if not spec:
+            return []
+        values = [v for v, in conn.execute(
+            "SELECT DISTINCT value_lower FROM product_options WHERE instr(value_lower, ?) > 0", (spec,))]
+        if not values:
+            values = [v for v, in conn.execute(
+                "SELECT DISTINCT value_lower FROM product_options WHERE instr(?, value_lower) > 0", (spec,))]
+        return values
+
+    def search_products(self, keyword: str, limit: int = None) -> ResultSet:
+        """
+        與記憶體版 search_products_by_keyword 相同的關鍵字擴充，以 FTS5 的 BM25 排序
+
+        :param limit: 與 Catalog.search_products 的介面相同；排序在資料庫中完成，一律回傳全部結果
+        """
+        conn = self.connection()
+        expanded = expand_query(keyword, CATEGORY_EXPANSIONS, self.synonyms)
+        lowered = keyword.strip().lower()
+        queries = []
+        for term in expanded:
+            match = _fts_term(term)
+            if not match:
+                continue
+            # 單字的擴展詞只比對名稱與分類
+            columns = ' '.join(FIELDS) if len(term) > 1 or term == lowered else 'name categories'
+            queries.append(f"{{{columns}}} : ({match})")
+        if not queries:
+            return ResultSet([], None)
+
+        weights = ', '.join(str(FIELD_WEIGHTS[field]) for field in FIELDS)
+        found = conn.execute(
+            f"SELECT rowid, -bm25(products_fts, {weights}) AS score FROM products_fts WHERE products_fts MATCH ?"
+            f" ORDER BY score DESC, rowid",
+            (' OR '.join(queries),),
+        ).fetchall()
+        # 超過一頁時以熱門度加成，與 PopularityIndex.boost 相同
+        popularity = self.popularity_scores()
+        max_score = float(popularity.max()) if len(popularity) else 0.0
+        if len(found) > PAGE_SIZE and max_score:
+            weight = POPULARITY_WEIGHT / max_score
+            found.sort(key=lambda item: (-item[1] * (1 + weight * float(popularity[item[0]])), item[0]))
+        return ResultSet([row for row, _ in found], None)
+
+    @property
+    def categories(self) -> CategoryTree:
+        """資料庫中的分類建立的分類樹，與 Catalog.categories 相同；每個目錄版本只建立一次"""
+        conn = self.connection()
+        cached = self._categories
+        if cached is None or cached[0] != self.version:
+            product_categories = {}
+            for row, name in conn.execute("SELECT product_row, name FROM product_categories ORDER BY product_row, rowid"):
+                product_categories.setdefault(row, []).append(name)
+            product_categories = list(product_categories.values())
+            rows = [dict(zip(CATEGORY_FIELDS, values)) for values in conn.execute(
+                f"SELECT {', '.join(CATEGORY_FIELDS)} FROM categories")]
+            tree = CategoryTree(rows, product_categories) if rows else CategoryTree.from_names(product_categories)
+            self._categories = cached = (self.version, tree)
+        return cached[1]
+
+    def correct(self, query: str):
+        """以資料庫中的錯字更正詞彙更正查詢詞，見 FuzzyIndex.correct"""
+        return SQLiteFuzzyIndex(self.connection()).correct(query)
+
+    def _products(self, where: str, params=(), limit: int = None) -> list:
+        """符合條件的商品，依列號排列，介面與 Catalog 中的 Product 相同"""
+        conn = self.connection()
+        fields = [field for field in PRODUCT_FIELDS if field != 'categories']
+        found = conn.execute(
+            f"SELECT row, {', '.join(fields)} FROM products WHERE {where} ORDER BY row{f' LIMIT {int(limit)}' if limit else ''}",
+            params,
+        ).fetchall()
+        if not found:
+            return []
+        rows = [values[0] for values in found]
+        categories = {}
+        for row, name in conn.execute(
+                f"SELECT product_row, name FROM product_categories WHERE product_row IN ({', '.join('?' * len(rows))})"
+                f" ORDER BY rowid", rows):
+            categories.setdefault(row, []).append(name)
+        return [Product(**dict(zip(fields, values[1:])), categories=categories.get(values[0], ())) for values in found]
+
+    def find_product(self, query):
+        """以商品ID、編號或名稱找出商品，比對規則與 Catalog.find_product 相同"""
+        text = str(query).strip()
+        name = normalize_name(text)
+        found = (self._products("code = ?", (text,), 1) if text else []) or self._products("name_key = ?", (name,), 1)
+        if not found and text.isdigit():
+            found = self._products("id = ?", (int(text),))
+        if not found and name:
+            found = self._products("instr(name_key, ?) > 0", (name,), 1)
+        return found[0] if found else None
+
+    def cover_image(self, product):
+        """商品的代表圖片檔名，見 cover_file_name"""
+        found = self.connection().execute("SELECT cover_image FROM products WHERE id = ?", (product['id'],)).fetchone()
+        return found[0] if found else None
+
+    def product_options(self, product_id, kind: str) -> list:
+        """商品的顏色（kind='color'）或規格（kind='specification'）選項，欄位與 Catalog.product_options 相同"""
+        found = self.connection().execute(
+            "SELECT o.sorting, o.value FROM product_options o JOIN products p ON p.row = o.product_row"
+            " WHERE p.id = ? AND o.kind = ? ORDER BY o.rowid", (product_id, kind))
+        return [{'sorting': sorting, f'{kind}_name': value} for sorting, value in found]
+
+    def price_tiers(self, product_id):
+        """商品的數量折扣級距，沒有級距時為 None"""
+        found = self.connection().execute(
+            "SELECT t.min_quantity, t.max_quantity, t.unit_price, t.discount_percentage, t.lead_time_days"
+            " FROM price_tiers t JOIN products p ON p.row = t.product_row WHERE p.id = ? ORDER BY t.rowid", (product_id,))
+        tiers = [Tier(*values) for values in found]
+        return PriceTiers(tiers) if tiers else None
+
+    def valid_step(self, product_id, quantity: int):
+        """單一商品的遞增單位檢查，符合時回傳 None，否則回傳應遵守的遞增單位，見 DeliveryIndex.valid_step"""
+        found = self.connection().execute(
+            "SELECT r.increment_step FROM quantity_ranges r JOIN products p ON p.row = r.product_row"
+            " WHERE p.id = ? AND r.min_quantity <= ? AND r.max_quantity >= ? AND (? - r.min_quantity) % r.increment_step != 0"
+            " ORDER BY r.min_quantity, r.max_quantity, r.increment_step LIMIT 1",
+            (product_id, quantity, quantity, quantity)).fetchone()
+        return found[0] if found else None
+
+    def related_names(self, product_id) -> list:
+        """最常與該商品一起購買的商品名稱"""
+        found = self.connection().execute(
+            "SELECT r.name FROM related_products x JOIN products p ON p.row = x.product_row"
+            " JOIN products r ON r.row = x.related_row WHERE p.id = ? ORDER BY x.rank", (product_id,))
+        return [name for name, in found]
+
+    def products_at(self, rows) -> list:
+        """列號對應的商品，依 rows 的順序排列"""
+        rows = [int(row) for row in rows]
+        if not rows:
+            return []
+        found = {product['id']: product for product in self._products(f"row IN ({', '.join('?' * len(rows))})", rows)}
+        return [found[product_id] for product_id in self.product_ids(rows)]
+
+    def _columns(self):
+        """(商品ID, 熱門度) 兩個與列號對齊的陣列；每個目錄版本只讀取一次"""
+        conn = self.connection()
+        cached = self._column_cache
+        if cached is None or cached[0] != self.version:
+            found = conn.execute("SELECT id, popularity FROM products ORDER BY row").fetchall()
+            ids = np.array([product_id for product_id, _ in found], dtype=np.int64)
+            scores = np.array([score for _, score in found], dtype=np.float64)
+            ids.flags.writeable = scores.flags.writeable = False
+            self._column_cache = cached = (self.version, ids, scores)
+        return cached[1:]
+
+    def product_ids(self, rows) -> list:
+        """列號對應的商品ID"""
+        return self._columns()[0][np.asarray(rows, dtype=np.int64)].tolist()
+
+    def product_rows(self, product_ids) -> dict:
+        """{商品ID: 列號}，不在目錄中的商品ID 不列入"""
+        product_ids = [int(product_id) for product_id in product_ids]
+        return dict(self.connection().execute(
+            f"SELECT id, row FROM products WHERE id IN ({', '.join('?' * len(product_ids))})", product_ids))
+
+    def popularity_scores(self) -> np.ndarray:
+        """每個商品的熱門度，與列號對齊"""
+        return self._columns()[1]
+
+    def _mask(self, rows) -> np.ndarray:
+        mask = np.zeros(len(self.popularity_scores()), dtype=bool)
+        mask[np.asarray(list(rows), dtype=np.int64)] = True
+        return mask
+
+    def unit_prices(self, quantity: int) -> np.ndarray:
+        """指定數量下每個商品的實際單價，與列號對齊，見 PricingEngine.unit_prices"""
+        found = self.connection().execute(
+            "SELECT COALESCE((SELECT s.unit_price FROM price_segments s WHERE s.product_row = p.row"
+            " AND s.start_quantity <= ? AND s.end_quantity >= ?), p.price) FROM products p ORDER BY p.row",
+            (quantity, quantity))
+        return np.array([price for price, in found], dtype=np.float64)
+
+    def orderable_mask(self, quantity: int, max_price: float = None, deadline_days: int = None) -> np.ndarray:
+        """可訂購 quantity 個、折扣價不高於 max_price 且（指定期限時）能在期限內交貨的商品"""
+        return self._mask(row for row, _, _ in self._filter(None, None, max_price, None, None, 'default', quantity, deadline_days, None))
+
+    def category_mask(self, query: str) -> np.ndarray:
+        """名稱或分類符合查詢詞的商品（含擴展詞與子孫分類），見 Catalog.category_mask"""
+        return self._mask(row for row, _, _ in self._filter(query, None, None, None, None, 'default', None, None, None))
+
+    def category_members(self, name: str):
+        """分類樹中該分類及其所有子孫分類的商品，不做擴展比對；分類不在分類樹中時回傳 None"""
+        node = self.categories.find(name)
+        if node is None:
+            return None
+        keys = sorted({normalize_name(n) for n in (node.name,) + self.categories.descendants(node.name)})
+        return self._mask(row for row, in self.connection().execute(
+            f"SELECT DISTINCT product_row FROM product_categories WHERE name_key IN ({', '.join('?' * len(keys))})", keys))
+
+    def term_mask(self, term: str) -> np.ndarray:
+        """商品名稱或任一分類包含 term 的商品，見 ProductColumns.term_mask"""
+        term = term.lower()
+        return self._mask(row for row, in self.connection().execute(
+            "SELECT row FROM products WHERE instr(name_lower, ?) > 0"
+            " UNION SELECT product_row FROM product_categories WHERE instr(name_lower, ?) > 0", (term, term)))
+
+    def rows(self, mask: np.ndarray) -> np.ndarray:
+        return np.flatnonzero(mask)
+
+    def table(self, rows: list, unit_prices=None) -> str:
+        """組出商品表格，介面與 TableRenderer.table 相同"""
+        conn = self.connection()
+        rows = [int(row) for row in rows]
+        found = conn.execute(
+            f"SELECT row, name, price, specification, description FROM products WHERE row IN ({', '.join('?' * len(rows))})",
+            rows,
+        )
+        products = {
+            row: {'name': name, 'price': price, 'specification': specification, 'description': description}
+            for row, name, price, specification, description in found
+        }
+        return render_table([products[row] for row in rows], unit_prices)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def sqlite_enabled() -> bool:
+    return bool(SQLITE_PATH)
+
+
+def get_sqlite_store() -> SQLiteCatalogStore:
+    """取得全域共用的 SQLiteCatalogStore"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SQLiteCatalogStore()
+    return _store
+
+
+def get_catalog_source():
+    """
+    工具查詢商品使用的目錄：啟用 SQLite 時為確認過版本的 SQLiteCatalogStore，否則為目前生效的 Catalog。
+
+    兩者提供相同的查詢介面（find_product、filter_products、search_products、categories、table 等）。
+    """
+    if sqlite_enabled():
+        store = get_sqlite_store()
+        store.refresh()
+        return store
+    return get_active_catalog()
+
+
+if __name__ == "__main__":
+    import sys
+
+    target = sys.argv[1] if len(sys.argv) > 1 else SQLITE_PATH
+    if not target:
+        sys.exit("用法：python -m catalog_utils.sqlite_store <SQLite 檔路徑>（或設定 INKSLAP_CATALOG_SQLITE）")
+    print(f"已建立 {target}，目錄版本 {build_sqlite_catalog(SQL_BACKUP_PATH, target)}")
@@ -0,0 +1,96 @@
+import json
+import os
+from collections import deque
+
+SYNONYMS_PATH = os.getenv(
+    "INKSLAP_SYNONYMS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "synonyms.json"),
+)
+
+
+def load_synonyms(path: str = SYNONYMS_PATH) -> dict:
+    """讀取同義詞資料檔，格式為 {關鍵字: [同義詞, ...]}"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class SynonymMatcher:
+    """
+    同義詞表編譯成的 Aho-Corasick 自動機。
+
+    對查詢只掃描一次即可找出所有出現的關鍵字（一句話可同時命中多組，
+    如「送男友 科技感 小物」）；另以反查表處理查詢詞本身就是某組同義詞的情況。
+    """
+
+    def __init__(self, groups: dict):
+        self.groups = {key.lower(): [s.lower() for s in values] for key, values in groups.items()}
+
+        # 同義詞 → 所屬關鍵字
+        self.reverse = {}
+        for key, values in self.groups.items():
+            for value in values:
+                self.reverse.setdefault(value, []).append(key)
+
+        # 以關鍵字建立 trie：_goto[狀態] = {字元: 下一狀態}，_output[狀態] = 在此結束的關鍵字
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        for key in self.groups:
+            state = 0
+            for char in key:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = nxt
+            self._output[state].append(key)
+
+        # 以 BFS 建立失敗連結，並把失敗狀態的輸出併入
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(char, 0)
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+
+    @classmethod
+    def load(cls, path: str = SYNONYMS_PATH) -> "SynonymMatcher":
+        return cls(load_synonyms(path))
+
+    def find_keys(self, text: str) -> list:
+        """text 中出現的所有關鍵字（依出現順序、不重複）"""
+        found = []
+        state = 0
+        for char in text.lower():
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for key in self._output[state]:
+                if key not in found:
+                    found.append(key)
+        return found
+
+    def expand(self, keyword: str) -> list:
+        """
+        擴充關鍵字：包含某關鍵字時加入該組同義詞；
+        查詢詞（或以空白分隔的某個詞）本身是同義詞時，加入所屬關鍵字與整組同義詞。
+        """
+        keyword = keyword.lower()
+        expanded = {keyword}
+
+        for key in self.find_keys(keyword):
+            expanded.update(self.groups[key])
+
+        for token in {keyword, *keyword.split()}:
+            for key in self.reverse.get(token, ()):
+                expanded.add(key)
+                expanded.update(self.groups[key])
+
+        return list(expanded)
@@ -0,0 +1,150 @@
+from collections import OrderedDict
+from functools import lru_cache
+import threading
+import numpy as np
+from .synonyms import SynonymMatcher, load_synonyms
+
+# 分類擴展規則：查詢詞包含左邊的字詞時，改以右邊的字詞比對商品名稱與分類
+# 依順序比對，第一個符合的規則生效
+CATEGORY_EXPANSIONS = {
+    '包袋收納': ['包', '袋', '收納', '箱', '盒'],
+    '包': ['包', '袋'],
+    '收納': ['收納', '箱', '盒', '包', '袋'],
+}
+
+# 匯入時的同義詞表；同義詞資料檔見 synonyms.json，每次建立 Catalog 都會重新讀取
+SYNONYMS = load_synonyms()
+
+
+def expand_keywords(keyword, synonyms: SynonymMatcher = None):
+    """擴充關鍵字，加入同義詞"""
+    if synonyms is None:
+        synonyms = _default_matcher()
+    return synonyms.expand(keyword)
+
+
+@lru_cache(maxsize=1)
+def _default_matcher() -> SynonymMatcher:
+    return SynonymMatcher(SYNONYMS)
+
+
+def expand_query(query: str, expansions: dict = CATEGORY_EXPANSIONS, synonyms: SynonymMatcher = None) -> list:
+    """查詢詞擴展後實際比對的字詞：第一個符合的擴展規則，再加上同義詞"""
+    if synonyms is None:
+        synonyms = _default_matcher()
+    query = query.strip().lower()
+    terms = next((list(values) for key, values in expansions.items() if key in query), [query])
+    return list(set(terms) | set(synonyms.expand(query)))
+
+
+class Taxonomy:
+    """
+    編譯好的分類詞彙表。
+
+    每個可接受的分類詞、擴展詞與同義詞都在 Catalog 載入時先算好對應的
+    商品位元圖，查詢時只需一次字典查找，再與價格、數量等遮罩做交集。
+    get_product 與 search_products_by_keyword 共用同一套擴展規則。
+    """
+
+    # 未收錄詞彙的位元圖快取上限
+    ADHOC_CACHE_SIZE = 1024
+
+    def __init__(self, columns, expansions: dict = CATEGORY_EXPANSIONS, synonyms: SynonymMatcher = None, compiled: dict = None):
+        """
+        :param compiled: compiled() 的結果（例如共用的唯讀映射），None 時重新編譯
+        """
+        self.columns = columns
+        self.expansions = expansions
+        self.synonyms = synonyms if synonyms is not None else SynonymMatcher.load()
+
+        self._term_masks = {}
+        if compiled is not None:
+            self._bitmaps = dict(zip(compiled['terms'].tolist(), compiled['bitmaps']))
+        else:
+            self._bitmaps = {term: self._compile(term) for term in self.vocabulary()}
+
+        self._adhoc = OrderedDict()
+        self._adhoc_lock = threading.Lock()
+
+    def vocabulary(self) -> set:
+        """所有預先編譯的詞彙（皆為小寫）"""
+        terms = set(self.columns.category_lower)
+        for key, values in list(self.expansions.items()) + list(self.synonyms.groups.items()):
+            terms.add(key.lower())
+            terms.update(v.lower() for v in values)
+        return terms
+
+    def expand(self, query: str) -> list:
+        """查詢詞擴展後實際比對的字詞"""
+        return expand_query(query, self.expansions, self.synonyms)
+
+    def _term_mask(self, term: str) -> np.ndarray:
+        mask = self._term_masks.get(term)
+        if mask is None:
+            mask = self._term_masks[term] = self.columns.term_mask(term)
+        return mask
+
+    def _compile(self, query: str) -> np.ndarray:
+        mask = np.zeros(len(self.columns), dtype=bool)
+        for term in self.expand(query):
+            mask |= self._term_mask(term)
+        mask.flags.writeable = False
+        return mask
+
+    def compiled(self) -> dict:
+        """預先編譯的詞彙與位元圖，位元圖疊成 (詞彙數 × 商品數) 的矩陣"""
+        terms = sorted(self._bitmaps)
+        bitmaps = np.array([self._bitmaps[t] for t in terms], dtype=bool).reshape(len(terms), len(self.columns))
+        return {'terms': np.array(terms, dtype=str), 'bitmaps': bitmaps}
+
+    def mask(self, query: str) -> np.ndarray:
+        """名稱或分類符合查詢詞（含擴展詞）的商品位元圖，唯讀"""
+        query = query.strip().lower()
+        bitmap = self._bitmaps.get(query)
+        if bitmap is not None:
+            return bitmap
+
+        with self._adhoc_lock:
+            bitmap = self._adhoc.get(query)
+            if bitmap is not None:
+                self._adhoc.move_to_end(query)
+                return bitmap
+            bitmap = self._compile(query)
+            self._adhoc[query] = bitmap
+            if len(self._adhoc) > self.ADHOC_CACHE_SIZE:
+                self._adhoc.popitem(last=False)
+            return bitmap
+
+    def patched(self, columns, rows) -> 'Taxonomy':
+        """
+        套用增量更新，回傳新的 Taxonomy：既有詞彙的位元圖只重新計算 rows 這些列，
+        新出現的分類名稱才對整個商品目錄編譯。
+
+        :param columns: 更新後的 ProductColumns（見 ProductColumns.patched）
+        :param rows: 內容有變動的列號（含新增的列）
+        """
+        rows = np.asarray(rows, dtype=np.int64).tolist()
+        old_n = len(self.columns)
+        names = [columns.name_lower[row] for row in rows]
+        categories = [[columns.category_lower[c] for c in np.flatnonzero(columns.category_bits[:, row])] for row in rows]
+
+        new = Taxonomy.__new__(Taxonomy)
+        new.columns = columns
+        new.expansions = self.expansions
+        new.synonyms = self.synonyms
+        new._term_masks = {}
+        new._bitmaps = {}
+        for term, bitmap in self._bitmaps.items():
+            terms = [t.lower() for t in self.expand(term)]
+            mask = np.zeros(len(columns), dtype=bool)
+            mask[:old_n] = bitmap
+            for row, name, cats in zip(rows, names, categories):
+                mask[row] = any(t in name or any(t in cat for cat in cats) for t in terms)
+            mask.flags.writeable = False
+            new._bitmaps[term] = mask
+        for term in new.vocabulary() - new._bitmaps.keys():
+            new._bitmaps[term] = new._compile(term)
+
+        new._adhoc = OrderedDict()
+        new._adhoc_lock = threading.Lock()
+        return new
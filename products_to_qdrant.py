@@ -0,0 +1,20 @@
+import os
+from catalog_utils.catalog import build_catalog
+from rag_utils.embedding import OpenAIEmbeddings
+from rag_utils.product_index import PRODUCT_COLLECTION, index_products
+from rag_utils.vector import QdrantVector
+from key import OPENAI_API_KEY
+
+# 將備份檔中的商品嵌入並寫入 Qdrant，供 search_products_by_intent 使用。
+# 備份更新後重新執行即可：只有文字變動的商品會重新嵌入，已下架的商品會被刪除。
+# 設定 INKSLAP_PRODUCT_INDEX_RECREATE=1 時刪除並重建整個 collection（例如更換嵌入模型後）。
+recreate = os.getenv("INKSLAP_PRODUCT_INDEX_RECREATE", "0") == "1"
+
+embedding = OpenAIEmbeddings(openai_api_key=OPENAI_API_KEY)
+vector = QdrantVector(embedding)
+
+catalog = build_catalog()
+print(f"商品目錄版本 {catalog.version}，共 {len(catalog)} 個商品")
+
+counts = index_products(catalog, vector, PRODUCT_COLLECTION, recreate=recreate)
+print(f"✅ {PRODUCT_COLLECTION}：重新嵌入 {counts['embedded']} 個、更新資料 {counts['updated']} 個、刪除 {counts['deleted']} 個商品")
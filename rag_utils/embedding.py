@@ -10,4 +10,12 @@ class OpenAIEmbeddings:
             input=query,
             model=self.model
         )
-        return response.data[0].embedding
\ No newline at end of file
+        return response.data[0].embedding
+
+    def embed_documents(self, texts: list) -> list:
+        # 一次請求嵌入多段文字，回傳順序與輸入相同
+        response = self.client.embeddings.create(
+            input=texts,
+            model=self.model
+        )
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
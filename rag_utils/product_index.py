@@ -0,0 +1,161 @@
+import hashlib
+import os
+from qdrant_client.models import FieldCondition, Filter, HasIdCondition, PayloadSchemaType, PointStruct, Range
+
+# 商品向量的 collection 名稱，與 FAQ 的 inkslap_QA 分開
+PRODUCT_COLLECTION = os.getenv("INKSLAP_PRODUCT_COLLECTION", "inkslap_products")
+
+# 每次向嵌入 API 送出的商品數
+EMBED_BATCH_SIZE = 64
+
+# 需要建立 payload 索引的欄位，Qdrant 才能在 ANN 搜尋時直接套用篩選
+PAYLOAD_INDEXES = {
+    'price': PayloadSchemaType.FLOAT,
+    'min_unit_price': PayloadSchemaType.FLOAT,
+    'max_unit_price': PayloadSchemaType.FLOAT,
+    'min_quantity': PayloadSchemaType.INTEGER,
+    'max_quantity': PayloadSchemaType.INTEGER,
+    'categories': PayloadSchemaType.KEYWORD,
+}
+
+
+def product_text(product) -> str:
+    """嵌入用的商品文字：名稱、分類、規格與描述"""
+    parts = [
+        f"商品名稱：{product['name']}",
+        f"分類：{'、'.join(product['categories'])}",
+    ]
+    if product.get('specification'):
+        parts.append(f"規格：{product['specification']}")
+    if product.get('description'):
+        parts.append(f"描述：{product['description']}")
+    return '\n'.join(parts)
+
+
+def product_payload(catalog, product) -> dict:
+    """
+    商品的 payload。
+
+    min_unit_price、max_unit_price 為原價與各級距單價中的最低與最高價：任何數量的
+    單價都落在兩者之間，指定數量的價格上下限可以先以它們在 Qdrant 篩選，
+    精確的級距價格再由商品目錄確認。
+    """
+    text = product_text(product)
+    tiers = catalog.price_tiers(product['id'])
+    prices = [product['price']] + ([tier.unit_price for tier in tiers.tiers] if tiers else [])
+    return {
+        'product_id': product['id'],
+        'name': product['name'],
+        'price': float(product['price']),
+        'min_unit_price': float(min(prices)),
+        'max_unit_price': float(max(prices)),
+        'min_quantity': product['min_order_quantity'],
+        'max_quantity': product['max_order_quantity'],
+        'categories': list(product['categories']),
+        'text_hash': hashlib.sha256(text.encode('utf-8')).hexdigest()[:16],
+    }
+
+
+def _existing_hashes(vector, collection_name: str) -> dict:
+    """collection 中每個商品ID 的 text_hash"""
+    hashes, offset = {}, None
+    while True:
+        points, offset = vector.client.scroll(
+            collection_name=collection_name,
+            limit=256,
+            offset=offset,
+            with_payload=['text_hash'],
+            with_vectors=False,
+        )
+        for point in points:
+            hashes[point.id] = (point.payload or {}).get('text_hash')
+        if offset is None:
+            return hashes
+
+
+def index_products(catalog, vector, collection_name: str = PRODUCT_COLLECTION, recreate: bool = False) -> dict:
+    """
+    將 Catalog 的商品寫入 Qdrant，以商品ID 作為 point ID。
+
+    文字沒有變動的商品只更新 payload（價格、數量等），不重新嵌入；
+    已不在 Catalog 中的商品從 collection 刪除。
+
+    :param vector: rag_utils.vector.QdrantVector
+    :param recreate: 刪除並重建 collection，所有商品重新嵌入
+    :return: {'embedded': 重新嵌入的商品數, 'updated': 只更新 payload 的商品數, 'deleted': 刪除的商品數}
+    """
+    products = [product for product, live in zip(catalog.products, catalog.columns.live) if live]
+    if recreate and collection_name in vector.list_collections():
+        vector.delete_collection(collection_name)
+
+    if collection_name not in vector.list_collections():
+        size = len(vector.embedding.embed_query(product_text(products[0]))) if products else 0
+        vector.create_collection(collection_name, size)
+    # 既有的 collection 也補上之後新增的 payload 索引
+    indexed = vector.client.get_collection(collection_name).payload_schema or {}
+    for field, schema in PAYLOAD_INDEXES.items():
+        if field not in indexed:
+            vector.client.create_payload_index(collection_name, field_name=field, field_schema=schema)
+
+    existing = _existing_hashes(vector, collection_name)
+    payloads = {product['id']: product_payload(catalog, product) for product in products}
+    changed = [product for product in products if existing.get(product['id']) != payloads[product['id']]['text_hash']]
+    changed_ids = {product['id'] for product in changed}
+    unchanged = [product_id for product_id in payloads if product_id in existing and product_id not in changed_ids]
+
+    for start in range(0, len(changed), EMBED_BATCH_SIZE):
+        batch = changed[start:start + EMBED_BATCH_SIZE]
+        vectors = vector.embedding.embed_documents([product_text(product) for product in batch])
+        vector.client.upsert(
+            collection_name=collection_name,
+            points=[
+                PointStruct(id=product['id'], vector=embedding, payload=payloads[product['id']])
+                for product, embedding in zip(batch, vectors)
+            ],
+        )
+    for product_id in unchanged:
+        vector.client.set_payload(collection_name=collection_name, payload=payloads[product_id], points=[product_id])
+
+    removed = [product_id for product_id in existing if product_id not in payloads]
+    if removed:
+        vector.client.delete(collection_name=collection_name, points_selector=removed)
+    return {'embedded': len(changed), 'updated': len(unchanged), 'deleted': len(removed)}
+
+
+def build_filter(min_price: float = None, max_price: float = None, quantity: int = None, product_ids=None):
+    """
+    價格、數量與商品範圍組成的 Qdrant Filter，條件都不提供時回傳 None。
+
+    未指定數量時以原價篩選；指定數量時單價為級距折扣價，只能以「最高單價不低於下限」
+    與「最優惠單價不高於上限」先行篩選，精確比對由呼叫端以商品目錄完成。
+
+    :param product_ids: 只在這些商品中搜尋，例如 Catalog.category_mask 選出的商品；
+        分類的擴展詞與子分類規則與 get_product 一致，不需另外在 payload 上比對
+    """
+    must = []
+    if quantity is None:
+        if min_price is not None or max_price is not None:
+            must.append(FieldCondition(key='price', range=Range(gte=min_price, lte=max_price)))
+    else:
+        must.append(FieldCondition(key='min_quantity', range=Range(lte=quantity)))
+        must.append(FieldCondition(key='max_quantity', range=Range(gte=quantity)))
+        if min_price is not None:
+            must.append(FieldCondition(key='max_unit_price', range=Range(gte=min_price)))
+        if max_price is not None:
+            must.append(FieldCondition(key='min_unit_price', range=Range(lte=max_price)))
+    if product_ids is not None:
+        must.append(HasIdCondition(has_id=list(product_ids)))
+    return Filter(must=must) if must else None
+
+
+def search_products(vector, query: str, query_filter=None, limit: int = 20, collection_name: str = PRODUCT_COLLECTION) -> list:
+    """以語意相似度搜尋商品，回傳依相似度排序的 [(商品ID, 分數), ...]"""
+    points = vector.client.search(
+        collection_name=collection_name,
+        query_vector=vector.embedding.embed_query(query),
+        limit=limit,
+        with_payload=False,
+        with_vectors=False,
+        query_filter=query_filter,
+    )
+    return [(point.id, point.score) for point in points]
@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+
+# 測試使用獨立的快照與共用陣列目錄，不讀寫專案內的 .catalog_cache；需在匯入 catalog_utils 之前設定
+os.environ["INKSLAP_CATALOG_CACHE_DIR"] = tempfile.mkdtemp(prefix="inkslap-test-cache-")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
@@ -0,0 +1,85 @@
+"""
+禮品組合的動態規劃：與窮舉比對總價，並確認類別共用商品時仍在時間上限內組出完整的組合。
+"""
+import itertools
+import random
+import time
+
+import numpy as np
+import pytest
+
+from catalog_utils.bundles import BUNDLE_TIME_BUDGET, find_bundles
+
+
+def _best_totals(groups, prices, budget, size):
+    """窮舉每種選法（每個類別最多一個、商品不重複）的可達總價，由高到低"""
+    choices = [[None] + list(rows) for _, rows in groups]
+    need = len(groups) if size is None else size
+    totals = set()
+    for picks in itertools.product(*choices):
+        rows = [row for row in picks if row is not None]
+        if len(rows) != need or len(set(rows)) != len(rows):
+            continue
+        total = sum(prices[row] for row in rows)
+        if total <= budget:
+            totals.add(total)
+    return sorted(totals, reverse=True)
+
+
+def _check(bundle, groups, prices, budget, size):
+    rows = bundle.rows
+    assert len(rows) == (len(groups) if size is None else size)
+    assert len(set(rows)) == len(rows)
+    assert bundle.total <= budget
+    # 商品可依序對應到不同的類別
+    assert any(all(row in groups[g][1] for row, g in zip(rows, order))
+               for order in itertools.permutations(range(len(groups)), len(rows)))
+
+
+def test_shared_product_is_not_used_twice():
+    prices = np.array([50.0, 30.0, 10.0])
+    popularity = np.zeros(3)
+    groups = [('杯子', [0]), ('餐具', [0, 1, 2])]
+    bundles = find_bundles(groups, prices, popularity, 100)
+    # 商品 0 重複使用可湊到 100，但只有 0 + 1 與 0 + 2 是合法的組合
+    assert [(bundle.rows, bundle.total) for bundle in bundles] == [([0, 1], 80.0), ([0, 2], 60.0)]
+    assert find_bundles([('杯子', [0]), ('水杯', [0])], prices, popularity, 100) == []
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_totals_match_exhaustive_search(seed):
+    rng = random.Random(seed)
+    products = 12
+    prices = np.array([float(rng.randint(5, 60)) for _ in range(products)])
+    popularity = np.array([rng.random() for _ in range(products)])
+    groups = [(f"類別{g}", sorted(rng.sample(range(products), rng.randint(1, 5)))) for g in range(rng.randint(2, 4))]
+    size = rng.choice([None, 2])
+    budget = rng.randint(20, 150)
+
+    bundles = find_bundles(groups, prices, popularity, budget, size, limit=5)
+    assert [bundle.total for bundle in bundles] == _best_totals(groups, prices, budget, size)[:5]
+    for bundle in bundles:
+        _check(bundle, groups, prices, budget, size)
+
+
+def test_overlapping_categories_finish_well_within_the_time_budget():
+    rng = np.random.default_rng(0)
+    products = 3000
+    prices = rng.integers(50, 1500, products).astype(np.float64) + 0.5
+    popularity = rng.random(products)
+    # 子分類的商品同時在上層分類中，各類別大量共用商品
+    pens = np.arange(0, 1200)
+    stationery = np.arange(0, 2000)
+    cups = np.arange(1500, 3000)
+    groups = [('筆', pens), ('文具用品', stationery), ('杯子', cups), ('餐具', np.arange(1000, 3000))]
+
+    started = time.monotonic()
+    bundles = find_bundles(groups, prices, popularity, 3000)
+    elapsed = time.monotonic() - started
+
+    assert bundles and elapsed < BUNDLE_TIME_BUDGET / 2
+    for bundle in bundles:
+        assert len(bundle.rows) == len(groups) and len(set(bundle.rows)) == len(groups)
+        assert all(row in rows for row, (_, rows) in zip(bundle.rows, groups))
+        assert bundle.total <= 3000
+    assert bundles[0].total > 2990
@@ -0,0 +1,369 @@
+"""
+增量更新與完整重建的一致性。
+
+以 benchmarks/generate_dump.py 產生小型備份檔並加上訂單明細，建立 Catalog 後修改備份檔
+（改名改價、同一秒內的修改、刪除、新增商品、新增折扣級距與訂單），比較增量更新與完整重建的
+查詢結果，並以修改後的備份檔重建 SQLite 檔，比較 get_product 的結果與排序，以及各工具在兩種
+商品目錄下的輸出。
+"""
+import random
+import re
+import sys
+
+import pytest
+
+from benchmarks.generate_dump import TIMESTAMP, generate
+from catalog_utils.catalog import build_catalog, refresh_catalog
+from catalog_utils.category_tree import CategoryTree
+from catalog_utils.incremental import load_change_state, read_changes
+from catalog_utils.listing import filter_products, list_categories, list_products, popular_first
+from catalog_utils.pricing import UNBOUNDED, PriceTiers, Tier
+from catalog_utils.result_cache import PAGE_SIZE, ResultCache, get_result_cache, page_slice
+from catalog_utils.sqlite_store import SQLiteCatalogStore
+from catalog_utils.synonyms import SynonymMatcher
+
+PRODUCT_COUNT = 200
+NEW_ID = PRODUCT_COUNT + 1
+
+# 各資料表中商品ID 所在的欄位
+PRODUCT_COLUMN = {
+    'products': 0,
+    'product_categories': 2,
+    'product_images': 1,
+    'product_colors': 1,
+    'product_specifications': 1,
+    'quantity_discounts': 1,
+    'product_quantity_ranges': 1,
+}
+
+# 晚於產生時間的修改時間
+LATER = "'2025-06-02 09:00:00'"
+
+ORDER_ITEM_COLUMNS = ['id', 'order_id', 'sorting', 'product_id', 'product_name', 'color', 'specification',
+                      'unit_price', 'quantity', 'subtotal', 'created_at', 'updated_at']
+
+# get_product 的參數：category, min_price, max_price, min_quantity, max_quantity, sort_by, quantity, deadline_days, spec
+QUERIES = [
+    ('筆', None, None, None, None, 'default', None, None, None),
+    ('文具用品', None, None, None, None, 'default', None, None, None),
+    ('居家用品', None, None, None, None, 'default', 500, None, None),
+    ('杯', None, None, None, None, 'default', None, None, None),
+    (None, None, 300, None, None, 'default', None, None, None),
+    (None, 50, 200, None, None, 'default', 1000, None, None),
+    (None, None, 300, None, None, 'closest_price', None, None, None),
+    (None, None, None, 100, None, 'default', None, 30, None),
+    (None, None, None, None, None, 'default', None, None, '藍'),
+]
+
+# 比較兩種商品目錄輸出的工具呼叫：(工具名稱, 參數)；關鍵字搜尋在 SQLite 中以 FTS5 的 BM25 排序，順序不同，不列入
+TOOL_CALLS = [
+    ('get_product', {'category': '文具用品'}),
+    ('get_product', {'max_price': 300, 'quantity': 500, 'page': 2}),
+    ('get_product', {'category': '文俱'}),
+    ('get_product_detail', {'product': 'P00000003'}),
+    ('get_product_detail', {'product': '磁吸'}),
+    ('get_product_detail', {'product': '5'}),
+    ('get_quote', {'product': f'P{NEW_ID:08d}', 'quantity': 300}),
+    ('get_quote', {'product': 'P00000001', 'quantity': 2400}),
+    ('get_quote', {'product': 'P00000007', 'quantity': 7}),
+    ('get_category', {}),
+    ('confirm_category', {'category': '文具用品'}),
+    ('confirm_category', {'category': '文俱'}),
+    ('get_gift_bundle', {'budget': 60000, 'quantity': 200, 'categories': '筆,杯'}),
+    ('get_gift_bundle', {'budget': 90000, 'quantity': 300, 'deadline_days': 40}),
+]
+
+
+def _order_items(product_ids, orders, first_id=1, first_order=1, updated_at=f"'{TIMESTAMP}'") -> list:
+    rng = random.Random(first_order)
+    rows, item_id = [], first_id
+    for order_id in range(first_order, first_order + orders):
+        for sorting, product_id in enumerate(rng.sample(product_ids, rng.randint(1, min(3, len(product_ids)))), start=1):
+            quantity = rng.choice([100, 300, 500])
+            rows.append(f"({item_id},\t{order_id},\t{sorting},\t{product_id},\t'商品',\tNULL,\tNULL,"
+                        f"\t10.00,\t{quantity},\t{quantity * 10}.00,\t{updated_at},\t{updated_at})")
+            item_id += 1
+    return rows
+
+
+def _insert(table, columns, rows) -> str:
+    return f"INSERT INTO `{table}` ({', '.join(f'`{c}`' for c in columns)}) VALUES\n" + ',\n'.join(rows) + ';\n'
+
+
+def _edit_rows(text: str, edit) -> str:
+    """
+    以 edit(資料表, 欄位值串列) 改寫備份檔中每個資料列；回傳 None 時刪除該列，
+    回傳串列的串列時以多列取代。每個資料表只有一個 INSERT 語句。
+    """
+    out, table, rows = [], None, []
+    for line in text.split('\n'):
+        if table is None:
+            out.append(line)
+            match = re.match(r"INSERT INTO `(\w+)`", line)
+            if match:
+                table, rows = match.group(1), []
+            continue
+        fields = line[1:-2].split(',\t')
+        result = edit(table, fields)
+        if result is not None:
+            rows += result if isinstance(result[0], list) else [result]
+        if line.endswith(';'):
+            out.append(',\n'.join('(' + ',\t'.join(fields) + ')' for fields in rows) + ';')
+            table = None
+    return '\n'.join(out)
+
+
+def _changed_dump(text: str) -> str:
+    """改寫產生的備份檔（不含訂單明細）：刪除商品 2、修改商品 3 與 6、新增商品與折扣級距"""
+    def edit(table, fields):
+        if table not in PRODUCT_COLUMN:
+            return fields
+        product_id = fields[PRODUCT_COLUMN[table]]
+        if product_id == '2':
+            return None
+        if table == 'products' and product_id == '3':
+            # 改名、改價，修改時間晚於上一版
+            return fields[:2] + ["'磁吸保溫杯'", fields[3], '88.00'] + fields[5:10] + [LATER] + fields[11:]
+        if table == 'products' and product_id == '6':
+            # 與上一版 watermark 同一秒的修改，只能以 CRC32 判斷
+            return fields[:4] + ['999.00'] + fields[5:]
+        if table == 'products' and product_id == str(PRODUCT_COUNT):
+            # 新商品的 ID 最大，與實際備份相同接在最後
+            added = [str(NEW_ID), f"'P{NEW_ID:08d}'", "'磁吸環保杯'"] + fields[3:9] + [LATER, LATER] + fields[11:]
+            return [fields, added]
+        if table == 'product_categories' and product_id == '4':
+            return [fields, [str(90000 + int(fields[0])), fields[1], str(NEW_ID), fields[3], LATER, LATER]]
+        if table == 'quantity_discounts' and fields[0] == '1':
+            return [fields, ['90001', product_id, '2000', '2500', '20.00', '40', LATER, LATER, '12.00']]
+        return fields
+
+    return _edit_rows(text, edit)
+
+
+@pytest.fixture(scope='module')
+def dumps(tmp_path_factory):
+    """(原始備份檔內容, 修改後的備份檔內容)"""
+    path = tmp_path_factory.mktemp('dump') / 'catalog.sql'
+    generate(PRODUCT_COUNT, str(path), seed=1)
+    generated = path.read_text(encoding='utf-8')
+    orders = _order_items(list(range(1, NEW_ID)), 60)
+    # 新訂單讓新增的商品與商品 5 成為熱門商品
+    new_orders = _order_items([5, NEW_ID], 8, first_id=len(orders) + 1, first_order=500, updated_at=LATER)
+    return (
+        generated + _insert('order_items', ORDER_ITEM_COLUMNS, orders),
+        _changed_dump(generated) + _insert('order_items', ORDER_ITEM_COLUMNS, orders + new_orders),
+    )
+
+
+@pytest.fixture(scope='module')
+def catalogs(dumps, tmp_path_factory):
+    """(原始 Catalog, 增量更新後的 Catalog, 完整重建的 Catalog, 備份檔路徑)"""
+    before, after = dumps
+    path = tmp_path_factory.mktemp('catalog') / 'backup.sql'
+    path.write_text(before, encoding='utf-8')
+    original = build_catalog(str(path))
+    path.write_text(after, encoding='utf-8')
+    patched = refresh_catalog(original, str(path))
+    assert patched is not None and patched is not original, "應以增量方式更新"
+    return original, patched, build_catalog(str(path)), str(path)
+
+
+@pytest.fixture(scope='module')
+def store(catalogs, tmp_path_factory):
+    """以修改後的備份檔建立的 SQLiteCatalogStore"""
+    store = SQLiteCatalogStore(catalogs[3], str(tmp_path_factory.mktemp('sqlite') / 'catalog.db'))
+    store.refresh()
+    return store
+
+
+def _ids(catalog, rows) -> list:
+    return [catalog.products[row]['id'] for row in rows]
+
+
+def _listing(catalog, args) -> list:
+    result = popular_first(catalog, filter_products(catalog, *args), args[5])
+    prices = None if result.prices is None else [round(float(p), 2) for p in result.prices]
+    return _ids(catalog, result.rows), prices
+
+
+def test_read_changes_detects_each_kind_of_change(dumps, tmp_path):
+    before, after = dumps
+    path = tmp_path / 'backup.sql'
+    path.write_text(before, encoding='utf-8')
+    state = load_change_state(str(path))
+    path.write_text(after, encoding='utf-8')
+    changes = read_changes(str(path), state)
+
+    # 商品 1 的折扣級距、商品 3 的修改、商品 6 同一秒內的修改、新增的商品
+    assert set(changes.upserts) == {1, 3, 6, NEW_ID}
+    assert set(changes.deleted) == {2}
+    assert changes.order_items_changed
+    assert changes.upserts[6]['price'] == 999.0
+
+
+def test_unchanged_dump_has_no_changes(dumps, tmp_path):
+    path = tmp_path / 'backup.sql'
+    path.write_text(dumps[0], encoding='utf-8')
+    changes = read_changes(str(path), load_change_state(str(path)))
+    assert not changes.upserts and not changes.deleted and not changes.order_items_changed
+
+
+def test_patch_leaves_original_catalog_unchanged(catalogs):
+    original, patched, _, _ = catalogs
+    assert len(original) == PRODUCT_COUNT
+    assert original.find_product('P00000002')['id'] == 2
+    assert original.find_product('P00000003')['name'] != '磁吸保溫杯'
+    assert original.find_product(f'P{NEW_ID:08d}') is None
+
+    assert patched.find_product('P00000002') is None
+    assert patched.find_product('磁吸保溫杯')['id'] == 3
+    assert patched.find_product(f'P{NEW_ID:08d}')['id'] == NEW_ID
+
+
+def test_patched_catalog_matches_full_rebuild(catalogs):
+    _, patched, rebuilt, _ = catalogs
+    assert len(patched) == len(rebuilt) == PRODUCT_COUNT
+
+    for args in QUERIES:
+        assert _listing(patched, args) == _listing(rebuilt, args), args
+
+    for quantity in (1, 300, 2000, 2400, 8000):
+        live = patched.columns.live
+        by_id = {patched.products[r]['id']: p for r, p in enumerate(patched.pricing.unit_prices(quantity)) if live[r]}
+        assert by_id == dict(zip(_ids(rebuilt, range(len(rebuilt.products))), rebuilt.pricing.unit_prices(quantity))), quantity
+
+    for terms in (['筆'], ['保溫杯'], ['環保', '杯'], ['收納']):
+        scores = [{catalog.products[r]['id']: round(s, 6) for r, s in catalog.search_index.scores(terms).items()}
+                  for catalog in (patched, rebuilt)]
+        assert scores[0] == scores[1], terms
+
+    for query in ('圓株筆', '保溫悲', '環保代'):
+        assert patched.fuzzy.correct(query) == rebuilt.fuzzy.correct(query), query
+    for product_id in (1, 5, NEW_ID):
+        related = [_ids(catalog, catalog.popularity.related(product_id)) for catalog in (patched, rebuilt)]
+        assert related[0] == related[1], product_id
+
+
+def test_sqlite_store_matches_patched_catalog(catalogs, store):
+    _, patched, _, _ = catalogs
+    ids = dict(store.connection().execute("SELECT row, id FROM products"))
+
+    for args in QUERIES:
+        result = store.filter_products(*args)
+        prices = None if result.prices is None else [round(float(p), 2) for p in result.prices]
+        assert ([ids[row] for row in result.rows], prices) == _listing(patched, args), args
+
+    for query in ('圓株筆', '保溫悲', '環保代'):
+        assert store.correct(query) == patched.fuzzy.correct(query), query
+    assert [node.name for node in store.categories.nodes()] == [node.name for node in patched.categories.nodes()]
+
+
+def test_sqlite_keyword_search_boosts_popular_products(store, monkeypatch):
+    import catalog_utils.sqlite_store as sqlite_store
+
+    popularity = store.popularity_scores()
+    boosted = store.search_products('杯').rows
+    monkeypatch.setattr(sqlite_store, 'POPULARITY_WEIGHT', 0.0)
+    plain = store.search_products('杯').rows
+    assert sorted(boosted) == sorted(plain) and len(plain) > PAGE_SIZE
+    # 與記憶體版相同，熱門商品在第一頁的比重提高
+    assert popularity[boosted[:PAGE_SIZE]].sum() > popularity[plain[:PAGE_SIZE]].sum()
+
+
+def test_tools_match_between_catalog_and_sqlite_store(catalogs, store, monkeypatch):
+    import Tool
+
+    rebuilt = catalogs[2]
+    for name, kwargs in TOOL_CALLS:
+        tool = Tool.TOOL_FUNCTIONS[name]
+        outputs = []
+        for source in (rebuilt, store):
+            monkeypatch.setattr(sys.modules[tool.__module__], 'get_catalog_source', lambda: source)
+            # 兩者的目錄版本相同，清除查詢快取才會各自查詢
+            get_result_cache().clear()
+            outputs.append(tool(**kwargs))
+        assert outputs[0] == outputs[1], (name, kwargs)
+
+
+def test_listing_api_matches_between_catalog_and_sqlite_store(catalogs, store):
+    rebuilt = catalogs[2]
+    assert list_categories(store) == list_categories(rebuilt)
+    for args in QUERIES + [(None,) * 5 + ('default', None, None, None)]:
+        for page in (1, 3):
+            listings = []
+            for source in (rebuilt, store):
+                get_result_cache().clear()
+                listings.append(list_products(source, *args, page=page, page_size=10))
+            assert listings[0] == listings[1], (args, page)
+    # 只有新增的商品沒有圖片
+    listing = list_products(store, page_size=100)
+    assert [product['id'] for product in listing['products'] if not product['image']] == [NEW_ID]
+
+
+def test_intent_search_keeps_conditions_when_qdrant_fails(catalogs, monkeypatch):
+    import Tool
+
+    def unavailable():
+        raise ConnectionError("Qdrant 無法連線")
+
+    rebuilt = catalogs[2]
+    for name in ('search_products_by_intent', 'get_product'):
+        monkeypatch.setattr(sys.modules[Tool.TOOL_FUNCTIONS[name].__module__], 'get_catalog_source', lambda: rebuilt)
+    monkeypatch.setattr(sys.modules[Tool.TOOL_FUNCTIONS['search_products_by_intent'].__module__], '_product_vector', unavailable)
+
+    # 關鍵字比對得到的商品與比對不到時改列的商品，都只列出符合價格條件的商品
+    for query in ('杯', '適合送工程師的小禮物'):
+        get_result_cache().clear()
+        html = Tool.TOOL_FUNCTIONS['search_products_by_intent'](query, max_price=100, quantity=500)
+        prices = [int(price) for price in re.findall(r'<td>NT\$(\d+)</td>', html)]
+        assert prices and all(price <= 100 for price in prices), query
+
+
+def test_paged_results_match_full_results(catalogs):
+    rebuilt = catalogs[2]
+    builds = [
+        lambda limit: rebuilt.filter_products(None, None, 300, None, None, 'closest_price', None, None, None, limit=limit),
+        lambda limit: rebuilt.filter_products('杯', None, None, None, None, 'closest_price', None, None, None, limit=limit),
+        lambda limit: rebuilt.search_products('杯', limit),
+        lambda limit: rebuilt.search_products('筆', limit),
+    ]
+    for build in builds:
+        full = build(None)
+        assert full.count == len(full.rows) > 3 * PAGE_SIZE
+        # 只算出第一頁，翻頁時才延伸快取的前綴
+        cache = ResultCache()
+        assert len(cache.get_or_build('v', 'key', build, PAGE_SIZE).rows) == PAGE_SIZE
+        for page in range(1, full.count // PAGE_SIZE + 3):
+            result = cache.get_or_build('v', 'key', build, page * PAGE_SIZE)
+            paged, expected = page_slice(result, page), page_slice(full, page)
+            assert list(paged[0]) == list(expected[0]) and paged[2] == expected[2], page
+
+
+def test_price_tiers_prefer_the_narrowest_overlapping_tier():
+    tiers = PriceTiers([
+        Tier(100, 999, 50.0, 0.0, 10),
+        Tier(1000, UNBOUNDED, 40.0, 20.0, 20),
+        Tier(500, 600, 45.0, 10.0, 15),
+    ])
+    assert tiers.lookup(99) is None
+    assert tiers.lookup(100).unit_price == 50.0
+    assert tiers.lookup(550).unit_price == 45.0
+    assert tiers.lookup(601).unit_price == 50.0
+    assert tiers.lookup(10 ** 6).unit_price == 40.0
+
+
+def test_synonym_matcher_finds_every_key_in_one_pass():
+    matcher = SynonymMatcher({'男友': ['男朋友', '老公'], '科技': ['3c', '電子'], '科技感': ['未來感']})
+    assert matcher.find_keys('送男友 科技感 小物') == ['男友', '科技', '科技感']
+    expanded = set(matcher.expand('送男友'))
+    assert {'送男友', '男朋友', '老公'} <= expanded
+    # 查詢詞本身是同義詞時加入所屬關鍵字與整組同義詞
+    assert {'男友', '男朋友'} <= set(matcher.expand('老公'))
+
+
+def test_category_suggestion_falls_back_to_the_closest_name():
+    tree = CategoryTree.from_names([['文具用品', '筆'], ['筆記本'], ['杯子']])
+    assert [(node.name, score) for node, score in tree.suggest('文俱')] == [('文具用品', 0.25)]
+    # 達到門檻的候選照常依相似度排序，沒有共同字的查詢詞不建議
+    assert [node.name for node, _ in tree.suggest('筆記')][:2] == ['筆記本', '筆']
+    assert tree.suggest('馬克') == []
@@ -0,0 +1,96 @@
+"""
+商品向量索引的 payload 與 Qdrant 篩選條件。
+
+以本機記憶體模式的 Qdrant 實際套用 build_filter，確認指定數量時的粗篩不會排除
+級距單價符合條件的商品（精確比對由商品目錄完成，粗篩只能多不能少）。
+"""
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, FieldCondition, HasIdCondition, PointStruct, Range, VectorParams
+
+from catalog_utils.catalog import Catalog
+from catalog_utils.product import Product
+from rag_utils.product_index import PAYLOAD_INDEXES, build_filter, product_payload
+
+
+def _product(product_id, price, min_quantity=1, max_quantity=10000, name=None):
+    return Product(product_id, f"P{product_id:08d}", name or f"商品{product_id}", '', price, '',
+                   min_quantity, max_quantity, ['文具'])
+
+
+def _tier(min_quantity, max_quantity, price):
+    return {'min_quantity': min_quantity, 'max_quantity': max_quantity, 'discount_price': price,
+            'discount_percentage': 0, 'lead_time_days': 10}
+
+
+@pytest.fixture(scope='module')
+def catalog():
+    products = [
+        _product(1, 100.0),
+        # 小量訂購的級距單價高於原價
+        _product(2, 100.0),
+        _product(3, 50.0, min_quantity=100, max_quantity=1000),
+        _product(4, 300.0),
+    ]
+    discounts = {
+        1: [_tier(1, 99, 100.0), _tier(100, None, 80.0)],
+        2: [_tier(1, 49, 130.0), _tier(50, None, 90.0)],
+        4: [_tier(500, None, 150.0)],
+    }
+    return Catalog(products, 'test', discounts)
+
+
+def test_payload_has_the_unit_price_range(catalog):
+    payloads = {product['id']: product_payload(catalog, product) for product in catalog.products}
+    assert (payloads[1]['min_unit_price'], payloads[1]['max_unit_price']) == (80.0, 100.0)
+    assert (payloads[2]['min_unit_price'], payloads[2]['max_unit_price']) == (90.0, 130.0)
+    # 沒有級距的商品只有原價
+    assert (payloads[3]['min_unit_price'], payloads[3]['max_unit_price']) == (50.0, 50.0)
+    assert (payloads[3]['min_quantity'], payloads[3]['max_quantity']) == (100, 1000)
+    assert set(PAYLOAD_INDEXES) <= set(payloads[1])
+
+
+def test_text_hash_changes_only_with_the_embedded_text(catalog):
+    product = catalog.products[0]
+    assert product_payload(catalog, product)['text_hash'] == product_payload(catalog, _product(1, 999.0))['text_hash']
+    assert product_payload(catalog, product)['text_hash'] != product_payload(catalog, _product(1, 100.0, name='改名'))['text_hash']
+
+
+def test_build_filter_conditions():
+    assert build_filter() is None
+    assert build_filter(min_price=10, max_price=20).must == [FieldCondition(key='price', range=Range(gte=10, lte=20))]
+
+    conditions = build_filter(min_price=10, max_price=20, quantity=300, product_ids=[1, 2]).must
+    assert FieldCondition(key='min_quantity', range=Range(lte=300)) in conditions
+    assert FieldCondition(key='max_quantity', range=Range(gte=300)) in conditions
+    assert FieldCondition(key='max_unit_price', range=Range(gte=10)) in conditions
+    assert FieldCondition(key='min_unit_price', range=Range(lte=20)) in conditions
+    assert HasIdCondition(has_id=[1, 2]) in conditions
+    assert not any(getattr(c, 'key', None) == 'price' for c in conditions)
+
+
+@pytest.mark.parametrize('min_price, max_price, quantity', [
+    (120, None, 10),
+    (95, 135, 30),
+    (None, 85, 200),
+    (60, 160, 600),
+    (100, 100, None),
+    (None, None, 5000),
+])
+def test_filter_never_drops_products_whose_unit_price_matches(catalog, min_price, max_price, quantity):
+    client = QdrantClient(':memory:')
+    client.create_collection('products', vectors_config=VectorParams(size=2, distance=Distance.COSINE))
+    client.upsert('products', points=[
+        PointStruct(id=product['id'], vector=[1.0, float(product['id'])], payload=product_payload(catalog, product))
+        for product in catalog.products
+    ])
+    found = {point.id for point in client.scroll(
+        'products', scroll_filter=build_filter(min_price, max_price, quantity), limit=100)[0]}
+
+    for product in catalog.products:
+        if quantity is not None and not product['min_order_quantity'] <= quantity <= product['max_order_quantity']:
+            assert product['id'] not in found
+            continue
+        price = catalog.pricing.unit_price(product, quantity) if quantity is not None else product['price']
+        if (min_price is None or price >= min_price) and (max_price is None or price <= max_price):
+            assert product['id'] in found, product['id']
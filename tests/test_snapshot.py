@@ -0,0 +1,52 @@
+"""
+備份檔快照的快取鍵值與失效判斷。
+"""
+import os
+
+from catalog_utils import snapshot
+from catalog_utils.snapshot import load_or_build, load_snapshot
+
+
+def _touch_later(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_same_file_name_in_different_directories_has_separate_snapshots(tmp_path):
+    paths = []
+    for directory in ('a', 'b'):
+        path = tmp_path / directory / 'backup.sql'
+        path.parent.mkdir()
+        path.write_text(f"-- {directory}\n", encoding='utf-8')
+        paths.append(str(path))
+
+    assert load_or_build(paths[0], 'products', lambda: ['a']) == ['a']
+    assert load_or_build(paths[1], 'products', lambda: ['b']) == ['b']
+    assert load_snapshot(paths[0], 'products') == ['a']
+    assert load_snapshot(paths[1], 'products') == ['b']
+
+
+def test_touched_source_reuses_snapshot_and_hashes_only_once(tmp_path, monkeypatch):
+    path = tmp_path / 'backup.sql'
+    path.write_text("-- backup\n", encoding='utf-8')
+    load_or_build(str(path), 'products', lambda: ['product'])
+
+    _touch_later(path)
+    hashed = []
+    file_sha256 = snapshot.file_sha256
+    monkeypatch.setattr(snapshot, 'file_sha256', lambda p: hashed.append(p) or file_sha256(p))
+    assert load_snapshot(str(path), 'products') == ['product']
+    assert load_snapshot(str(path), 'products') == ['product']
+    # 第一次比對雜湊後已寫回新的修改時間
+    assert hashed == [str(path)]
+
+
+def test_changed_source_invalidates_snapshot(tmp_path):
+    path = tmp_path / 'backup.sql'
+    path.write_text("-- backup\n", encoding='utf-8')
+    load_or_build(str(path), 'products', lambda: ['old'])
+
+    path.write_text("-- BACKUP\n", encoding='utf-8')
+    _touch_later(path)
+    assert load_snapshot(str(path), 'products') is None
+    assert load_or_build(str(path), 'products', lambda: ['new']) == ['new']
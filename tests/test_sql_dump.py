@@ -0,0 +1,79 @@
+"""
+SQL 備份檔的詞法解析：字串跳脫、NULL、多筆資料列的 INSERT 與欄位清單。
+"""
+import pytest
+
+from catalog_utils.sql_dump import (
+    SQLDumpError, _iter_rows, iter_insert_rows, iter_row_headers, parse_row, read_tables,
+)
+
+DUMP = r"""-- MySQL dump
+/*!40101 SET NAMES utf8mb4 */;
+-- INSERT INTO `products` VALUES (0);
+INSERT INTO `products` (`id`, `name`, `description`, `price`, `deleted_at`) VALUES
+(1,'It\'s ''ok''','a\tb (c, d);',12.5,NULL),
+(2,'反斜線 \\ 與換行\n','含	定位字元',-3,NULL),
+(3,'',NULL,1e2,'2024-01-02 03:04:05');
+INSERT INTO `discounts` (`id`,`product_id`) VALUES (1,1),(2,NULL);
+INSERT INTO `products` (`id`, `name`, `description`, `price`, `deleted_at`) VALUES (4,'/* 非註解 */','-- 非註解',0,NULL);
+"""
+
+
+@pytest.fixture
+def dump(tmp_path):
+    path = tmp_path / 'backup.sql'
+    path.write_text(DUMP, encoding='utf-8')
+    return str(path)
+
+
+def test_iter_rows_parses_values_and_escapes():
+    buf = rb"(1,'It\'s ''ok''','a\tb',NULL,0x4142,TRUE),(2,_binary 'x',-1.5,NULL,'(,)',FALSE);"
+    rows = [row for row, _ in _iter_rows(buf, 0)]
+    assert rows == [
+        (1, "It's 'ok'", 'a\tb', None, b'AB', True),
+        (2, 'x', -1.5, None, '(,)', False),
+    ]
+
+
+@pytest.mark.parametrize('buf', [b"(1,2", b"(1,(2));", b"1,2);", b"(1 2);", b"(1,2),(3"])
+def test_iter_rows_rejects_malformed_rows(buf):
+    with pytest.raises(SQLDumpError):
+        list(_iter_rows(buf, 0))
+
+
+def test_iter_insert_rows_reads_multi_row_inserts(dump):
+    rows = list(iter_insert_rows(dump))
+    columns = ('id', 'name', 'description', 'price', 'deleted_at')
+    assert rows == [
+        ('products', columns, (1, "It's 'ok'", 'a\tb (c, d);', 12.5, None)),
+        ('products', columns, (2, '反斜線 \\ 與換行\n', '含\t定位字元', -3, None)),
+        ('products', columns, (3, '', None, 100.0, '2024-01-02 03:04:05')),
+        ('discounts', ('id', 'product_id'), (1, 1)),
+        ('discounts', ('id', 'product_id'), (2, None)),
+        ('products', columns, (4, '/* 非註解 */', '-- 非註解', 0, None)),
+    ]
+    assert [row[2][0] for row in iter_insert_rows(dump, ['discounts'])] == [1, 2]
+    assert read_tables(dump, ['discounts', 'orders']) == {
+        'discounts': [{'id': 1, 'product_id': 1}, {'id': 2, 'product_id': None}],
+        'orders': [],
+    }
+
+
+def test_row_headers_match_full_parse(dump):
+    full = [row for table, _, row in iter_insert_rows(dump, ['products'])]
+    headers = list(iter_row_headers(dump, ['products'], {'products': ('id',)}))
+    assert [head for _, _, head, _, _ in headers] == [{'id': row[0]} for row in full]
+    assert [parse_row(raw) for *_, raw in headers] == full
+    assert [changed_at for _, _, _, changed_at, _ in headers] == [None, None, '2024-01-02 03:04:05', None]
+
+
+def test_insert_without_column_list_is_rejected(tmp_path):
+    path = tmp_path / 'backup.sql'
+    path.write_text("INSERT INTO `discounts` (`id`) VALUES (1);\n"
+                    "INSERT INTO `products` VALUES (1,'a');\n", encoding='utf-8')
+    with pytest.raises(SQLDumpError, match='products'):
+        list(iter_insert_rows(str(path)))
+    with pytest.raises(SQLDumpError, match='products'):
+        list(iter_row_headers(str(path), ['products']))
+    # 不需要的資料表不解析，也不檢查欄位清單
+    assert list(iter_insert_rows(str(path), ['discounts'])) == [('discounts', ('id',), (1,))]